@@ -0,0 +1,65 @@
+"""
+Measure how long importing the API (src.main) takes in a fresh interpreter, and
+which modules account for most of it.
+
+Each run starts a new Python process with -X importtime, so nothing is shared
+between runs through sys.modules. Chat does not need to be configured; the
+Gemini SDK should not show up among the imports at all.
+
+    cd backend && python -m benchmarks.import_time
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RUNS = int(os.getenv("BENCH_RUNS", "5"))
+TOP = int(os.getenv("BENCH_TOP", "15"))
+MODULE = os.getenv("BENCH_MODULE", "src.main")
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure():
+    """Import the module once in a fresh process; return {module: (self_us, cumulative_us, depth)}."""
+    env = dict(os.environ)
+    env.pop("GEMINI_API_KEY", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {MODULE} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def main():
+    runs = [measure() for _ in range(RUNS)]
+    totals = [sum(self_us for self_us, _, _ in run.values()) / 1000 for run in runs]
+
+    print(f"import {MODULE}: median {statistics.median(totals):.1f} ms over {RUNS} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+
+    last = runs[-1]
+    gemini = [name for name in last if name.startswith("google.generativeai")]
+    print(f"google.generativeai imported: {'yes' if gemini else 'no'}")
+
+    print("\nSlowest top-level imports (cumulative, last run):")
+    top_level = [(name, cumulative) for name, (_, cumulative, depth) in last.items() if depth <= 1]
+    for name, cumulative in sorted(top_level, key=lambda item: item[1], reverse=True)[:TOP]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Show query plans and timings for the hot todo/conversation queries before and
+after the model indexes exist.
+
+Runs against a throwaway SQLite file by default; point BENCH_DATABASE_URL at a
+scratch PostgreSQL database to see the Postgres plans instead. The script drops
+and recreates the indexes, so never aim it at a real database.
+
+    cd backend && python -m benchmarks.query_plans
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+from sqlmodel import SQLModel, Session
+
+from src.models import User, Todo, Conversation, Message
+from src.database.migrations import declared_indexes, create_indexes
+
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench_query_plans.db")
+USERS = int(os.getenv("BENCH_USERS", "200"))
+TODOS_PER_USER = int(os.getenv("BENCH_TODOS_PER_USER", "200"))
+MESSAGES_PER_CONVERSATION = int(os.getenv("BENCH_MESSAGES", "50"))
+REPEAT = 50
+
+QUERIES = {
+    "todo by id and user": (
+        "SELECT * FROM todo WHERE id = :todo_id AND user_id = :user_id"
+    ),
+    "pending todos": (
+        "SELECT * FROM todo WHERE user_id = :user_id AND is_completed = :completed "
+        "ORDER BY created_at LIMIT 100"
+    ),
+    "todo keyset page": (
+        "SELECT * FROM todo WHERE user_id = :user_id ORDER BY created_at, id LIMIT 100"
+    ),
+    "conversation history": (
+        "SELECT * FROM message WHERE conversation_id = :conversation_id "
+        "ORDER BY created_at DESC LIMIT 20"
+    ),
+    "recent conversations": (
+        "SELECT * FROM conversation WHERE user_id = :user_id ORDER BY updated_at DESC LIMIT 10"
+    ),
+}
+
+
+def seed(engine):
+    """Fill the database with enough rows for the planner to care about indexes."""
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    start = datetime.utcnow() - timedelta(days=365)
+
+    with Session(engine) as session:
+        for u in range(USERS):
+            user = User(email=f"bench{u}@example.com", hashed_password="x")
+            session.add(user)
+            session.flush()
+            session.add_all(
+                Todo(
+                    title=f"Task {t}",
+                    user_id=user.id,
+                    is_completed=t % 3 == 0,
+                    created_at=start + timedelta(minutes=t),
+                )
+                for t in range(TODOS_PER_USER)
+            )
+            conversation = Conversation(user_id=user.id)
+            session.add(conversation)
+            session.flush()
+            session.add_all(
+                Message(
+                    role="user" if m % 2 == 0 else "assistant",
+                    content=f"Message {m}",
+                    conversation_id=conversation.id,
+                    created_at=start + timedelta(seconds=m),
+                )
+                for m in range(MESSAGES_PER_CONVERSATION)
+            )
+        session.commit()
+
+        sample = session.exec(text("SELECT id, user_id FROM todo LIMIT 1")).first()
+        conversation_id = session.exec(text("SELECT id FROM conversation LIMIT 1")).scalar()
+
+    return {
+        "todo_id": sample.id,
+        "user_id": sample.user_id,
+        "completed": False,
+        "conversation_id": conversation_id,
+    }
+
+
+def drop_indexes(engine):
+    with engine.begin() as connection:
+        for index in declared_indexes():
+            connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{index.name}"')
+
+
+def report(engine, params, label):
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN ANALYZE "
+    print(f"\n===== {label} =====")
+    with engine.connect() as connection:
+        for name, sql in QUERIES.items():
+            plan = connection.execute(text(explain + sql), params).all()
+            started = time.perf_counter()
+            for _ in range(REPEAT):
+                connection.execute(text(sql), params).all()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / REPEAT
+            print(f"\n-- {name}: {elapsed_ms:.3f} ms/query")
+            for row in plan:
+                print("   ", row[-1])
+
+
+def main():
+    engine = create_engine(DATABASE_URL)
+    params = seed(engine)
+
+    drop_indexes(engine)
+    report(engine, params, "without indexes")
+
+    created = create_indexes(engine)
+    print(f"\nCreated indexes: {', '.join(created)}")
+    report(engine, params, "with indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Microbenchmark of encoding a list of todos as the GET /api/todos response body.
+
+"orm + response_model" is what FastAPI does with Todo instances returned from
+an endpoint declaring response_model=list[TodoRead]: validate every object
+into TodoRead, run jsonable_encoder over the result and json.dumps it.
+"rows + to_json" is the lean path read_todos now takes: TodoRead's columns as
+row tuples, turned into JSON-ready dicts and encoded by pydantic_core in one
+pass. "cached + to_json" is the same path on a cache hit, where the dicts are
+already built. No database is involved; the rows are generated in memory.
+
+    cd backend && python -m benchmarks.serialize_todos
+"""
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic_core import to_json, to_jsonable_python
+
+from src.models import Todo, TodoRead
+
+RUNS = int(os.getenv("BENCH_RUNS", "7"))
+SIZES = [int(size) for size in os.getenv("BENCH_SIZES", "1000,10000").split(",")]
+
+COLUMNS = list(TodoRead.model_fields)
+
+
+def make_rows(count: int):
+    """Row tuples in TodoRead column order, as a SELECT of those columns returns them."""
+    user_id = uuid.uuid4()
+    start = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        at = start + timedelta(seconds=i)
+        values = {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "title": f"Todo number {i}",
+            "description": "Pick up groceries, call the bank" if i % 3 else None,
+            "is_completed": i % 2 == 0,
+            "created_at": at,
+            "updated_at": at,
+        }
+        rows.append(tuple(values[name] for name in COLUMNS))
+    return rows
+
+
+async def orm_response_model(todos: List[Todo], field) -> bytes:
+    content = await serialize_response(field=field, response_content=todos)
+    return JSONResponse(content).body
+
+
+def rows_to_json(rows) -> bytes:
+    return to_json(to_jsonable_python([dict(zip(COLUMNS, row)) for row in rows]))
+
+
+async def timed(fn, *args) -> float:
+    """Median milliseconds per call over RUNS calls."""
+    times = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = fn(*args)
+        if asyncio.iscoroutine(result):
+            await result
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+async def run():
+    field = create_response_field(name="Response_read_todos", type_=List[TodoRead])
+
+    for size in SIZES:
+        rows = make_rows(size)
+        todos = [Todo(**dict(zip(COLUMNS, row))) for row in rows]
+        cached = to_jsonable_python([dict(zip(COLUMNS, row)) for row in rows])
+
+        # Both paths must send the same bytes
+        assert await orm_response_model(todos, field) == rows_to_json(rows) == to_json(cached)
+
+        results = [
+            ("orm + response_model", await timed(orm_response_model, todos, field)),
+            ("rows + to_json", await timed(rows_to_json, rows)),
+            ("cached + to_json", await timed(to_json, cached)),
+        ]
+        baseline = results[0][1]
+        print(f"{size} todos (median of {RUNS} runs):")
+        for name, ms in results:
+            print(f"  {name:<22} {ms:8.2f} ms  {baseline / ms:5.1f}x")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
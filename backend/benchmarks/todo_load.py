@@ -0,0 +1,107 @@
+"""
+Load test comparing requests per second for GET /api/todos served by a sync
+(threadpool + Session) endpoint and by the async router (AsyncSession).
+
+Requests are driven in-process through httpx's ASGI transport, so the numbers
+measure the app and database rather than the network. Uses a scratch SQLite
+file by default; set DATABASE_URL to a scratch PostgreSQL database for numbers
+closer to production, where DB waits dominate and the difference is largest.
+The todo read cache is switched off, so every request reaches the database.
+
+    cd backend && python -m benchmarks.todo_load
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_load.db")
+# Cache hits would skip the database waits this benchmark compares
+os.environ["TODO_CACHE_BACKEND"] = "none"
+
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from sqlmodel import Session
+
+from src.api.auth import get_current_user
+from src.api.todos import router as async_todos_router
+from src.database.session import engine, create_db_and_tables, get_session
+from src.models import User, Todo, TodoRead
+from src.services.todo_service import get_todos_by_user
+from src.utils.jwt import create_access_token
+
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "2000"))
+TODOS = int(os.getenv("BENCH_TODOS", "100"))
+
+
+def build_sync_app() -> FastAPI:
+    """The pre-async list endpoint: a sync def with a sync Session, run on the threadpool."""
+    router = APIRouter()
+
+    @router.get("/todos", response_model=list[TodoRead])
+    def read_todos_sync(
+        completed: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        current_user: dict = Depends(get_current_user),
+        session: Session = Depends(get_session)
+    ):
+        return get_todos_by_user(session, uuid.UUID(current_user["user_id"]), completed, skip, limit)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return app
+
+
+def build_async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(async_todos_router, prefix="/api")
+    return app
+
+
+def seed() -> str:
+    """Create a user with some todos and return a bearer token for them."""
+    create_db_and_tables()
+    with Session(engine) as session:
+        user = User(email=f"load-{uuid.uuid4()}@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        session.add_all(Todo(title=f"Task {i}", user_id=user.id) for i in range(TODOS))
+        session.commit()
+        return create_access_token(
+            data={"sub": str(user.id), "email": user.email},
+            expires_delta=timedelta(hours=1),
+        )
+
+
+async def measure(app: FastAPI, token: str) -> float:
+    """Fire REQUESTS list calls with CONCURRENCY in flight and return requests per second."""
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(range(REQUESTS))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/api/todos", headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        return REQUESTS / (time.perf_counter() - started)
+
+
+async def main():
+    token = seed()
+    for label, app in (("sync", build_sync_app()), ("async", build_async_app())):
+        # Warm up connections before measuring
+        await measure(app, token)
+        rps = await measure(app, token)
+        print(f"{label:>5}: {rps:8.1f} req/s ({REQUESTS} requests, concurrency {CONCURRENCY}, {TODOS} todos)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,15 @@
 from .auth import router as auth_router
 from .todos import router as todos_router
+from .todo_events import router as todo_events_router
 from .chatbot import router as chatbot_router
 from .chat import router as chat_router
+from .internal import router as internal_router
 
 __all__ = [
     "auth_router",
     "todos_router",
+    "todo_events_router",
     "chatbot_router",
-    "chat_router"
+    "chat_router",
+    "internal_router"
 ]
\ No newline at end of file
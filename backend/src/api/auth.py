@@ -1,34 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session
-from typing import Optional
 from datetime import timedelta
 from ..database.session import get_session
 from ..models.user import User, UserCreate, UserRead
-from ..services.auth import (
-    authenticate_user,
-    get_current_user_from_token
-)
-from ..utils.jwt import create_access_token, verify_token, get_password_hash
+from ..services.auth import authenticate_user_async, get_user_by_email
+from ..utils.jwt import create_access_token, verify_token
+from ..utils.password_hasher import password_hasher, PasswordHasherBusy
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
 
 
+def _password_service_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def signup(user_create: UserCreate, session: Session = Depends(get_session)):
+async def signup(user_create: UserCreate, session: Session = Depends(get_session)):
     """Register a new user account."""
     # Check if user already exists
-    existing_user = session.query(User).filter(User.email == user_create.email).first()
+    existing_user = await run_in_threadpool(get_user_by_email, session, user_create.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Hash the password
-    hashed_password = get_password_hash(user_create.password)
+    # Hash the password on the dedicated bcrypt pool
+    try:
+        hashed_password = await password_hasher.hash(user_create.password)
+    except PasswordHasherBusy:
+        raise _password_service_busy()
 
     # Create new user
     db_user = User(
@@ -37,16 +46,20 @@ def signup(user_create: UserCreate, session: Session = Depends(get_session)):
     )
 
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await run_in_threadpool(session.commit)
+    await run_in_threadpool(session.refresh, db_user)
 
     return db_user
 
 
 @router.post("/login")
-def login(email: str, password: str, session: Session = Depends(get_session)):
+async def login(email: str, password: str, session: Session = Depends(get_session)):
     """Authenticate a user and return JWT token."""
-    user = authenticate_user(session, email, password)
+    try:
+        user = await authenticate_user_async(session, email, password)
+    except PasswordHasherBusy:
+        raise _password_service_busy()
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,8 +80,11 @@ def login(email: str, password: str, session: Session = Depends(get_session)):
     }
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Dependency to get the current user from the JWT token."""
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Dependency to get the current user from the JWT token.
+    Async so that async endpoints resolve it on the event loop instead of a threadpool worker.
+    """
     token = credentials.credentials
     payload = verify_token(token)
 
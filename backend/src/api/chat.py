@@ -1,15 +1,46 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, Field
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Dict, Any, Optional
 from uuid import UUID
+import os
+from ..database.session import get_async_session
+from ..api.auth import get_current_user
+from ..api.chatbot import chat_error, load_todo_context, require_chatbot_service
+from ..models.conversation import MessagePage
+from ..services.chatbot_service import ChatbotService, ChatMessage
+from ..services.conversation_summarizer import CHAT_SUMMARY_TRIGGER_MESSAGES, ConversationSummarizer
+from ..services.llm_client import ClientDisconnected, run_until_disconnected
+from ..services.conversation_service_async import (
+    get_conversation_async,
+    create_conversation_async,
+    add_message_async,
+    get_messages_page_async
+)
 
 
 router = APIRouter(tags=["chat"])
 
+# Most messages after the summary loaded per turn, should the summarizer fall behind
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", str(2 * CHAT_SUMMARY_TRIGGER_MESSAGES)))
+
+# Compacts long conversations in the background, using the chatbot's model client
+_conversation_summarizer: Optional[ConversationSummarizer] = None
+
+
+def get_conversation_summarizer(
+    chatbot: ChatbotService = Depends(require_chatbot_service)
+) -> ConversationSummarizer:
+    """Dependency providing the shared summarizer, created with the chatbot on first use."""
+    global _conversation_summarizer
+    if _conversation_summarizer is None:
+        _conversation_summarizer = ConversationSummarizer(chatbot.llm)
+    return _conversation_summarizer
+
 
 class ChatRequest(BaseModel):
     conversation_id: Optional[UUID] = None
-    message: str
+    message: str = Field(min_length=1, max_length=5000)
     user_context: Dict[str, Any] = {}
 
 
@@ -20,28 +51,118 @@ class ToolCallInfo(BaseModel):
 
 
 class ChatResponse(BaseModel):
+    conversation_id: UUID
     response: str
     tool_calls: List[ToolCallInfo] = []
 
 
+def _authorize_user(user_id: str, current_user: dict) -> UUID:
+    """Ensure the path's user is the authenticated one."""
+    if user_id != current_user["user_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to access another user's conversations"
+        )
+    return UUID(user_id)
+
+
 @router.post("/users/{user_id}/chat", response_model=ChatResponse)
 async def chat_with_ai(
+    request: Request,
     user_id: str,
-    chat_request: ChatRequest
+    chat_request: ChatRequest,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    chatbot: ChatbotService = Depends(require_chatbot_service),
+    conversation_summarizer: ConversationSummarizer = Depends(get_conversation_summarizer)
 ):
     """
-    Chat endpoint that returns a simple response for testing.
+    Send one message to the assistant.
+
+    Only the new message is sent. Omit `conversation_id` to start a conversation;
+    the response carries the ID to send with the following turns. Both the message
+    and the reply are stored once the reply is generated; a failed turn (504 on a
+    model timeout, 503 when it is overloaded) stores neither, and its detail lists
+    any tools that already ran. The conversation's rolling summary plus the latest
+    messages after it serve as history. The assistant can add, list, complete,
+    update and delete the user's tasks itself; `tool_calls` lists what it ran.
+    If the client disconnects first, the model call is cancelled and nothing is stored.
     """
-    # For now, return a simple mock response to avoid database and API issues
-    print(f"Received chat request from user {user_id}: {chat_request.message}")
+    owner_id = _authorize_user(user_id, current_user)
+
+    if chat_request.conversation_id is None:
+        conversation = await create_conversation_async(session, owner_id)
+    else:
+        conversation = await get_conversation_async(session, chat_request.conversation_id, owner_id)
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+    conversation_id = conversation.id
+    summary, summary_until = conversation.summary, conversation.summary_until
 
-    # Mock response for testing
-    mock_response = f"I received your message: '{chat_request.message}'. This is a mock response for testing purposes."
+    todo_context = await load_todo_context(session, owner_id, chat_request.message)
+    # The messages after the summary, so none falls between the two. The summarizer keeps them
+    # to about CHAT_SUMMARY_TRIGGER_MESSAGES; the cap only bites if it falls behind or fails
+    history, _ = await get_messages_page_async(
+        session, conversation_id, limit=CHAT_HISTORY_MAX_MESSAGES, after=summary_until
+    )
+    messages = [ChatMessage(role=message.role, content=message.content) for message in history]
+    messages.append(ChatMessage(role="user", content=chat_request.message))
+
+    try:
+        # Abandon the model call if the client leaves; tools that already ran stay committed
+        result = await run_until_disconnected(request, chatbot.generate_response(
+            messages=messages,
+            user_context={**todo_context, "conversation_summary": summary, **chat_request.user_context},
+            user_id=owner_id,
+            tools=True
+        ))
+    except ClientDisconnected:
+        # Nobody is left to read the reply, so the turn is not stored either
+        return Response(status_code=499)
+    except Exception as e:
+        # A failed turn is not stored, so retrying it does not repeat the message in the history
+        raise chat_error(e)
+
+    await add_message_async(session, conversation_id, "user", chat_request.message)
+    await add_message_async(session, conversation_id, "assistant", result["response"])
+    # Compacting happens off the request path; this only enqueues the conversation
+    conversation_summarizer.schedule(conversation_id)
 
     return ChatResponse(
-        response=mock_response,
-        tool_calls=[]
+        conversation_id=conversation_id,
+        response=result["response"],
+        tool_calls=[ToolCallInfo(**call) for call in result.get("tool_calls", [])]
     )
 
 
-# Remove the GET endpoint for now to minimize complexity
\ No newline at end of file
+@router.get("/users/{user_id}/conversations/{conversation_id}/messages", response_model=MessagePage)
+async def read_messages(
+    user_id: str,
+    conversation_id: UUID,
+    before: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Load a conversation's latest messages, oldest first.
+    Pass the returned `next_cursor` as `before` to load the page of older ones.
+    """
+    owner_id = _authorize_user(user_id, current_user)
+    if not await get_conversation_async(session, conversation_id, owner_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+
+    try:
+        messages, next_cursor = await get_messages_page_async(session, conversation_id, before, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return MessagePage(items=messages, next_cursor=next_cursor)
@@ -1,17 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from uuid import UUID
-from sqlmodel import Session
-from ..database.session import get_session
+import logging
+import os
+from sqlalchemy.exc import DBAPIError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database.session import get_async_session
 from ..api.auth import get_current_user
-from ..services.chatbot_service import chatbot_service, ChatMessage, ChatResponse
-from ..services.todo_service import get_todos_by_user
+from ..services.chatbot_service import (
+    ChatbotService,
+    ChatbotUnavailable,
+    ChatMessage,
+    ChatResponse,
+    get_chatbot_service
+)
+from ..services.llm_client import (
+    ClientDisconnected,
+    LLMOverloadedError,
+    LLMTimeoutError,
+    run_until_disconnected
+)
+from ..services.todo_service_async import (
+    get_todos_by_user_async,
+    get_todos_version_async,
+    get_todo_stats_async,
+    search_todos_async
+)
 from ..models.user import User
+from ..utils.sse import sse_event
 
 
 router = APIRouter(tags=["chatbot"])
 
+logger = logging.getLogger(__name__)
+
+# Todos matching the message, found by full-text search, that lead the prompt's task list
+CHAT_MATCHING_TODOS = int(os.getenv("CHAT_MATCHING_TODOS", "10"))
+
+
+async def load_todo_context(session: AsyncSession, user_id: UUID, message: str) -> Dict[str, Any]:
+    """
+    The user's todos for the chat prompt, plus the ones matching the message
+    (any of its words), so relevant tasks make it in however long the list is,
+    and their counts for the suggestions. `todo_version` is the database version
+    they were read at, which scopes cached replies.
+    """
+    # Read the version before the todos, so a reply is never cached under newer data than it saw
+    version = await get_todos_version_async(session, user_id)
+
+    matching = []
+    try:
+        # In a savepoint, so a missing search index only costs the matches
+        async with session.begin_nested():
+            matching, _ = await search_todos_async(
+                session, user_id, message, limit=CHAT_MATCHING_TODOS, match_all=False, version=version
+            )
+    except DBAPIError as e:
+        logger.warning(f"Todo search unavailable for chat context: {str(e)}")
+
+    todos = await get_todos_by_user_async(session, user_id, completed=None, skip=0, limit=100, version=version)
+    stats = await get_todo_stats_async(session, user_id, version=version)
+    return {"todos": todos, "matching_todos": matching, "todo_stats": stats, "todo_version": version}
+
+
+def require_chatbot_service() -> ChatbotService:
+    """Dependency providing the chatbot service, or 503 while chat is not configured."""
+    try:
+        return get_chatbot_service()
+    except ChatbotUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Chat is not available: {str(e)}"
+        )
+
+
+def chat_error(e: Exception) -> HTTPException:
+    """
+    Map a failed chat turn to an HTTP error without exposing internal error text:
+    504 for a model timeout, 503 when the model is overloaded, 500 otherwise.
+    Tools that already ran are listed in the detail, since they changed todos.
+    """
+    if isinstance(e, LLMTimeoutError):
+        status_code, message, headers = status.HTTP_504_GATEWAY_TIMEOUT, "The assistant took too long to answer, please retry", None
+    elif isinstance(e, LLMOverloadedError):
+        status_code, message, headers = status.HTTP_503_SERVICE_UNAVAILABLE, "The assistant is busy, please retry shortly", {"Retry-After": "5"}
+    else:
+        logger.error("Error processing chat request", exc_info=e)
+        status_code, message, headers = status.HTTP_500_INTERNAL_SERVER_ERROR, "Error processing chat request", None
+
+    tool_calls = getattr(e, "tool_calls", None)
+    detail: Any = {"message": message, "tool_calls": tool_calls} if tool_calls else message
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
+
 
 class ChatRequest(BaseModel):
     messages: List[ChatMessage]
@@ -19,10 +101,12 @@ class ChatRequest(BaseModel):
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat_with_bot(
+async def chat_with_bot(
+    request: Request,
     chat_request: ChatRequest,
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
+    chatbot: ChatbotService = Depends(require_chatbot_service)
 ):
     """
     Chat with the AI assistant. The assistant can help with:
@@ -34,27 +118,72 @@ def chat_with_bot(
         # Get the current user's todos to provide context to the AI
         user_id = UUID(current_user["user_id"])
 
-        # Fetch user's todos to provide context
-        user_todos = get_todos_by_user(session, user_id, completed=None, skip=0, limit=100)
+        # Fetch user's todos, led by those matching the message, to provide context
+        message = chat_request.messages[-1].content if chat_request.messages else ""
+        todo_context = await load_todo_context(session, user_id, message)
 
         # Prepare user context with todos
         user_context = {
-            "todos": user_todos,
+            **todo_context,
             **chat_request.user_context  # Include any additional context from the request
         }
 
-        # Generate response using the Gemini-powered chatbot service
-        result = chatbot_service.generate_response(
+        # Generate response using the Gemini-powered chatbot service; abandon it if the client leaves
+        result = await run_until_disconnected(request, chatbot.generate_response(
             messages=chat_request.messages,
-            user_context=user_context
-        )
+            user_context=user_context,
+            user_id=user_id
+        ))
 
         return ChatResponse(
             response=result["response"],
-            suggestions=result["suggestions"]
+            suggestions=result["suggestions"],
+            prompt_tokens=result.get("prompt_tokens")
         )
+    except ClientDisconnected:
+        # Nobody is left to read the reply; 499 is the conventional "client closed request" status
+        return Response(status_code=499)
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing chat request: {str(e)}"
-        )
\ No newline at end of file
+        raise chat_error(e)
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_bot(
+    chat_request: ChatRequest,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    chatbot: ChatbotService = Depends(require_chatbot_service)
+):
+    """
+    Chat with the AI assistant, streaming the reply as Server-Sent Events.
+
+    Each text chunk arrives as a `data: {"delta": ...}` event as soon as the model
+    produces it. The stream ends with an `event: done` carrying the suggestions,
+    or an `event: error` if generation fails part-way.
+    """
+    user_id = UUID(current_user["user_id"])
+    message = chat_request.messages[-1].content if chat_request.messages else ""
+    user_context = {
+        **await load_todo_context(session, user_id, message),
+        **chat_request.user_context
+    }
+
+    async def events():
+        try:
+            # Starlette cancels this generator when the client disconnects, which cancels the model call
+            async for text in chatbot.stream_response(chat_request.messages, user_context, user_id=user_id):
+                yield sse_event({"delta": text})
+        except Exception as e:
+            error = chat_error(e)
+            yield sse_event({"detail": error.detail, "status": error.status_code}, event="error")
+            return
+
+        suggestions = chatbot.get_suggestions(chat_request.messages, user_context)
+        yield sse_event({"suggestions": suggestions}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream, which would defeat the early first byte
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,61 @@
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from ..database.session import get_pool_stats
+from ..services.response_cache import response_cache
+from ..services.todo_cache import todo_cache
+from ..services.todo_events import todo_feed
+from ..services.todo_tools import tool_batcher
+from ..utils.jwt import token_cache
+
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+# Internal endpoints are disabled (404) unless a token is configured
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(default=None)) -> None:
+    """Dependency guarding operator-only endpoints behind the X-Internal-Token header."""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not x_internal_token or not secrets.compare_digest(x_internal_token, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
+
+
+@router.get("/pool-stats", dependencies=[Depends(require_internal_token)])
+async def pool_stats():
+    """Connection pool occupancy, checkout wait times and timeouts for both engines."""
+    return get_pool_stats()
+
+
+@router.get("/cache-stats", dependencies=[Depends(require_internal_token)])
+async def cache_stats():
+    """Hit/miss and invalidation counters for the todo read-through cache."""
+    return todo_cache.stats()
+
+
+@router.get("/token-cache-stats", dependencies=[Depends(require_internal_token)])
+async def token_cache_stats():
+    """Hit/miss counters and occupancy of the verified JWT cache."""
+    return token_cache.stats()
+
+
+@router.get("/chat-cache-stats", dependencies=[Depends(require_internal_token)])
+async def chat_cache_stats():
+    """Exact and similarity hit rates of the chatbot response cache."""
+    return response_cache.stats()
+
+
+@router.get("/feed-stats", dependencies=[Depends(require_internal_token)])
+async def feed_stats():
+    """Subscribers and published, delivered and resync counts of the todo change feed."""
+    return todo_feed.stats()
+
+
+@router.get("/tool-stats", dependencies=[Depends(require_internal_token)])
+async def tool_stats():
+    """Per-tool latency and error counts, and how many calls each unit of work grouped."""
+    return tool_batcher.stats.snapshot()
@@ -0,0 +1,68 @@
+import asyncio
+import os
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from ..api.auth import get_current_user
+from ..services.todo_events import todo_feed
+from ..utils.jwt import verify_token
+from ..utils.sse import sse_event
+
+
+router = APIRouter(tags=["todos"])
+
+# Idle seconds before a keepalive is sent, which also detects clients that went away
+TODO_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("TODO_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+
+@router.get("/todos/events")
+async def stream_todo_events(current_user: dict = Depends(get_current_user)):
+    """
+    Push the user's todo changes as Server-Sent Events, as they are committed.
+
+    Each event is named after its type ("created", "updated", "toggled" or
+    "deleted") and carries the todo, or its `id` for deletions. A "resync" event
+    means changes were missed and the list should be fetched again.
+    """
+    user_id = UUID(current_user["user_id"])
+
+    async def events():
+        # Starlette cancels this generator when the client disconnects, which ends the subscription
+        async with todo_feed.subscribe(user_id) as queue:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), TODO_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(event, event=event["type"])
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/todos/ws")
+async def todo_events_socket(websocket: WebSocket, token: str = Query(...)):
+    """
+    The same change feed over a WebSocket, one JSON message per event.
+    Browsers cannot set headers on WebSockets, so the access token comes as `?token=`.
+    """
+    payload = verify_token(token)
+    if payload is None or payload.get("sub") is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    async with todo_feed.subscribe(UUID(payload["sub"])) as queue:
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), TODO_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    event = {"type": "ping"}
+                await websocket.send_json(event)
+        except WebSocketDisconnect:
+            pass
@@ -1,76 +1,329 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
-from ..database.session import get_session
-from ..models.todo import Todo, TodoCreate, TodoRead, TodoUpdate
+from pydantic_core import to_json
+from ..database.session import get_async_session
+from ..models.todo import (
+    Todo,
+    TodoCreate,
+    TodoRead,
+    TodoUpdate,
+    TodoPage,
+    TodoBatchUpdateItem,
+    TodoBatchDelete,
+    TodoBatchResult,
+    TodoBatchResponse,
+    TodoDeleteCount,
+    TodoChanges,
+    TodoStats
+)
 from ..api.auth import get_current_user
-from ..services.todo_service import (
-    create_todo,
-    get_todos_by_user,
-    get_todo_by_id_and_user,
-    update_todo_by_id_and_user,
-    delete_todo_by_id_and_user,
-    toggle_todo_completion
+from ..services.todo_service_async import (
+    create_todo_async,
+    get_todo_rows_by_user_async,
+    get_todo_rows_page_by_user_async,
+    get_todo_by_id_and_user_async,
+    update_todo_by_id_and_user_async,
+    delete_todo_by_id_and_user_async,
+    toggle_todo_completion_async,
+    create_todos_async,
+    update_todos_async,
+    delete_todos_async,
+    delete_completed_todos_async,
+    get_todo_changes_async,
+    get_todo_stats_async,
+    get_todos_version_async,
+    search_todos_async
 )
 
 
 router = APIRouter(tags=["todos"])
 
+# Upper bound on items per batch request, so one call cannot hold a transaction open indefinitely
+MAX_BATCH_SIZE = 500
+
+
+def _check_batch_size(size: int) -> None:
+    if size == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch must contain at least one item"
+        )
+    if size > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch cannot contain more than {MAX_BATCH_SIZE} items"
+        )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
 
-@router.get("/todos", response_model=list[TodoRead])
-def read_todos(
+
+def _weak_etag(version: str) -> str:
+    return f'W/"{version}"'
+
+
+def _json_response(content: Any, headers: Dict[str, str]) -> Response:
+    """
+    Encode already JSON-ready data in one pass, skipping FastAPI's response_model
+    validation and jsonable_encoder; the output matches what they would produce.
+    """
+    return Response(content=to_json(content), media_type="application/json", headers=headers)
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+@router.get("/todos", response_model=Union[list[TodoRead], TodoPage])
+async def read_todos(
     completed: Optional[bool] = None,
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Retrieve all todos for the authenticated user."""
+    """
+    Retrieve all todos for the authenticated user.
+
+    Passing `cursor` switches to keyset pagination: an empty cursor returns the
+    first page, and each page carries the `next_cursor` for the one after it.
+    Responses carry an ETag; sending it back in If-None-Match returns 304 while
+    the user's todos are unchanged.
+
+    Rows are selected as plain TodoRead columns and encoded directly to JSON,
+    with no ORM objects or per-row validation.
+    """
     user_id = UUID(current_user["user_id"])
-    todos = get_todos_by_user(session, user_id, completed, skip, limit)
-    return todos
+
+    # Read the version before the rows, so the ETag never claims newer data than was sent
+    version = await get_todos_version_async(session, user_id)
+    etag = _weak_etag(version)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if cursor is not None:
+        try:
+            items, next_cursor = await get_todo_rows_page_by_user_async(session, user_id, completed, cursor, limit, version=version)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return _json_response({"items": items, "next_cursor": next_cursor}, headers)
+
+    rows = await get_todo_rows_by_user_async(session, user_id, completed, skip, limit, version=version)
+    return _json_response(rows, headers)
 
 
 @router.post("/todos", response_model=TodoRead, status_code=status.HTTP_201_CREATED)
-def create_todo_endpoint(
+async def create_todo_endpoint(
     todo: TodoCreate,
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Create a new todo for the authenticated user."""
     user_id = UUID(current_user["user_id"])
-    return create_todo(session, todo, user_id)
+    return await create_todo_async(session, todo, user_id)
+
+
+# The batch, /completed, /changes, /search and /stats routes must be registered before
+# /todos/{todo_id}, otherwise their names would be matched as a todo ID.
+@router.post("/todos/batch", response_model=TodoBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_todos_batch(
+    todos: List[TodoCreate],
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Create several todos for the authenticated user in one transaction."""
+    _check_batch_size(len(todos))
+    user_id = UUID(current_user["user_id"])
+    created = await create_todos_async(session, todos, user_id)
+    return TodoBatchResponse(results=[
+        TodoBatchResult(id=db_todo.id, status="created", todo=db_todo) for db_todo in created
+    ])
+
+
+@router.patch("/todos/batch", response_model=TodoBatchResponse)
+async def update_todos_batch(
+    items: List[TodoBatchUpdateItem],
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Update several todos for the authenticated user in one transaction.
+    IDs that do not exist or belong to another user are reported as "not_found".
+    """
+    _check_batch_size(len(items))
+    user_id = UUID(current_user["user_id"])
+    updated = await update_todos_async(session, user_id, items)
+    results = []
+    for item in items:
+        db_todo = updated.get(item.id)
+        if db_todo:
+            results.append(TodoBatchResult(id=item.id, status="updated", todo=db_todo))
+        else:
+            results.append(TodoBatchResult(id=item.id, status="not_found"))
+    return TodoBatchResponse(results=results)
+
+
+@router.delete("/todos/batch", response_model=TodoBatchResponse)
+async def delete_todos_batch(
+    batch: TodoBatchDelete,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Delete several todos for the authenticated user in one statement.
+    IDs that do not exist or belong to another user are reported as "not_found".
+    """
+    _check_batch_size(len(batch.ids))
+    user_id = UUID(current_user["user_id"])
+    deleted = await delete_todos_async(session, user_id, batch.ids)
+    return TodoBatchResponse(results=[
+        TodoBatchResult(id=todo_id, status="deleted" if todo_id in deleted else "not_found")
+        for todo_id in batch.ids
+    ])
+
+
+@router.delete("/todos/completed", response_model=TodoDeleteCount)
+async def delete_completed_todos(
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Delete all completed todos for the authenticated user."""
+    user_id = UUID(current_user["user_id"])
+    deleted = await delete_completed_todos_async(session, user_id)
+    return TodoDeleteCount(deleted=deleted)
+
+
+@router.get("/todos/changes", response_model=TodoChanges)
+async def read_todo_changes(
+    since: Optional[str] = None,
+    limit: int = Query(default=1000, ge=1, le=5000),
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Delta sync: todos created or updated after the `since` watermark, and the IDs
+    of todos deleted since then.
+
+    Store the returned `watermark` and send it as `since` next time; while
+    `has_more` is set, call again straight away. Without `since`, or with one
+    from a sync that started before the oldest deletion kept, the whole list is
+    returned, its first page with `reset`.
+    """
+    user_id = UUID(current_user["user_id"])
+    try:
+        return await get_todo_changes_async(session, user_id, since, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/todos/search", response_model=TodoPage)
+async def search_todos(
+    q: str = Query(min_length=1, max_length=200),
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Full-text search over the user's todo titles and descriptions.
+
+    Every word of `q` must match, as a prefix ("gro" finds "groceries"). Results
+    come best match first; pass `next_cursor` back as `cursor` for the next page.
+    """
+    user_id = UUID(current_user["user_id"])
+    try:
+        todos, next_cursor = await search_todos_async(session, user_id, q, completed, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return TodoPage(items=todos, next_cursor=next_cursor)
+
+
+@router.get("/todos/stats", response_model=TodoStats)
+async def read_todo_stats(
+    response: Response,
+    days: int = Query(default=30, ge=1, le=365),
+    if_none_match: Optional[str] = Header(default=None),
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Totals of the user's todos (total, pending, completed) and todos created and
+    completed per day over the last `days` days, computed in one SQL query
+    (supports If-None-Match).
+    """
+    user_id = UUID(current_user["user_id"])
+
+    version = await get_todos_version_async(session, user_id)
+    # The per-day window moves at midnight even without writes
+    etag = _weak_etag(f"{version}-{datetime.utcnow().date()}")
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    return await get_todo_stats_async(session, user_id, days, version=version)
 
 
 @router.get("/todos/{todo_id}", response_model=TodoRead)
-def read_todo(
+async def read_todo(
     todo_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Retrieve a specific todo by ID for the authenticated user."""
+    """Retrieve a specific todo by ID for the authenticated user (supports If-None-Match)."""
     user_id = UUID(current_user["user_id"])
-    db_todo = get_todo_by_id_and_user(session, todo_id, user_id)
+
+    version = await get_todos_version_async(session, user_id)
+    etag = _weak_etag(version)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    db_todo = await get_todo_by_id_and_user_async(session, todo_id, user_id, version=version)
     if not db_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     return db_todo
 
 
 @router.put("/todos/{todo_id}", response_model=TodoRead)
-def update_todo(
+async def update_todo(
     todo_id: UUID,
     todo_update: TodoUpdate,
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Update a specific todo by ID for the authenticated user."""
     user_id = UUID(current_user["user_id"])
-    updated_todo = update_todo_by_id_and_user(session, todo_id, user_id, todo_update)
+    updated_todo = await update_todo_by_id_and_user_async(session, todo_id, user_id, todo_update)
     if not updated_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,14 +334,14 @@ def update_todo(
 
 
 @router.patch("/todos/{todo_id}/complete", response_model=TodoRead)
-def toggle_todo_complete(
+async def toggle_todo_complete(
     todo_id: UUID,
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Toggle the completion status of a specific todo."""
     user_id = UUID(current_user["user_id"])
-    toggled_todo = toggle_todo_completion(session, todo_id, user_id)
+    toggled_todo = await toggle_todo_completion_async(session, todo_id, user_id)
     if not toggled_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,18 +352,18 @@ def toggle_todo_complete(
 
 
 @router.delete("/todos/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_todo(
+async def delete_todo(
     todo_id: UUID,
     current_user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Delete a specific todo by ID for the authenticated user."""
     user_id = UUID(current_user["user_id"])
-    success = delete_todo_by_id_and_user(session, todo_id, user_id)
+    success = await delete_todo_by_id_and_user_async(session, todo_id, user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
 
-    return
\ No newline at end of file
+    return
@@ -1,6 +1,7 @@
-from .session import get_session, create_db_and_tables
+from .session import get_session, get_async_session, create_db_and_tables
 
 __all__ = [
     "get_session",
+    "get_async_session",
     "create_db_and_tables"
 ]
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Online index and column migrations.
+
+`create_db_and_tables` only creates indexes together with brand new tables, so an
+existing database never picks up indexes added to the models later. This module
+creates every index declared on the SQLModel classes that the database is missing.
+On PostgreSQL it uses CREATE INDEX CONCURRENTLY, so the tables stay writable while
+the indexes build. Nullable columns added to the models later are added with
+ALTER TABLE ... ADD COLUMN, which does not rewrite the table, and tables added
+later are created. The full-text search structures from `search.py` are installed last.
+
+Run it against the configured DATABASE_URL with:
+
+    python -m src.database.migrations
+"""
+import logging
+from typing import List
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from sqlmodel import SQLModel
+from .search import install_search
+
+# Import the models so their tables and indexes are registered on the metadata
+from .. import models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+def declared_indexes() -> List[Index]:
+    """Return every index declared on the SQLModel tables."""
+    indexes = []
+    for table in SQLModel.metadata.sorted_tables:
+        indexes.extend(sorted(table.indexes, key=lambda index: index.name))
+    return indexes
+
+
+def _drop_invalid_postgres_index(connection, index: Index) -> None:
+    """Drop an index left INVALID by an interrupted CREATE INDEX CONCURRENTLY."""
+    invalid = connection.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": index.name},
+    ).first()
+    if invalid:
+        logger.warning(f"Dropping invalid index {index.name} before rebuilding it")
+        connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"')
+
+
+def create_indexes(engine: Engine) -> List[str]:
+    """
+    Create the declared indexes that the database does not have yet.
+    Returns the names of the indexes that were created.
+    """
+    created = []
+    is_postgres = engine.dialect.name == "postgresql"
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+
+        for index in declared_indexes():
+            table_name = index.table.name
+            if table_name not in existing_tables:
+                # create_db_and_tables will build the table together with its indexes
+                continue
+
+            if is_postgres:
+                _drop_invalid_postgres_index(connection, index)
+
+            existing = {i["name"] for i in inspect(connection).get_indexes(table_name)}
+            if index.name in existing:
+                continue
+
+            statement = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            if is_postgres:
+                statement = statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+
+            logger.info(f"Creating index {index.name} on {table_name}")
+            connection.exec_driver_sql(statement)
+            created.append(index.name)
+
+    return created
+
+
+def create_tables(engine: Engine) -> List[str]:
+    """
+    Create declared tables the database does not have yet, with their indexes.
+    Returns the names of the tables that were created.
+    """
+    existing = set(inspect(engine).get_table_names())
+    missing = [table for table in SQLModel.metadata.sorted_tables if table.name not in existing]
+    SQLModel.metadata.create_all(bind=engine, tables=missing)
+    for table in missing:
+        logger.info(f"Created table {table.name}")
+    return [table.name for table in missing]
+
+
+def add_columns(engine: Engine) -> List[str]:
+    """
+    Add declared nullable columns that existing tables are missing.
+    Returns the added columns as "table.column".
+    """
+    added = []
+    preparer = engine.dialect.identifier_preparer
+
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning(f"Skipping NOT NULL column {table.name}.{column.name}; it needs a manual migration")
+                    continue
+
+                definition = str(CreateColumn(column).compile(dialect=engine.dialect))
+                logger.info(f"Adding column {table.name}.{column.name}")
+                connection.exec_driver_sql(f"ALTER TABLE {preparer.quote(table.name)} ADD COLUMN {definition}")
+                added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def main():
+    """Add missing tables, columns, indexes and search structures on the configured database."""
+    from .session import engine
+
+    logging.basicConfig(level=logging.INFO)
+    tables = create_tables(engine)
+    if tables:
+        print(f"Created {len(tables)} table(s): {', '.join(tables)}")
+
+    added = add_columns(engine)
+    if added:
+        print(f"Added {len(added)} column(s): {', '.join(added)}")
+
+    created = create_indexes(engine)
+    if created:
+        print(f"Created {len(created)} index(es): {', '.join(created)}")
+    else:
+        print("All declared indexes already exist")
+
+    if install_search(engine):
+        print("Installed full-text search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Dict, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+
+class PoolStats:
+    """Checkout wait times and timeouts for one connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self, pool: Pool) -> Dict[str, object]:
+        """Combine the recorded counters with the pool's live occupancy."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            stats = {
+                "pool_class": type(pool).__mro__[1].__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total * 1000 / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+        # Only queue-based pools track size and overflow
+        for key, method in (("size", "size"), ("checked_out", "checkedout"),
+                            ("checked_in", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                stats[key] = getattr(pool, method)()
+        stats["timeout_s"] = getattr(pool, "_timeout", None)
+        return stats
+
+
+def instrumented_pool_class(pool_class: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Return a subclass of `pool_class` that times every checkout into `stats`.
+
+    The stats live on the class rather than the instance, so they survive
+    pool.recreate() after an engine dispose.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = pool_class._do_get(self)
+        except exc.TimeoutError:
+            stats.record_timeout(time.perf_counter() - started)
+            raise
+        stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+    return type(f"Instrumented{pool_class.__name__}", (pool_class,), {"_do_get": _do_get, "stats": stats})
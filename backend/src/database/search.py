@@ -0,0 +1,92 @@
+"""
+Full-text search structures for todos, which the SQLModel metadata cannot declare.
+
+PostgreSQL gets a GIN index over a `tsvector` of each todo's title and
+description, built CONCURRENTLY so the table stays writable. SQLite gets an
+FTS5 table holding a copy of each todo's title and description, kept in sync
+by triggers and filled from existing rows when it is first created. `todo` has
+a UUID primary key, so its implicit rowid is not stable (VACUUM may renumber
+it); instead a side table gives each todo an INTEGER PRIMARY KEY, which SQLite
+never renumbers, and the FTS rows use it as their rowid. The triggers' updates
+and deletes are then rowid lookups rather than scans of the FTS table. Other
+databases fall back to unindexed LIKE matching.
+
+`python -m src.database.migrations` installs them on the configured database.
+"""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration; "simple" lowercases without stemming, so prefix matches stay predictable
+SEARCH_CONFIG = "simple"
+# Must match the expression in the GIN index exactly, or PostgreSQL will not use it
+SEARCH_DOCUMENT_SQL = f"to_tsvector('{SEARCH_CONFIG}', todo.title || ' ' || coalesce(todo.description, ''))"
+SEARCH_INDEX = "ix_todo_search"
+FTS_TABLE = "todo_fts"
+# Stable integer key of each todo, used as its FTS rowid
+FTS_KEY_TABLE = "todo_fts_key"
+
+_FTS_ROWID = f"(SELECT id FROM {FTS_KEY_TABLE} WHERE todo_id = {{row}}.id)"
+
+_SQLITE_DDL = [
+    f"CREATE TABLE {FTS_KEY_TABLE} (id INTEGER PRIMARY KEY, todo_id NOT NULL UNIQUE)",
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description, tokenize='unicode61')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON todo BEGIN "
+    f"INSERT INTO {FTS_KEY_TABLE}(todo_id) VALUES (new.id); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES ({_FTS_ROWID.format(row='new')}, new.title, new.description); "
+    "END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON todo BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = {_FTS_ROWID.format(row='old')}; "
+    f"DELETE FROM {FTS_KEY_TABLE} WHERE todo_id = old.id; "
+    "END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF title, description ON todo BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description WHERE rowid = {_FTS_ROWID.format(row='old')}; "
+    "END",
+    # Index the rows that existed before the triggers
+    f"INSERT INTO {FTS_KEY_TABLE}(todo_id) SELECT id FROM todo",
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) "
+    f"SELECT {FTS_KEY_TABLE}.id, todo.title, todo.description FROM {FTS_KEY_TABLE} JOIN todo ON todo.id = {FTS_KEY_TABLE}.todo_id",
+]
+
+
+def install_search(engine: Engine) -> bool:
+    """
+    Create the search index (PostgreSQL) or FTS table and triggers (SQLite) if missing.
+    Returns True if anything was created.
+    """
+    dialect = engine.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return False
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        inspector = inspect(connection)
+        if "todo" not in inspector.get_table_names():
+            # create_db_and_tables has not run yet; install again afterwards
+            return False
+
+        if dialect == "postgresql":
+            if SEARCH_INDEX in {i["name"] for i in inspector.get_indexes("todo")}:
+                return False
+            logger.info(f"Creating index {SEARCH_INDEX} on todo")
+            connection.exec_driver_sql(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {SEARCH_INDEX} ON todo USING gin ({SEARCH_DOCUMENT_SQL})"
+            )
+            return True
+
+        if FTS_TABLE in inspector.get_table_names():
+            return False
+
+        logger.info(f"Creating {FTS_TABLE} and its triggers")
+        # One write transaction, so no todo written meanwhile is missed or indexed twice
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            for statement in _SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+        return True
@@ -1,12 +1,13 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlmodel import Session, SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
 from typing import Generator, AsyncGenerator
 import os
-from contextlib import contextmanager
 from contextlib import asynccontextmanager
+from .pool_stats import PoolStats, instrumented_pool_class
+from .search import install_search
 
 
 # Get database URL from environment, with a default for development
@@ -15,39 +16,99 @@ DATABASE_URL = os.getenv(
     "sqlite:///./todo_app.db"  # Using SQLite for local development
 )
 
-# Create sync and async engines with connection pooling (skip for SQLite)
+
+def _pool_setting(name: str, default: str, prefix: str = "DB_") -> str:
+    """Read a pool setting, letting DB_ASYNC_* override the shared DB_* value for the async engine."""
+    return os.getenv(f"{prefix}{name}", os.getenv(f"DB_{name}", default))
+
+
+def _pool_kwargs(prefix: str = "DB_") -> dict:
+    """Pool sizing, timeouts and recycling from the environment."""
+    return {
+        "pool_size": int(_pool_setting("POOL_SIZE", "5", prefix)),
+        "max_overflow": int(_pool_setting("MAX_OVERFLOW", "10", prefix)),
+        "pool_timeout": float(_pool_setting("POOL_TIMEOUT", "30", prefix)),
+        "pool_recycle": int(_pool_setting("POOL_RECYCLE", "300", prefix)),
+        "pool_pre_ping": _pool_setting("POOL_PRE_PING", "true", prefix).lower() in ("1", "true", "yes"),
+    }
+
+
+# Checkout wait/timeout counters per engine, reported by /api/internal/pool-stats
+sync_pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
 if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL)
-    async_engine = create_async_engine("sqlite+aiosqlite:///./todo_app.db")
+    # Sessions are handed across threadpool workers, so don't pin connections to one thread
+    async_db_url = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    connect_args = {"check_same_thread": False}
 else:
-    engine = create_engine(
-        DATABASE_URL,
-        poolclass=QueuePool,
-        pool_size=5,
-        max_overflow=10,
-        pool_pre_ping=True,
-        pool_recycle=300,
-    )
-    # For async operations, we need to create an async engine
-    # Extract the database URL and convert it to async format
+    # For async operations, convert the database URL to the asyncpg driver
     async_db_url = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
-    async_engine = create_async_engine(async_db_url)
+    connect_args = {}
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    poolclass=instrumented_pool_class(QueuePool, sync_pool_stats),
+    **_pool_kwargs(),
+)
+async_engine = create_async_engine(
+    async_db_url,
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_stats),
+    **_pool_kwargs("DB_ASYNC_"),
+)
+
+
+def get_pool_stats() -> dict:
+    """Live occupancy plus checkout wait/timeout counters for both engines."""
+    return {
+        "sync": sync_pool_stats.snapshot(engine.pool),
+        "async": async_pool_stats.snapshot(async_engine.pool),
+    }
 
 
 def create_db_and_tables():
-    """Create database tables"""
+    """Create database tables, plus the full-text search index the metadata cannot declare"""
     SQLModel.metadata.create_all(bind=engine)
+    install_search(engine)
 
 
-@contextmanager
 def get_session() -> Generator[Session, None, None]:
-    """Provide a transactional scope around a series of operations."""
+    """Provide a transactional scope around a series of operations (FastAPI dependency)."""
     with Session(engine) as session:
         yield session
 
 
+async def get_async_session() -> AsyncGenerator[SQLModelAsyncSession, None]:
+    """Provide a per-request async session on the async engine (FastAPI dependency)."""
+    # Objects stay usable after commit; lazy refreshes would need a greenlet in async code
+    async with SQLModelAsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 @asynccontextmanager
 async def get_session_context() -> AsyncGenerator[SQLModelAsyncSession, None]:
     """Provide an async transactional scope around a series of operations."""
     async with SQLModelAsyncSession(async_engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+class UnitOfWorkSession(SQLModelAsyncSession):
+    """
+    Async session whose commit() only flushes, so service functions that commit
+    after each write can share one transaction. commit_unit() commits it.
+    """
+
+    async def commit(self) -> None:
+        await self.flush()
+
+    async def commit_unit(self) -> None:
+        await super().commit()
+
+
+@asynccontextmanager
+async def get_unit_of_work() -> AsyncGenerator[UnitOfWorkSession, None]:
+    """Provide one transaction for several service calls, committed when the block exits cleanly."""
+    async with UnitOfWorkSession(async_engine, expire_on_commit=False) as session:
+        yield session
+        await session.commit_unit()
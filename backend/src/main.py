@@ -1,9 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api import auth_router, todos_router
-# Temporarily exclude chat routers to troubleshoot
-# from .api import chatbot_router, chat_router
+from .api import auth_router, todos_router, todo_events_router, internal_router, chatbot_router, chat_router
 from .database import create_db_and_tables
+from .services.todo_events import todo_feed
 import os
 
 # Load environment variables from .env file
@@ -25,10 +24,13 @@ def create_app():
 
     # Include routers
     app.include_router(auth_router, prefix="/api")
+    # Ahead of the todos router, so /todos/events is not taken for a todo ID
+    app.include_router(todo_events_router, prefix="/api")
     app.include_router(todos_router, prefix="/api")
-    # Temporarily exclude chat routers to troubleshoot
-    # app.include_router(chatbot_router, prefix="/api")
-    # app.include_router(chat_router, prefix="/api")
+    app.include_router(internal_router, prefix="/api")
+    # Chat endpoints set up their model on first use and answer 503 if it is not configured
+    app.include_router(chatbot_router, prefix="/api")
+    app.include_router(chat_router, prefix="/api")
 
     @app.on_event("startup")
     def on_startup():
@@ -40,6 +42,15 @@ def create_app():
             print(f"Warning: Could not initialize database: {e}")
             print("App will run without database functionality")
 
+    @app.on_event("startup")
+    async def start_change_feed():
+        # Binds the feed to the server's loop, so writes made on threadpool workers reach it too
+        await todo_feed.start()
+
+    @app.on_event("shutdown")
+    async def stop_change_feed():
+        await todo_feed.stop()
+
     @app.get("/")
     def read_root():
         return {"message": "Welcome to the Todo API"}
@@ -1,26 +1,76 @@
 import asyncio
+import json
 import logging
+import os
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 from mcp.server import Server
 from mcp.types import Tool, Argument, Result, Notification
-from ..models.todo import Todo, TodoCreate, TodoUpdate
-from ..database.session import get_session_context
-from ..services.todo_service_async import (
-    create_todo_async,
-    get_todos_by_user_async,
-    get_todo_by_id_and_user_async,
-    update_todo_by_id_and_user_async,
-    delete_todo_by_id_and_user_async,
-    toggle_todo_completion_async
-)
+from ..services.todo_tools import ToolResult, run_tool
 
 logger = logging.getLogger(__name__)
 
+# Most pages a streaming list_tasks call sends before handing back a cursor
+MCP_LIST_STREAM_MAX_PAGES = int(os.getenv("MCP_LIST_STREAM_MAX_PAGES", "50"))
+
 # Initialize the MCP server
 todo_mcp_server = Server("todo-assistant")
 
 
+def _to_result(result: ToolResult) -> Result:
+    kwargs = {"metadata": result.metadata} if result.metadata else {}
+    if result.is_error:
+        kwargs["isError"] = True
+    return Result(content=result.content, **kwargs)
+
+
+async def _run(name: str, arguments: Dict[str, Any]) -> Result:
+    """
+    Run a todo tool for the user named in the arguments; the implementations are shared with the chat endpoint.
+    Calls arriving in the same tick share one session and transaction.
+    """
+    try:
+        user_id = UUID(arguments["user_id"])
+    except (KeyError, ValueError) as e:
+        return Result(content=f"Invalid user_id: {str(e)}", isError=True)
+    return _to_result(await run_tool(name, user_id, arguments))
+
+
+async def _stream_task_pages(arguments: Dict[str, Any]) -> Result:
+    """
+    Send every page of list_tasks as a progress notification on the calling
+    request, then return a summary carrying the cursor to resume from (None
+    once all pages were sent). Without a progress token, only the first page
+    is returned.
+    """
+    context = todo_mcp_server.request_context
+    progress_token = context.meta.progressToken if context.meta else None
+    if progress_token is None:
+        return await _run("list_tasks", arguments)
+
+    arguments = dict(arguments)
+    sent = 0
+    for _ in range(MCP_LIST_STREAM_MAX_PAGES):
+        result = await _run("list_tasks", arguments)
+        if result.isError:
+            return result
+
+        sent += result.metadata["task_count"]
+        await context.session.send_progress_notification(
+            progress_token,
+            progress=sent,
+            message=json.dumps(result.metadata)
+        )
+        arguments["cursor"] = result.metadata["next_cursor"]
+        if not arguments["cursor"]:
+            break
+
+    return Result(
+        content=f"Sent {sent} tasks as progress notifications.",
+        metadata={"task_count": sent, "next_cursor": arguments["cursor"]}
+    )
+
+
 @todo_mcp_server.tool(
     "add_task",
     description="Add a new task to the user's todo list",
@@ -34,77 +84,29 @@ async def add_task_handler(arguments: Dict[str, Any]) -> Result:
     """
     Add a new task to the user's todo list.
     """
-    try:
-        user_id = UUID(arguments["user_id"])
-        title = arguments["title"]
-        description = arguments.get("description", "")
-
-        # Create a new todo object
-        todo_create = TodoCreate(
-            title=title,
-            description=description
-        )
-
-        # Use the async service to create the todo
-        async with get_session_context() as session:
-            new_todo = await create_todo_async(session, todo_create, user_id)
-
-        return Result(
-            content=f"Successfully added task: {new_todo.title}",
-            metadata={"task_id": str(new_todo.id)}
-        )
-    except Exception as e:
-        logger.error(f"Error adding task: {str(e)}")
-        return Result(
-            content=f"Error adding task: {str(e)}",
-            isError=True
-        )
+    return await _run("add_task", arguments)
 
 
 @todo_mcp_server.tool(
     "list_tasks",
-    description="List all tasks for a user",
+    description="List a user's tasks one page at a time, as structured rows plus a next_cursor",
     arguments=[
         Argument(name="user_id", type="string", description="The UUID of the user"),
         Argument(name="completed", type="boolean", description="Filter by completion status (true for completed, false for pending, null for all)", required=False),
+        Argument(name="query", type="string", description="Full-text search over titles and descriptions, best match first", required=False),
+        Argument(name="sort", type="string", description="Creation order without a query: oldest (default) or newest", required=False),
+        Argument(name="page_size", type="integer", description="Tasks per page", required=False),
+        Argument(name="cursor", type="string", description="next_cursor from the previous page", required=False),
+        Argument(name="stream", type="boolean", description="Send all pages as progress notifications instead of returning one", required=False),
     ],
 )
 async def list_tasks_handler(arguments: Dict[str, Any]) -> Result:
     """
-    List all tasks for a user.
+    List one page of a user's tasks, or stream every page with `stream`.
     """
-    try:
-        user_id = UUID(arguments["user_id"])
-        completed = arguments.get("completed", None)
-
-        # Use the async service to get todos
-        async with get_session_context() as session:
-            todos = await get_todos_by_user_async(session, user_id, completed, skip=0, limit=100)
-
-        if not todos:
-            return Result(content="No tasks found for this user.")
-
-        # Format the tasks for display
-        task_list = []
-        for todo in todos:
-            status = "✓" if todo.is_completed else "○"
-            task_str = f"{status} [{todo.id}] {todo.title}"
-            if todo.description:
-                task_str += f" - {todo.description}"
-            task_list.append(task_str)
-
-        content = "Your tasks:\n" + "\n".join([f"- {task}" for task in task_list])
-
-        return Result(
-            content=content,
-            metadata={"task_count": len(todos)}
-        )
-    except Exception as e:
-        logger.error(f"Error listing tasks: {str(e)}")
-        return Result(
-            content=f"Error listing tasks: {str(e)}",
-            isError=True
-        )
+    if arguments.get("stream"):
+        return await _stream_task_pages(arguments)
+    return await _run("list_tasks", arguments)
 
 
 @todo_mcp_server.tool(
@@ -119,30 +121,7 @@ async def complete_task_handler(arguments: Dict[str, Any]) -> Result:
     """
     Mark a task as complete.
     """
-    try:
-        user_id = UUID(arguments["user_id"])
-        task_id = UUID(arguments["task_id"])
-
-        # Use the async service to toggle completion
-        async with get_session_context() as session:
-            updated_todo = await toggle_todo_completion_async(session, task_id, user_id)
-
-        if not updated_todo:
-            return Result(
-                content="Task not found or you don't have permission to update it.",
-                isError=True
-            )
-
-        return Result(
-            content=f"Successfully marked task as complete: {updated_todo.title}",
-            metadata={"task_id": str(updated_todo.id), "is_completed": updated_todo.is_completed}
-        )
-    except Exception as e:
-        logger.error(f"Error completing task: {str(e)}")
-        return Result(
-            content=f"Error completing task: {str(e)}",
-            isError=True
-        )
+    return await _run("complete_task", arguments)
 
 
 @todo_mcp_server.tool(
@@ -157,27 +136,7 @@ async def delete_task_handler(arguments: Dict[str, Any]) -> Result:
     """
     Delete a task from the user's todo list.
     """
-    try:
-        user_id = UUID(arguments["user_id"])
-        task_id = UUID(arguments["task_id"])
-
-        # Use the async service to delete the todo
-        async with get_session_context() as session:
-            success = await delete_todo_by_id_and_user_async(session, task_id, user_id)
-
-        if not success:
-            return Result(
-                content="Task not found or you don't have permission to delete it.",
-                isError=True
-            )
-
-        return Result(content="Successfully deleted the task.")
-    except Exception as e:
-        logger.error(f"Error deleting task: {str(e)}")
-        return Result(
-            content=f"Error deleting task: {str(e)}",
-            isError=True
-        )
+    return await _run("delete_task", arguments)
 
 
 @todo_mcp_server.tool(
@@ -195,48 +154,7 @@ async def update_task_handler(arguments: Dict[str, Any]) -> Result:
     """
     Update an existing task.
     """
-    try:
-        user_id = UUID(arguments["user_id"])
-        task_id = UUID(arguments["task_id"])
-
-        # Prepare the update object with provided values
-        update_data = {}
-        if "title" in arguments:
-            update_data["title"] = arguments["title"]
-        if "description" in arguments:
-            update_data["description"] = arguments["description"]
-        if "is_completed" in arguments:
-            update_data["is_completed"] = arguments["is_completed"]
-
-        if not update_data:
-            return Result(
-                content="No fields to update were provided.",
-                isError=True
-            )
-
-        # Create the update object
-        todo_update = TodoUpdate(**update_data)
-
-        # Use the async service to update the todo
-        async with get_session_context() as session:
-            updated_todo = await update_todo_by_id_and_user_async(session, task_id, user_id, todo_update)
-
-        if not updated_todo:
-            return Result(
-                content="Task not found or you don't have permission to update it.",
-                isError=True
-            )
-
-        return Result(
-            content=f"Successfully updated task: {updated_todo.title}",
-            metadata={"task_id": str(updated_todo.id)}
-        )
-    except Exception as e:
-        logger.error(f"Error updating task: {str(e)}")
-        return Result(
-            content=f"Error updating task: {str(e)}",
-            isError=True
-        )
+    return await _run("update_task", arguments)
 
 
 # Health check endpoint
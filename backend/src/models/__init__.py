@@ -1,6 +1,22 @@
 from .user import User, UserCreate, UserRead, UserUpdate
-from .todo import Todo, TodoCreate, TodoRead, TodoUpdate
-from .conversation import Conversation, ConversationCreate, ConversationRead, Message, MessageCreate, MessageRead, MessageUpdate
+from .todo import (
+    Todo,
+    TodoCreate,
+    TodoRead,
+    TodoUpdate,
+    TodoPage,
+    TodoBatchUpdateItem,
+    TodoBatchDelete,
+    TodoBatchResult,
+    TodoBatchResponse,
+    TodoDeleteCount,
+    TodoTombstone,
+    TodoTombstoneRead,
+    TodoChanges,
+    TodoDayStats,
+    TodoStats
+)
+from .conversation import Conversation, ConversationCreate, ConversationRead, Message, MessageCreate, MessageRead, MessageUpdate, MessagePage
 
 __all__ = [
     "User",
@@ -11,11 +27,23 @@ __all__ = [
     "TodoCreate",
     "TodoRead",
     "TodoUpdate",
+    "TodoPage",
+    "TodoBatchUpdateItem",
+    "TodoBatchDelete",
+    "TodoBatchResult",
+    "TodoBatchResponse",
+    "TodoDeleteCount",
+    "TodoTombstone",
+    "TodoTombstoneRead",
+    "TodoChanges",
+    "TodoDayStats",
+    "TodoStats",
     "Conversation",
     "ConversationCreate",
     "ConversationRead",
     "Message",
     "MessageCreate",
     "MessageRead",
-    "MessageUpdate"
+    "MessageUpdate",
+    "MessagePage"
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional, List
 from datetime import datetime
 import uuid
@@ -9,10 +10,18 @@ class ConversationBase(SQLModel):
 
 
 class Conversation(ConversationBase, table=True):
+    __table_args__ = (
+        # A user's conversations, most recently active first
+        Index("ix_conversation_user_id_updated_at", "user_id", "updated_at"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Rolling summary of the messages up to and including summary_until, written by the summarizer
+    summary: Optional[str] = Field(default=None)
+    summary_until: Optional[datetime] = Field(default=None)
 
     # Relationship to user
     user: Optional["User"] = Relationship(back_populates="conversations")
@@ -39,6 +48,18 @@ class MessageBase(SQLModel):
 
 
 class Message(MessageBase, table=True):
+    __table_args__ = (
+        # Conversation history loads, in order
+        Index("ix_message_conversation_id_created_at", "conversation_id", "created_at"),
+        # Foreign key checks when a todo is deleted; most messages are not linked to one
+        Index(
+            "ix_message_todo_id",
+            "todo_id",
+            postgresql_where=text("todo_id IS NOT NULL"),
+            sqlite_where=text("todo_id IS NOT NULL"),
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     role: str = Field(regex="^(user|assistant)$")  # Either "user" or "assistant"
     content: str = Field(min_length=1, max_length=5000)
@@ -64,5 +85,10 @@ class MessageRead(MessageBase):
     updated_at: datetime
 
 
+class MessagePage(SQLModel):
+    items: List[MessageRead]  # Oldest first
+    next_cursor: Optional[str] = None  # Cursor for the page of older messages, if any
+
+
 class MessageUpdate(SQLModel):
     content: Optional[str] = Field(default=None, min_length=1, max_length=5000)
\ No newline at end of file
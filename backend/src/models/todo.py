@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 import uuid
 from pydantic import validator
 
@@ -12,6 +13,24 @@ class TodoBase(SQLModel):
 
 
 class Todo(TodoBase, table=True):
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND (created_at, id) > (?, ?) ORDER BY created_at, id
+        # Also serves as the (user_id, created_at) index through its leading columns.
+        Index("ix_todo_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Delta sync: WHERE user_id = ? AND (updated_at, id) > (?, ?) ORDER BY updated_at, id
+        Index("ix_todo_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        # Ownership lookups and completed= filters
+        Index("ix_todo_user_id_is_completed", "user_id", "is_completed"),
+        # Partial index over pending todos only, which is what the dashboard and chatbot mostly list
+        Index(
+            "ix_todo_user_id_pending",
+            "user_id",
+            "created_at",
+            postgresql_where=text("NOT is_completed"),
+            sqlite_where=text("is_completed = 0"),
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(sa_column_kwargs={"nullable": False}, min_length=1, max_length=200)
     description: Optional[str] = Field(default=None, max_length=1000)
@@ -38,7 +57,71 @@ class TodoRead(TodoBase):
     updated_at: datetime
 
 
+class TodoPage(SQLModel):
+    items: List[TodoRead]
+    next_cursor: Optional[str] = None
+
+
 class TodoUpdate(SQLModel):
     title: Optional[str] = Field(default=None, min_length=1, max_length=200)
     description: Optional[str] = Field(default=None, max_length=1000)
-    is_completed: Optional[bool] = None
\ No newline at end of file
+    is_completed: Optional[bool] = None
+
+
+class TodoBatchUpdateItem(TodoUpdate):
+    id: uuid.UUID
+
+
+class TodoBatchDelete(SQLModel):
+    ids: List[uuid.UUID]
+
+
+class TodoBatchResult(SQLModel):
+    id: uuid.UUID
+    status: str  # "created", "updated", "deleted" or "not_found"
+    todo: Optional[TodoRead] = None
+
+
+class TodoBatchResponse(SQLModel):
+    results: List[TodoBatchResult]
+
+
+class TodoDeleteCount(SQLModel):
+    deleted: int
+
+
+class TodoTombstone(SQLModel, table=True):
+    """Deletion log for delta sync: one row per deleted todo, purged after the retention period."""
+    __table_args__ = (
+        Index("ix_todotombstone_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id: uuid.UUID = Field(primary_key=True)  # The deleted todo's ID
+    user_id: uuid.UUID = Field(foreign_key="user.id")
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TodoTombstoneRead(SQLModel):
+    id: uuid.UUID
+    deleted_at: datetime
+
+
+class TodoChanges(SQLModel):
+    todos: List[TodoRead]  # Created or updated since the watermark
+    deleted: List[TodoTombstoneRead]
+    watermark: str  # Pass as `since` on the next sync
+    has_more: bool = False  # More changes are waiting; sync again right away
+    reset: bool = False  # `since` was missing or too old: replace the local list with this one
+
+
+class TodoDayStats(SQLModel):
+    day: date
+    created: int
+    completed: int  # Completed todos last updated that day
+
+
+class TodoStats(SQLModel):
+    total: int
+    pending: int
+    completed: int
+    days: List[TodoDayStats]  # Oldest first, one entry per day of the window
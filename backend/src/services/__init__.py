@@ -10,10 +10,15 @@ from ..utils.jwt import (
 from .todo_service import (
     create_todo,
     get_todos_by_user,
+    get_todos_page_by_user,
     get_todo_by_id_and_user,
     update_todo_by_id_and_user,
     delete_todo_by_id_and_user,
-    toggle_todo_completion
+    toggle_todo_completion,
+    create_todos,
+    update_todos,
+    delete_todos,
+    delete_completed_todos
 )
 
 __all__ = [
@@ -26,8 +31,13 @@ __all__ = [
     # Todo service exports
     "create_todo",
     "get_todos_by_user",
+    "get_todos_page_by_user",
     "get_todo_by_id_and_user",
     "update_todo_by_id_and_user",
     "delete_todo_by_id_and_user",
-    "toggle_todo_completion"
+    "toggle_todo_completion",
+    "create_todos",
+    "update_todos",
+    "delete_todos",
+    "delete_completed_todos"
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from sqlmodel import Session, select
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 from typing import Optional
 from ..models.user import User, UserCreate
@@ -15,6 +16,35 @@ def authenticate_user(session: Session, email: str, password: str) -> Optional[U
     return user
 
 
+def get_user_by_email(session: Session, email: str) -> Optional[User]:
+    """Look up a user by email address."""
+    return session.exec(select(User).where(User.email == email)).first()
+
+
+async def authenticate_user_async(session: Session, email: str, password: str) -> Optional[User]:
+    """
+    Authenticate a user without blocking the event loop or the request threadpool on bcrypt.
+    Hashes stored at an outdated cost are transparently rehashed on success.
+    Raises PasswordHasherBusy when the hashing queue is full.
+    """
+    from ..utils.password_hasher import password_hasher
+    user = await run_in_threadpool(get_user_by_email, session, email)
+    if not user:
+        return None
+
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
+        return None
+
+    if new_hash:
+        user.hashed_password = new_hash
+        user.updated_at = datetime.utcnow()
+        session.add(user)
+        await run_in_threadpool(session.commit)
+
+    return user
+
+
 def get_current_user_from_token(token: str = None) -> Optional[dict]:
     """Decode and verify a JWT token, returning the user payload."""
     if token is None:
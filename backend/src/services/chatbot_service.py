@@ -1,8 +1,18 @@
 import os
-import google.generativeai as genai
-from typing import List, Dict, Any
+import logging
+import threading
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
-from google.generativeai.types import GenerationConfig
+from .llm_client import LLMClient, LLMProvider, LLMUnavailableError, GeminiProvider, StubProvider
+from .prompt_builder import BuiltPrompt, build_prompt
+from .response_cache import response_cache
+from .todo_tools import TOOL_SPECS, run_tools
+
+
+logger = logging.getLogger(__name__)
+
+# Model/tool round trips per chat turn before the model has to answer in text
+CHAT_MAX_TOOL_ROUNDS = int(os.getenv("CHAT_MAX_TOOL_ROUNDS", "4"))
 
 
 class ChatMessage(BaseModel):
@@ -13,15 +23,52 @@ class ChatMessage(BaseModel):
 class ChatResponse(BaseModel):
     response: str
     suggestions: List[str] = []
+    prompt_tokens: Optional[int] = None  # Estimated size of the prompt sent to the model
+
+
+class ChatbotUnavailable(Exception):
+    """Raised when no chat model can be set up, e.g. GEMINI_API_KEY is missing."""
 
 
 class ChatbotService:
-    def __init__(self):
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        # Without an explicit provider, the configured one is set up on first use
+        self._llm: Optional[LLMClient] = LLMClient(provider) if provider is not None else None
+        self._lock = threading.Lock()
+
+    @property
+    def llm(self) -> LLMClient:
+        """
+        Model client with concurrency limits and deadlines, created on first access.
+        Raises ChatbotUnavailable if the provider cannot be configured; the next
+        access tries again.
+        """
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    try:
+                        self._llm = LLMClient(self._provider_from_env())
+                    except (ValueError, ImportError) as e:
+                        raise ChatbotUnavailable(str(e)) from e
+        return self._llm
+
+    @staticmethod
+    def _provider_from_env() -> LLMProvider:
+        """
+        Pick the model backend from LLM_PROVIDER: "gemini" (default) or "stub",
+        a deterministic local provider for load tests.
+        """
+        if os.getenv("LLM_PROVIDER", "gemini").lower() == "stub":
+            return StubProvider(delay=float(os.getenv("LLM_STUB_DELAY_SECONDS", "0")))
+
         # Initialize the Gemini API with the API key
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
 
+        # Imported here: the SDK is slow to import and only needed once chat is used
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
 
         # Set up the model
@@ -32,87 +79,176 @@ class ChatbotService:
             "max_output_tokens": 8192,
         }
 
-        self.model = genai.GenerativeModel(
+        return GeminiProvider(genai.GenerativeModel(
             model_name="gemini-pro",
             generation_config=generation_config,
-        )
+        ))
 
-    def generate_response(self,
-                         messages: List[ChatMessage],
-                         user_context: Dict[str, Any] = {}) -> Dict[str, Any]:
+    async def generate_response(self,
+                                messages: List[ChatMessage],
+                                user_context: Dict[str, Any] = {},
+                                user_id: Optional[Any] = None,
+                                tools: bool = False) -> Dict[str, Any]:
         """
         Generate a response from the Gemini model based on the conversation history
         and user context (like their todos).
+
+        With `tools`, the model may act on `user_id`'s todos through the todo
+        tools; the calls it made are returned under "tool_calls".
+
+        Errors are raised to the caller: LLMUnavailableError (timeouts, overload)
+        carries the tool calls that already ran under its `tool_calls`.
         """
-        try:
-            # Format the conversation history for the model
-            formatted_history = []
-            for msg in messages:
-                formatted_history.append({
-                    "role": "model" if msg.role == "assistant" else "user",
-                    "parts": [msg.content]
-                })
-
-            # Create a prompt that includes user context
-            context_info = ""
-            if "todos" in user_context:
-                todos = user_context["todos"]
-                if todos:
-                    context_info += "\nHere are the user's current tasks:\n"
-                    for i, todo in enumerate(todos):
-                        status = "✓ Completed" if todo.is_completed else "○ Pending"
-                        context_info += f"- [{status}] {todo.title}"
-                        if todo.description:
-                            context_info += f": {todo.description}"
-                        context_info += f" (ID: {todo.id})\n"
-
-            # Create the prompt with context
-            if context_info:
-                system_prompt = f"""You are an AI assistant for a Todo application.
-                You can help users manage their tasks.
-                {context_info}
-
-                Respond to the user's request appropriately, using their task information when relevant.
-                If the user wants to add, update, or delete tasks, guide them on how to do it through the app.
-                If they ask about specific tasks, refer to the ones listed above.
-                Keep your responses helpful and concise."""
+        tools = tools and user_id is not None
+        prompt = self._build_prompt(messages, user_context, tools=tools)
+        tool_calls: List[Dict[str, Any]] = []
+
+        scope = self._cache_scope(prompt, user_id, user_context.get("todo_version"))
+        response_text = response_cache.get(scope, prompt.message) if scope else None
+        if response_text is None:
+            if tools:
+                response_text, tool_calls = await self._run_with_tools(prompt, user_id)
             else:
-                system_prompt = """You are an AI assistant for a Todo application.
-                You can help users manage their tasks.
-                Respond to the user's request appropriately.
-                Keep your responses helpful and concise."""
-
-            # Start the chat with history
-            chat = self.model.start_chat(history=formatted_history[:-1])  # Exclude the last message since we'll send it separately
-
-            # Send the latest message and get response
-            last_user_message = messages[-1].content if messages else "Hello"
-            response = chat.send_message(last_user_message)
-
-            # Generate suggestions based on the conversation
-            suggestions = self._generate_suggestions(messages, user_context)
-
-            return {
-                "response": response.text,
-                "suggestions": suggestions
-            }
-        except Exception as e:
-            # Return a helpful error message
-            return {
-                "response": f"Sorry, I encountered an issue processing your request: {str(e)}",
-                "suggestions": ["Try rephrasing your request", "Ask about your tasks", "Get help with the app"]
-            }
+                # Send the latest message with the rest as history, under the client's limits and deadline
+                response_text = await self.llm.generate(self._with_instructions(prompt), prompt.message, user_id=user_id)
+            # A turn that changed todos must run again when repeated, so only pure answers are reused
+            if scope and not tool_calls:
+                response_cache.set(scope, prompt.message, response_text)
+
+        # Generate suggestions based on the conversation
+        suggestions = self._generate_suggestions(messages, user_context)
+
+        return {
+            "response": response_text,
+            "suggestions": suggestions,
+            "prompt_tokens": prompt.tokens,
+            "tool_calls": tool_calls
+        }
+
+    async def stream_response(self,
+                              messages: List[ChatMessage],
+                              user_context: Dict[str, Any] = {},
+                              user_id: Optional[Any] = None) -> AsyncIterator[str]:
+        """
+        Stream the model's reply as text chunks, as soon as each one is generated.
+        Errors are raised to the caller, which decides how to report them mid-stream.
+        """
+        prompt = self._build_prompt(messages, user_context)
+        scope = self._cache_scope(prompt, user_id, user_context.get("todo_version"))
+        cached = response_cache.get(scope, prompt.message) if scope else None
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        async for text in self.llm.stream(self._with_instructions(prompt), prompt.message, user_id=user_id):
+            chunks.append(text)
+            yield text
+
+        # Only a reply that streamed to completion is worth reusing
+        if scope:
+            response_cache.set(scope, prompt.message, "".join(chunks))
+
+    def get_suggestions(self, messages: List[ChatMessage], user_context: Dict[str, Any] = {}) -> List[str]:
+        """
+        Contextual follow-up suggestions, for callers that stream the reply themselves.
+        """
+        return self._generate_suggestions(messages, user_context)
+
+    async def _run_with_tools(self, prompt: BuiltPrompt, user_id: Any) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Let the model call the todo tools until it answers in text, for at most
+        CHAT_MAX_TOOL_ROUNDS rounds. All calls from one model turn run concurrently,
+        and their results go back to the model in a single follow-up turn.
+        """
+        contents = [*self._with_instructions(prompt), {"role": "user", "parts": [prompt.message]}]
+        executed: List[Dict[str, Any]] = []
+
+        try:
+            for _ in range(CHAT_MAX_TOOL_ROUNDS):
+                turn = await self.llm.complete(contents, TOOL_SPECS, user_id=user_id)
+                if not turn.tool_calls:
+                    return turn.text, executed
+
+                results = await run_tools(turn.tool_calls, user_id)
+                contents.append({"role": "model", "parts": [
+                    {"function_call": {"name": call.name, "args": call.arguments}}
+                    for call in turn.tool_calls
+                ]})
+                contents.append({"role": "user", "parts": [
+                    {"function_response": {"name": call.name, "response": {"content": result.content, "is_error": result.is_error}}}
+                    for call, result in zip(turn.tool_calls, results)
+                ]})
+                executed.extend(
+                    {"name": call.name, "arguments": call.arguments, "result": result.content}
+                    for call, result in zip(turn.tool_calls, results)
+                )
+
+            # Out of rounds: ask for an answer without offering the tools again
+            turn = await self.llm.complete(contents, [], user_id=user_id)
+            return turn.text, executed
+        except LLMUnavailableError as e:
+            # Those tools already changed the user's todos; the caller must still report them
+            e.tool_calls = executed
+            raise
+
+    def _build_prompt(self, messages: List[ChatMessage], user_context: Dict[str, Any], tools: bool = False) -> BuiltPrompt:
+        """
+        Assemble the prompt for this turn within the configured token budget.
+        """
+        prompt = build_prompt(
+            messages,
+            user_context.get("todos") or [],
+            summary=user_context.get("conversation_summary"),
+            tools=tools,
+            matching_todos=user_context.get("matching_todos")
+        )
+        logger.debug(
+            "Chat prompt: ~%d tokens, %d todos (%d omitted), %d history messages omitted",
+            prompt.tokens, prompt.todos_included, prompt.todos_omitted, prompt.messages_omitted
+        )
+        return prompt
+
+    def _cache_scope(self, prompt: BuiltPrompt, user_id: Optional[Any], todo_version: Optional[str]) -> Optional[str]:
+        """
+        Response cache scope for this turn: the database version the user's todos
+        were read at (see get_todos_version_async, changed by every write from any
+        process) plus everything the model sees besides the new message.
+        Anonymous calls, and calls without a todo version, are not cached.
+        """
+        if user_id is None or todo_version is None:
+            return None
+        context = [prompt.system_prompt, *(turn["parts"][0] for turn in prompt.history)]
+        return response_cache.scope(user_id, todo_version, context)
+
+    def _with_instructions(self, prompt: BuiltPrompt) -> List[Dict[str, Any]]:
+        """
+        Put the system prompt ahead of the history as an opening exchange,
+        which works with every Gemini model, including ones without system instructions.
+        """
+        return [
+            {"role": "user", "parts": [prompt.system_prompt]},
+            {"role": "model", "parts": ["Understood."]},
+            *prompt.history
+        ]
 
     def _generate_suggestions(self, messages: List[ChatMessage], user_context: Dict[str, Any]) -> List[str]:
         """
         Generate contextual suggestions based on the conversation and user's tasks.
+        Uses the counts in `todo_stats` when given, instead of scanning `todos`.
         """
         suggestions = []
 
+        stats = user_context.get("todo_stats")
+        if stats is not None:
+            total, pending = stats.total, stats.pending
+        else:
+            todos = user_context.get("todos") or []
+            total, pending = len(todos), sum(1 for todo in todos if not todo.is_completed)
+
         # If user has todos, suggest relevant actions
-        if "todos" in user_context and user_context["todos"]:
-            incomplete_todos = [t for t in user_context["todos"] if not t.is_completed]
-            if incomplete_todos:
+        if total:
+            if pending:
                 suggestions.extend([
                     "Review your pending tasks",
                     "Mark a task as complete",
@@ -141,5 +277,21 @@ class ChatbotService:
         return suggestions[:4]
 
 
-# Global instance of the chatbot service
-chatbot_service = ChatbotService()
\ No newline at end of file
+_chatbot_service: Optional[ChatbotService] = None
+_chatbot_service_lock = threading.Lock()
+
+
+def get_chatbot_service() -> ChatbotService:
+    """
+    Return the shared chatbot service, setting up its model provider on first call.
+    Raises ChatbotUnavailable when chat is not configured, without caching the
+    failure, so the rest of the API boots and runs regardless.
+    """
+    global _chatbot_service
+    if _chatbot_service is None:
+        with _chatbot_service_lock:
+            if _chatbot_service is None:
+                service = ChatbotService()
+                service.llm  # Surface configuration errors here rather than mid-request
+                _chatbot_service = service
+    return _chatbot_service
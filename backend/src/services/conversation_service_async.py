@@ -0,0 +1,142 @@
+from sqlmodel import select, update, func
+from sqlalchemy import tuple_
+from datetime import datetime
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from typing import List, Optional, Tuple
+from ..models.conversation import Conversation, Message
+from .pagination import encode_cursor, decode_cursor
+
+
+# Longest message the content column holds
+MAX_MESSAGE_LENGTH = 5000
+
+
+async def get_conversation_async(session: AsyncSession, conversation_id: UUID, user_id: UUID) -> Optional[Conversation]:
+    """
+    Retrieve one of the user's conversations asynchronously.
+    """
+    query = select(Conversation).where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+    result = await session.exec(query)
+    return result.first()
+
+
+async def get_conversation_by_id_async(session: AsyncSession, conversation_id: UUID) -> Optional[Conversation]:
+    """
+    Retrieve a conversation by ID asynchronously, for internal jobs that already checked ownership.
+    """
+    result = await session.exec(select(Conversation).where(Conversation.id == conversation_id))
+    return result.first()
+
+
+async def create_conversation_async(session: AsyncSession, user_id: UUID) -> Conversation:
+    """
+    Start a new conversation for a user asynchronously.
+    """
+    conversation = Conversation(user_id=user_id)
+    session.add(conversation)
+    await session.commit()
+    await session.refresh(conversation)
+    return conversation
+
+
+async def add_message_async(session: AsyncSession, conversation_id: UUID, role: str, content: str) -> Message:
+    """
+    Append a message to a conversation and mark the conversation as active, in one transaction.
+    Content beyond the column's length is cut off.
+    """
+    now = datetime.utcnow()
+    message = Message(
+        conversation_id=conversation_id,
+        role=role,
+        content=content[:MAX_MESSAGE_LENGTH],
+        created_at=now,
+        updated_at=now
+    )
+    session.add(message)
+    await session.exec(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await session.flush()
+    # All values are generated client-side, so nothing needs reloading after commit
+    session.expunge(message)
+    await session.commit()
+    return message
+
+
+async def get_messages_page_async(
+    session: AsyncSession,
+    conversation_id: UUID,
+    before: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[datetime] = None
+) -> Tuple[List[Message], Optional[str]]:
+    """
+    Retrieve the latest `limit` messages of a conversation asynchronously, or the
+    ones just before the `before` cursor, with a keyset query on (created_at, id).
+    `after` skips messages up to that time, e.g. those already summarized.
+    Returns them oldest first, plus the cursor for the page of older messages
+    (None once the start of the conversation is reached).
+    Raises ValueError if the cursor is malformed.
+    """
+    query = select(Message).where(Message.conversation_id == conversation_id)
+
+    if after is not None:
+        query = query.where(Message.created_at > after)
+
+    if before:
+        created_at, message_id = decode_cursor(before)
+        query = query.where(tuple_(Message.created_at, Message.id) < tuple_(created_at, message_id))
+
+    # Newest first so LIMIT keeps the most recent ones; one extra row tells whether older ones exist
+    query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+
+    result = await session.exec(query)
+    rows = list(result.all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        oldest = rows[-1]
+        next_cursor = encode_cursor(oldest.created_at, oldest.id)
+
+    rows.reverse()
+    return rows, next_cursor
+
+
+async def count_messages_async(session: AsyncSession, conversation_id: UUID, after: Optional[datetime] = None) -> int:
+    """
+    Count a conversation's messages asynchronously, optionally only those after a time.
+    """
+    query = select(func.count()).select_from(Message).where(Message.conversation_id == conversation_id)
+    if after is not None:
+        query = query.where(Message.created_at > after)
+    result = await session.exec(query)
+    return result.one()
+
+
+async def get_messages_after_async(session: AsyncSession, conversation_id: UUID, after: Optional[datetime] = None) -> List[Message]:
+    """
+    Retrieve every message of a conversation after a time asynchronously, oldest first.
+    """
+    query = select(Message).where(Message.conversation_id == conversation_id)
+    if after is not None:
+        query = query.where(Message.created_at > after)
+    result = await session.exec(query.order_by(Message.created_at, Message.id))
+    return list(result.all())
+
+
+async def save_summary_async(session: AsyncSession, conversation_id: UUID, summary: str, summary_until: datetime) -> None:
+    """
+    Store a conversation's rolling summary, covering messages up to `summary_until`.
+    """
+    await session.exec(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(summary=summary, summary_until=summary_until)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
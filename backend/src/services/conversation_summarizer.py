@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Optional, Set
+from uuid import UUID
+from ..database.session import get_session_context
+from .conversation_service_async import (
+    get_conversation_by_id_async,
+    count_messages_async,
+    get_messages_after_async,
+    save_summary_async
+)
+from .llm_client import LLMClient
+from .prompt_builder import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# Unsummarized messages a conversation may hold before older ones are compacted
+CHAT_SUMMARY_TRIGGER_MESSAGES = int(os.getenv("CHAT_SUMMARY_TRIGGER_MESSAGES", "30"))
+# Most recent messages always left out of the summary, so they are sent verbatim
+CHAT_SUMMARY_KEEP_RECENT = int(os.getenv("CHAT_SUMMARY_KEEP_RECENT", "10"))
+# Conversations waiting to be summarized before new requests are dropped
+CHAT_SUMMARY_QUEUE_SIZE = int(os.getenv("CHAT_SUMMARY_QUEUE_SIZE", "256"))
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation below between a user and a todo-list assistant. "
+    "Keep every fact, decision, task name and open question that later turns may refer to. "
+    "Write at most 200 words of plain prose."
+)
+
+
+class ConversationSummarizer:
+    """
+    Compacts the older messages of long conversations into a stored rolling summary.
+
+    Chat turns call `schedule`, which only enqueues the conversation; a
+    background worker task does the counting, the model call and the write,
+    so summarizing never adds latency to a turn. Later turns send the summary
+    plus the messages after it.
+    """
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        session_factory: Callable[[], Any] = get_session_context,
+        trigger: int = CHAT_SUMMARY_TRIGGER_MESSAGES,
+        keep_recent: int = CHAT_SUMMARY_KEEP_RECENT,
+        queue_size: int = CHAT_SUMMARY_QUEUE_SIZE
+    ):
+        self.llm = llm
+        self.session_factory = session_factory
+        self.trigger = trigger
+        self.keep_recent = keep_recent
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[UUID] = set()
+        self._worker: Optional[asyncio.Task] = None
+
+    def schedule(self, conversation_id: UUID) -> None:
+        """Queue a conversation for summarization if it is not already waiting. Never blocks."""
+        if conversation_id in self._pending:
+            return
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._pending.clear()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+        try:
+            self._queue.put_nowait(conversation_id)
+        except asyncio.QueueFull:
+            # The next turn of the conversation will schedule it again
+            logger.warning("Summarizer queue is full; skipping conversation %s", conversation_id)
+            return
+        self._pending.add(conversation_id)
+
+    async def _run(self) -> None:
+        while True:
+            conversation_id = await self._queue.get()
+            self._pending.discard(conversation_id)
+            try:
+                await self.summarize_conversation(conversation_id)
+            except Exception:
+                logger.exception("Failed to summarize conversation %s", conversation_id)
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued conversation has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Cancel the worker; queued conversations are dropped."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def summarize_conversation(self, conversation_id: UUID) -> bool:
+        """
+        Fold the conversation's unsummarized messages, except the most recent
+        `keep_recent`, into its summary if more than `trigger` have piled up.
+        Returns True if a new summary was stored.
+        """
+        async with self.session_factory() as session:
+            # Ownership was checked when the turn was accepted; load by ID only
+            conversation = await get_conversation_by_id_async(session, conversation_id)
+            if conversation is None:
+                return False
+            previous_summary = conversation.summary
+            summary_until = conversation.summary_until
+
+            if await count_messages_async(session, conversation_id, after=summary_until) <= self.trigger:
+                return False
+
+            messages = await get_messages_after_async(session, conversation_id, after=summary_until)
+            to_fold = messages[:-self.keep_recent] if self.keep_recent else messages
+            if not to_fold:
+                return False
+
+            lines = []
+            if previous_summary:
+                lines.append(f"Summary so far: {previous_summary}")
+            lines.extend(f"{message.role}: {message.content}" for message in to_fold)
+            new_summary_until = to_fold[-1].created_at
+
+        # No connection is held while the model works
+        summary = await self.llm.generate([], f"{SUMMARY_INSTRUCTIONS}\n\n" + "\n".join(lines))
+
+        async with self.session_factory() as session:
+            await save_summary_async(session, conversation_id, summary.strip(), new_summary_until)
+
+        logger.info(
+            "Summarized %d messages of conversation %s into ~%d tokens",
+            len(to_fold), conversation_id, estimate_tokens(summary)
+        )
+        return True
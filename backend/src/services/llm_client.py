@@ -0,0 +1,268 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
+from pydantic import BaseModel
+
+
+# Model calls allowed in flight across the whole process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+# Model calls one user may have in flight at once
+LLM_PER_USER_CONCURRENCY = int(os.getenv("LLM_PER_USER_CONCURRENCY", "2"))
+# Deadline for a whole call, including time spent waiting for a slot
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+T = TypeVar("T")
+
+
+class LLMUnavailableError(Exception):
+    """
+    Base for model call failures that are temporary and safe to report to the
+    client. `tool_calls` lists the tools that already ran in the failed turn.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.tool_calls: List[Dict[str, Any]] = []
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """Raised when a model call misses its deadline."""
+
+
+class LLMOverloadedError(LLMUnavailableError):
+    """Raised when the model backend is overloaded or rate limiting us."""
+
+
+class ClientDisconnected(Exception):
+    """Raised when the HTTP client went away before the model call finished."""
+
+
+class ToolCall(BaseModel):
+    name: str
+    arguments: Dict[str, Any] = {}
+
+
+class LLMTurn(BaseModel):
+    """One model reply in a tool-calling exchange: text, tool calls, or both."""
+    text: str = ""
+    tool_calls: List[ToolCall] = []
+
+
+class LLMProvider:
+    """
+    Interface for chat model backends. `history` is in the Gemini format
+    ({"role": "user" | "model", "parts": [text]}) and excludes `message`.
+
+    `complete` takes the whole exchange as `contents`, whose parts may also be
+    {"function_call": {"name", "args"}} and {"function_response": {"name", "response"}}
+    dicts, plus JSON-schema tool declarations ({"name", "description", "parameters"}).
+    """
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        raise NotImplementedError
+
+    async def stream(self, history: List[Dict[str, Any]], message: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> LLMTurn:
+        raise NotImplementedError
+
+
+def _gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a JSON schema to Gemini's OpenAPI subset, which spells types in upper case."""
+    converted = dict(schema)
+    if "type" in converted:
+        converted["type"] = converted["type"].upper()
+    if "properties" in converted:
+        converted["properties"] = {name: _gemini_schema(prop) for name, prop in converted["properties"].items()}
+    if "items" in converted:
+        converted["items"] = _gemini_schema(converted["items"])
+    return converted
+
+
+@contextmanager
+def _gemini_errors():
+    """Turn Gemini's quota and availability errors into LLMOverloadedError."""
+    from google.api_core import exceptions
+
+    try:
+        yield
+    except (exceptions.ResourceExhausted, exceptions.ServiceUnavailable) as e:
+        raise LLMOverloadedError("The model service is overloaded") from e
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini through the SDK's native async calls, so no thread is held while waiting."""
+
+    def __init__(self, model: Any):
+        self.model = model
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        chat = self.model.start_chat(history=history)
+        with _gemini_errors():
+            response = await chat.send_message_async(message)
+        return response.text
+
+    async def stream(self, history: List[Dict[str, Any]], message: str) -> AsyncIterator[str]:
+        chat = self.model.start_chat(history=history)
+        with _gemini_errors():
+            response = await chat.send_message_async(message, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> LLMTurn:
+        declarations = [
+            {**tool, "parameters": _gemini_schema(tool["parameters"])} for tool in tools
+        ]
+        with _gemini_errors():
+            response = await self.model.generate_content_async(
+                contents,
+                tools=[{"function_declarations": declarations}] if declarations else None
+            )
+
+        turn = LLMTurn()
+        texts = []
+        for part in response.candidates[0].content.parts:
+            if "function_call" in part:
+                call = part.function_call
+                turn.tool_calls.append(ToolCall(name=call.name, arguments=dict(call.args.items())))
+            elif part.text:
+                texts.append(part.text)
+        turn.text = "".join(texts)
+        return turn
+
+
+class StubProvider(LLMProvider):
+    """
+    Deterministic local provider for load tests and development: echoes the
+    message back word by word after a fixed delay, without any network calls.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def _reply(self, message: str) -> List[str]:
+        return [f"{word} " for word in f"You said: {message}".split()]
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        await asyncio.sleep(self.delay)
+        return "".join(self._reply(message)).rstrip()
+
+    async def stream(self, history: List[Dict[str, Any]], message: str) -> AsyncIterator[str]:
+        words = self._reply(message)
+        for word in words:
+            await asyncio.sleep(self.delay / len(words))
+            yield word
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> LLMTurn:
+        # Never calls tools; echoes the latest text part
+        message = next(
+            (part for part in reversed(contents[-1]["parts"]) if isinstance(part, str)),
+            ""
+        ) if contents else ""
+        return LLMTurn(text=await self.generate([], message))
+
+
+class LLMClient:
+    """
+    Runs provider calls under a process-wide and a per-user concurrency limit,
+    with a deadline that covers both queueing and generation. Cancelling the
+    awaiting task (e.g. when the HTTP client disconnects) cancels the upstream
+    call and releases its slots.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        per_user_concurrency: int = LLM_PER_USER_CONCURRENCY,
+        timeout: float = LLM_TIMEOUT_SECONDS
+    ):
+        self.provider = provider
+        self.timeout = timeout
+        self.per_user_concurrency = per_user_concurrency
+        self._global = asyncio.Semaphore(max_concurrency)
+        # user key -> [semaphore, number of calls holding or waiting on it]
+        self._per_user: Dict[str, list] = {}
+
+    @asynccontextmanager
+    async def _slot(self, user_id: Optional[Any]):
+        if user_id is None:
+            async with self._global:
+                yield
+            return
+
+        key = str(user_id)
+        entry = self._per_user.setdefault(key, [asyncio.Semaphore(self.per_user_concurrency), 0])
+        entry[1] += 1
+        try:
+            async with entry[0], self._global:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._per_user[key]
+
+    async def _with_deadline(self, awaitable: Awaitable[T], deadline: float) -> T:
+        remaining = deadline - asyncio.get_running_loop().time()
+        try:
+            return await asyncio.wait_for(awaitable, max(remaining, 0))
+        except asyncio.TimeoutError as e:
+            raise LLMTimeoutError(f"Model call exceeded {self.timeout:g}s") from e
+
+    async def generate(self, history: List[Dict[str, Any]], message: str, user_id: Optional[Any] = None) -> str:
+        """Return the model's complete reply."""
+        async def call() -> str:
+            async with self._slot(user_id):
+                return await self.provider.generate(history, message)
+
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        return await self._with_deadline(call(), deadline)
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]], user_id: Optional[Any] = None) -> LLMTurn:
+        """Run one step of a tool-calling exchange."""
+        async def call() -> LLMTurn:
+            async with self._slot(user_id):
+                return await self.provider.complete(contents, tools)
+
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        return await self._with_deadline(call(), deadline)
+
+    async def stream(self, history: List[Dict[str, Any]], message: str, user_id: Optional[Any] = None) -> AsyncIterator[str]:
+        """Yield the model's reply in chunks; the deadline applies to the whole stream."""
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        slot = self._slot(user_id)
+        await self._with_deadline(slot.__aenter__(), deadline)
+        chunks = self.provider.stream(history, message)
+        try:
+            while True:
+                try:
+                    chunk = await self._with_deadline(chunks.__anext__(), deadline)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            # Closing the provider's generator cancels the upstream request if it is still running
+            await chunks.aclose()
+            await slot.__aexit__(None, None, None)
+
+
+async def run_until_disconnected(request: Any, awaitable: Awaitable[T], poll_interval: float = 0.5) -> T:
+    """
+    Await `awaitable`, cancelling it if the HTTP client goes away first
+    (raising ClientDisconnected).
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,56 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import tuple_
+from ..models.todo import Todo
+
+
+def encode_cursor(created_at: datetime, todo_id: uuid.UUID) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor string."""
+    raw = json.dumps([created_at.isoformat(), str(todo_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode an opaque cursor back into its (created_at, id) position.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, todo_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(todo_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def apply_keyset(query, cursor: Optional[str], limit: int, descending: bool = False):
+    """Order a Todo query by (created_at, id) and start it after the given cursor.
+
+    With `descending`, newest todos come first and the page continues below the cursor.
+    One extra row is fetched so callers can tell whether another page exists.
+    """
+    key = tuple_(Todo.created_at, Todo.id)
+    if cursor:
+        created_at, todo_id = decode_cursor(cursor)
+        position = tuple_(created_at, todo_id)
+        query = query.where(key < position if descending else key > position)
+
+    if descending:
+        return query.order_by(Todo.created_at.desc(), Todo.id.desc()).limit(limit + 1)
+    return query.order_by(Todo.created_at, Todo.id).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """Trim the look-ahead row from a keyset page and build the next cursor."""
+    rows = list(rows)
+    if limit <= 0:
+        return [], None
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
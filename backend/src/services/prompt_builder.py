@@ -0,0 +1,155 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+# Total tokens the system prompt, todo context and history may take up (the new message is always sent)
+CHAT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "3000"))
+# Share of what remains after the instructions that goes to the todo list; history gets the rest
+CHAT_PROMPT_TODO_SHARE = float(os.getenv("CHAT_PROMPT_TODO_SHARE", "0.4"))
+# Longest a single history message may be before it is cut
+CHAT_PROMPT_MAX_MESSAGE_TOKENS = int(os.getenv("CHAT_PROMPT_MAX_MESSAGE_TOKENS", "500"))
+# Longest the stored summary of earlier messages may be
+CHAT_PROMPT_MAX_SUMMARY_TOKENS = int(os.getenv("CHAT_PROMPT_MAX_SUMMARY_TOKENS", "400"))
+
+INSTRUCTIONS = (
+    "You are an AI assistant for a Todo application.\n"
+    "You can help users manage their tasks.\n"
+    "Respond to the user's request appropriately, using their task information when relevant.\n"
+    "If the user wants to add, update, or delete tasks, guide them on how to do it through the app.\n"
+    "If they ask about specific tasks, refer to the ones listed.\n"
+    "Keep your responses helpful and concise."
+)
+
+# Used instead of INSTRUCTIONS when the model can call the todo tools itself
+TOOL_INSTRUCTIONS = INSTRUCTIONS.replace(
+    "guide them on how to do it through the app.\n",
+    "use the provided tools; call independent tools together in one turn.\n"
+)
+
+
+class BuiltPrompt(BaseModel):
+    system_prompt: str
+    history: List[Dict[str, Any]]
+    message: str
+    tokens: int
+    todos_included: int
+    todos_omitted: int
+    messages_omitted: int
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (about four characters per token for English text).
+    Counting exactly would need a round trip to the model's tokenizer.
+    """
+    return len(text) // 4 + 1
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " …"
+
+
+def _todo_line(todo: Any) -> str:
+    status = "✓ Completed" if todo.is_completed else "○ Pending"
+    description = f": {_truncate(todo.description, 60)}" if todo.description else ""
+    return f"- [{status}] {todo.title}{description} (ID: {todo.id})"
+
+
+def rank_todos(todos: List[Any]) -> List[Any]:
+    """Pending todos first, then most recently updated first within each group."""
+    return sorted(
+        todos,
+        key=lambda todo: (todo.is_completed, -(getattr(todo, "updated_at", None) or datetime.min).timestamp())
+    )
+
+
+def build_prompt(
+    messages: List[Any],
+    todos: List[Any],
+    budget: int = CHAT_PROMPT_TOKEN_BUDGET,
+    todo_share: float = CHAT_PROMPT_TODO_SHARE,
+    max_message_tokens: int = CHAT_PROMPT_MAX_MESSAGE_TOKENS,
+    summary: Optional[str] = None,
+    tools: bool = False,
+    matching_todos: Optional[List[Any]] = None
+) -> BuiltPrompt:
+    """
+    Assemble the system prompt and history for one chat turn within a token budget.
+
+    The most relevant todos are listed until their share of the budget runs
+    out, and history is kept newest-first until the rest is spent, so prompt
+    size stays bounded however long the list or conversation grows. A stored
+    `summary` of messages older than `messages` comes out of the budget first.
+    With `tools`, the instructions tell the model to act through the todo tools.
+    `matching_todos`, e.g. search hits for the message, are listed before the rest.
+    """
+    instructions = TOOL_INSTRUCTIONS if tools else INSTRUCTIONS
+    message = messages[-1].content if messages else "Hello"
+    remaining = max(budget - estimate_tokens(instructions), 0)
+
+    summary_text = ""
+    if summary:
+        summary_text = "Summary of the earlier conversation: " + _truncate(summary, CHAT_PROMPT_MAX_SUMMARY_TOKENS)
+        remaining = max(remaining - estimate_tokens(summary_text), 0)
+
+    # Todo context, most relevant first
+    todo_budget = int(remaining * todo_share)
+    todo_lines: List[str] = []
+    used = 0
+    ranked = list(matching_todos or [])
+    listed = {todo.id for todo in ranked}
+    ranked.extend(todo for todo in rank_todos(todos or []) if todo.id not in listed)
+    for todo in ranked:
+        line = _todo_line(todo)
+        cost = estimate_tokens(line)
+        if used + cost > todo_budget:
+            break
+        todo_lines.append(line)
+        used += cost
+    todos_omitted = len(ranked) - len(todo_lines)
+    remaining -= used
+
+    parts = [instructions]
+    if summary_text:
+        parts.append(summary_text)
+    if todo_lines:
+        parts.append("Here are the user's current tasks:")
+        parts.extend(todo_lines)
+        if todos_omitted:
+            parts.append(f"(and {todos_omitted} more tasks not listed)")
+    system_prompt = "\n".join(parts)
+
+    # History, newest first, excluding the message being sent
+    history: List[Dict[str, Any]] = []
+    earlier = messages[:-1]
+    for msg in reversed(earlier):
+        content = _truncate(msg.content, max_message_tokens)
+        cost = estimate_tokens(content)
+        if cost > remaining:
+            break
+        history.append({
+            "role": "model" if msg.role == "assistant" else "user",
+            "parts": [content]
+        })
+        remaining -= cost
+    history.reverse()
+
+    # Gemini requires history to start with a user turn
+    while history and history[0]["role"] != "user":
+        history.pop(0)
+
+    history_tokens = sum(estimate_tokens(turn["parts"][0]) for turn in history)
+    return BuiltPrompt(
+        system_prompt=system_prompt,
+        history=history,
+        message=message,
+        tokens=estimate_tokens(system_prompt) + history_tokens + estimate_tokens(message),
+        todos_included=len(todo_lines),
+        todos_omitted=todos_omitted,
+        messages_omitted=len(earlier) - len(history),
+    )
@@ -0,0 +1,171 @@
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+# Cached replies kept in total
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "1024"))
+# How long a cached reply is served
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "600"))
+# Cosine similarity above which a differently worded question reuses a reply; 0 disables the tier
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0"))
+
+EMBEDDING_DIMENSIONS = 256
+
+Vector = List[float]
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace, so trivial variations share a key."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def hashed_embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> Vector:
+    """
+    Local, dependency-free embedding: words and character trigrams hashed into a
+    fixed-size, L2-normalized vector. Good enough to match rephrasings such as
+    "show my pending tasks" / "what are my pending tasks".
+    """
+    vector = [0.0] * dimensions
+    words = text.split()
+    padded = f" {text} "
+    features = words + [padded[i:i + 3] for i in range(len(padded) - 2)]
+    for feature in features:
+        digest = hashlib.md5(feature.encode()).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of chatbot replies.
+
+    Entries are grouped by a scope: the user, their todo state version and a
+    hash of the conversation so far, so a reply is only reused when the model
+    would have seen the same tasks and history. Within a scope, the normalized
+    message is matched exactly first; if `similarity` is set, the closest
+    earlier message above that cosine similarity is used next.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CHAT_CACHE_SIZE,
+        ttl: float = CHAT_CACHE_TTL_SECONDS,
+        similarity: float = CHAT_CACHE_SIMILARITY,
+        embedder: Callable[[str], Vector] = hashed_embedding,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self._embedder = embedder
+        self._clock = clock
+        # (scope, normalized message) -> (expires_at, value, embedding or None)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any, Optional[Vector]]]" = OrderedDict()
+        self._scopes: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def scope(user_id: Any, todo_version: str, context: List[str]) -> str:
+        """Build the scope key from the user, their todo state version and the conversation context."""
+        digest = hashlib.sha256("\x1e".join(context).encode()).hexdigest()
+        return f"{user_id}:{todo_version}:{digest}"
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        del self._entries[key]
+        messages = self._scopes.get(key[0])
+        if messages is not None:
+            messages.discard(key[1])
+            if not messages:
+                del self._scopes[key[0]]
+
+    def _live(self, key: Tuple[str, str], now: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now >= entry[0]:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def get(self, scope: str, message: str) -> Optional[Any]:
+        """Return the cached reply for a message in this scope, or None."""
+        normalized = normalize_prompt(message)
+        now = self._clock()
+        with self._lock:
+            value = self._live((scope, normalized), now)
+            if value is not None:
+                self.exact_hits += 1
+                return value
+
+            if self.similarity > 0 and scope in self._scopes:
+                query = self._embedder(normalized)
+                best_key, best_score = None, self.similarity
+                for candidate in list(self._scopes[scope]):
+                    embedding = self._entries[(scope, candidate)][2]
+                    if embedding is None:
+                        continue
+                    score = sum(a * b for a, b in zip(query, embedding))
+                    if score >= best_score:
+                        best_key, best_score = (scope, candidate), score
+                if best_key is not None:
+                    value = self._live(best_key, now)
+                    if value is not None:
+                        self.similar_hits += 1
+                        return value
+
+            self.misses += 1
+            return None
+
+    def set(self, scope: str, message: str, value: Any) -> None:
+        """Cache a reply for a message in this scope."""
+        if self.maxsize <= 0:
+            return
+
+        normalized = normalize_prompt(message)
+        embedding = self._embedder(normalized) if self.similarity > 0 else None
+        key = (scope, normalized)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value, embedding)
+            self._entries.move_to_end(key)
+            self._scopes.setdefault(scope, set()).add(normalized)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self.exact_hits = 0
+            self.similar_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return exact/similar hit and miss counters and current occupancy."""
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+# Global instance shared by the chatbot service and the internal stats endpoint
+response_cache = ResponseCache()
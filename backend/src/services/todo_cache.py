@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from ..models.todo import Todo, TodoRead
+from ..utils.cache_backends import MemoryCacheBackend, NullCacheBackend, RedisCacheBackend
+
+
+# A user's generation marker outlives individual entries; losing it only costs a round of misses
+GENERATION_TTL_SECONDS = 86400
+
+
+class TodoCache:
+    """
+    Read-through cache of each user's todo lists and single todos.
+
+    Every key is namespaced by a per-user generation token. Writes call
+    `invalidate`, which replaces the token, so all of that user's cached
+    reads become unreachable at once and simply age out of the backend.
+    Readers fetch the generation before querying the database, so a result
+    read before a concurrent write is only ever stored under the old one.
+    With the in-memory backend the token is per process, so a write elsewhere
+    only reaches this process's entries once they expire; HTTP validators
+    come from the database instead (get_todos_version_async).
+    """
+
+    def __init__(self, backend: Any, ttl: float = 30):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _generation_key(user_id: uuid.UUID) -> str:
+        return f"todos:{user_id}:gen"
+
+    def generation(self, user_id: uuid.UUID) -> str:
+        """Return the user's current generation token, starting a new one if none is stored."""
+        key = self._generation_key(user_id)
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            self.backend.set(key, generation, GENERATION_TTL_SECONDS)
+        return generation
+
+    def get(self, user_id: uuid.UUID, key: str) -> Tuple[str, Optional[Any]]:
+        """Look up a cached value. Returns the generation to store a miss under, and the value or None."""
+        generation = self.generation(user_id)
+        raw = self.backend.get(f"todos:{user_id}:{generation}:{key}")
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return generation, None if raw is None else json.loads(raw)
+
+    def set(self, user_id: uuid.UUID, generation: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under the generation returned by `get`."""
+        self.backend.set(f"todos:{user_id}:{generation}:{key}", json.dumps(value), self.ttl)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drop every cached read for a user. Call after committing any write to their todos."""
+        self.backend.set(self._generation_key(user_id), uuid.uuid4().hex, GENERATION_TTL_SECONDS)
+        with self._lock:
+            self.invalidations += 1
+
+    async def _run(self, func, *args):
+        # Network-backed stores would stall the event loop, so run them in a worker thread
+        if self.backend.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def ageneration(self, user_id: uuid.UUID) -> str:
+        return await self._run(self.generation, user_id)
+
+    async def aget(self, user_id: uuid.UUID, key: str) -> Tuple[str, Optional[Any]]:
+        return await self._run(self.get, user_id, key)
+
+    async def aset(self, user_id: uuid.UUID, generation: str, key: str, value: Any) -> None:
+        await self._run(self.set, user_id, generation, key, value)
+
+    async def ainvalidate(self, user_id: uuid.UUID) -> None:
+        await self._run(self.invalidate, user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/invalidation counters and the backend's occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "size": self.backend.size(),
+            }
+
+
+def dump_todos(todos: List[Todo]) -> List[dict]:
+    """Serialize todos into JSON-compatible dicts for caching."""
+    return [TodoRead.model_validate(todo).model_dump(mode="json") for todo in todos]
+
+
+def load_todos(data: List[dict]) -> List[Todo]:
+    """Rebuild detached Todo instances from cached dicts."""
+    return [Todo(**TodoRead.model_validate(item).model_dump()) for item in data]
+
+
+def _build_backend() -> Any:
+    backend = os.getenv("TODO_CACHE_BACKEND", "memory").lower()
+    if backend == "redis":
+        return RedisCacheBackend.from_url(os.getenv("TODO_CACHE_URL", "redis://localhost:6379/0"))
+    if backend == "none":
+        return NullCacheBackend()
+    return MemoryCacheBackend(maxsize=int(os.getenv("TODO_CACHE_SIZE", "4096")))
+
+
+todo_cache = TodoCache(
+    _build_backend(),
+    ttl=float(os.getenv("TODO_CACHE_TTL_SECONDS", "30")),
+)
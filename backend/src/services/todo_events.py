@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+from ..models.todo import Todo
+from ..utils.event_brokers import MemoryEventBroker, RedisEventBroker
+from .todo_cache import dump_todos
+
+
+# Events buffered per subscriber before it is told to resync instead
+TODO_EVENTS_QUEUE_SIZE = int(os.getenv("TODO_EVENTS_QUEUE_SIZE", "256"))
+
+# Key in Session.info under which a unit of work collects events until it commits
+DEFERRED_EVENTS = "todo_events"
+
+
+class TodoChangeFeed:
+    """
+    Per-user feed of committed todo changes: "created", "updated", "toggled"
+    and "deleted" events.
+
+    The services publish after each commit. Messages go through the broker, so
+    with Redis every worker's subscribers see every change. Each subscriber has
+    a bounded queue; one that falls behind has it replaced by a single "resync"
+    event, telling the client to re-fetch, so a slow client never holds up writers.
+    """
+
+    def __init__(self, broker: Any, queue_size: int = TODO_EVENTS_QUEUE_SIZE):
+        self.broker = broker
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set["asyncio.Queue[Dict[str, Any]]"]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+
+    async def start(self) -> None:
+        """Bind the feed to the running loop and start receiving from the broker."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start(self._deliver)
+
+    async def stop(self) -> None:
+        if self._loop is not None:
+            await self.broker.stop()
+            self._loop = None
+
+    def publish(
+        self,
+        session: Any,
+        user_id: UUID,
+        kind: str,
+        todos: Iterable[Todo] = (),
+        ids: Iterable[UUID] = ()
+    ) -> None:
+        """
+        Publish changes to a user's todos after `session` committed them. Inside
+        a unit of work the message waits in session.info until the unit commits.
+        """
+        events = [{"type": kind, "todo": todo} for todo in dump_todos(list(todos))]
+        events.extend({"type": kind, "id": str(todo_id)} for todo_id in ids)
+        if not events:
+            return
+
+        message = json.dumps({"user_id": str(user_id), "at": datetime.utcnow().isoformat(), "events": events})
+        deferred = session.info.get(DEFERRED_EVENTS)
+        if deferred is not None:
+            deferred.append(message)
+        else:
+            self.emit([message])
+
+    def emit(self, messages: List[str]) -> None:
+        """Hand messages to the broker. Safe to call from any thread."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        loop = self._loop or running
+        if loop is None:
+            # No event loop in this process, so nobody here can be listening
+            return
+        if loop is running:
+            self._send(messages)
+        else:
+            loop.call_soon_threadsafe(self._send, messages)
+
+    def _send(self, messages: List[str]) -> None:
+        for message in messages:
+            self.published += 1
+            self.broker.publish(message)
+
+    def _deliver(self, message: str) -> None:
+        payload = json.loads(message)
+        queues = self._subscribers.get(payload["user_id"])
+        if not queues:
+            return
+
+        for queue in queues:
+            for event in payload["events"]:
+                try:
+                    queue.put_nowait({**event, "at": payload["at"]})
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait({"type": "resync", "at": payload["at"]})
+                    self.resyncs += 1
+                    break
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: UUID) -> AsyncIterator["asyncio.Queue[Dict[str, Any]]"]:
+        """Receive a user's events on a queue for as long as the block runs."""
+        await self.start()
+        key = str(user_id)
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(key)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "broker": type(self.broker).__name__,
+            "users": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+        }
+
+
+def _build_broker() -> Any:
+    broker = os.getenv("TODO_EVENTS_BROKER", "memory").lower()
+    if broker == "redis":
+        return RedisEventBroker.from_url(os.getenv("TODO_EVENTS_URL", "redis://localhost:6379/0"))
+    return MemoryEventBroker()
+
+
+# Global instance shared by the todo services, the MCP tools and the event endpoints
+todo_feed = TodoChangeFeed(_build_broker())
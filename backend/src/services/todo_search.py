@@ -0,0 +1,95 @@
+import base64
+import json
+import re
+import uuid
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, column, func, literal, literal_column, or_, table
+from sqlmodel import select
+from ..database.search import FTS_KEY_TABLE, FTS_TABLE, SEARCH_CONFIG, SEARCH_DOCUMENT_SQL
+from ..models.todo import Todo
+
+# Words of a query beyond this many are ignored
+MAX_SEARCH_TERMS = 8
+
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_key = table(FTS_KEY_TABLE, column("id"), column("todo_id"))
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a query into lowercase words; punctuation and search operators are dropped."""
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+
+def encode_search_cursor(rank: float, todo_id: uuid.UUID) -> str:
+    """Encode a (rank, id) position in ranked search results as an opaque cursor string."""
+    raw = json.dumps([rank, str(todo_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """Decode a search cursor back into its (rank, id) position. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, todo_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(rank), uuid.UUID(todo_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid search cursor") from e
+
+
+def search_query(
+    dialect: str,
+    user_id: uuid.UUID,
+    terms: List[str],
+    cursor: Optional[str],
+    limit: int,
+    match_all: bool = True,
+    completed: Optional[bool] = None
+):
+    """
+    Select (Todo, rank) rows of the user's todos matching every term (any term
+    with `match_all=False`), each term as a prefix, best match first and then by
+    id. Higher ranks are better. One extra row is fetched for the next cursor.
+    """
+    if dialect == "postgresql":
+        operator = " & " if match_all else " | "
+        # Terms are plain words, so they can be joined into tsquery syntax directly
+        tsquery = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), literal(operator.join(f"{term}:*" for term in terms)))
+        document = literal_column(SEARCH_DOCUMENT_SQL)
+        rank = func.ts_rank(document, tsquery)
+        query = select(Todo, rank).where(Todo.user_id == user_id, document.op("@@")(tsquery))
+    elif dialect == "sqlite":
+        operator = " " if match_all else " OR "
+        fts = literal_column(FTS_TABLE)
+        # bm25() is lower for better matches; negate it so ranks compare the same way everywhere
+        rank = -func.bm25(fts)
+        query = (
+            select(Todo, rank)
+            .join_from(Todo, _fts_key, _fts_key.c.todo_id == Todo.id)
+            .join(_fts, _fts.c.rowid == _fts_key.c.id)
+            .where(Todo.user_id == user_id, fts.op("MATCH")(operator.join(f'"{term}"*' for term in terms)))
+        )
+    else:
+        # No full-text support: unranked substring matching
+        matches = [or_(Todo.title.ilike(f"%{term}%"), Todo.description.ilike(f"%{term}%")) for term in terms]
+        rank = literal(0.0)
+        query = select(Todo, rank).where(Todo.user_id == user_id, and_(*matches) if match_all else or_(*matches))
+
+    if completed is not None:
+        query = query.where(Todo.is_completed == completed)
+
+    if cursor:
+        after_rank, after_id = decode_search_cursor(cursor)
+        query = query.where(or_(rank < after_rank, and_(rank == after_rank, Todo.id > after_id)))
+
+    return query.order_by(rank.desc(), Todo.id).limit(limit + 1)
+
+
+def split_search_page(rows, limit: int) -> Tuple[List[Todo], Optional[str]]:
+    """Trim the look-ahead row from a page of (Todo, rank) rows and build the next cursor."""
+    rows = list(rows)
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        todo, rank = page[-1]
+        next_cursor = encode_search_cursor(rank, todo.id)
+    return [todo for todo, _ in page], next_cursor
@@ -1,18 +1,24 @@
 from sqlmodel import Session, select, update
-from typing import List, Optional
-from ..models.todo import Todo, TodoCreate, TodoUpdate
+from sqlalchemy import delete, not_
+from typing import Dict, List, Optional, Set, Tuple
+from ..models.todo import Todo, TodoCreate, TodoUpdate, TodoBatchUpdateItem
 from ..models.user import User
+from .pagination import apply_keyset, split_page
+from .todo_cache import todo_cache, dump_todos, load_todos
+from .todo_events import todo_feed
+from .todo_sync import record_deletions, purge_statement
 from datetime import datetime
 import uuid
 
 
 def create_todo(session: Session, todo: TodoCreate, user_id: uuid.UUID) -> Todo:
     """Create a new todo for a user."""
-    db_todo = Todo.model_validate(todo)
-    db_todo.user_id = user_id
+    db_todo = Todo.model_validate(todo, update={"user_id": user_id})
     session.add(db_todo)
     session.commit()
+    todo_cache.invalidate(user_id)
     session.refresh(db_todo)
+    todo_feed.publish(session, user_id, "created", [db_todo])
     return db_todo
 
 
@@ -24,6 +30,11 @@ def get_todos_by_user(
     limit: int = 100
 ) -> List[Todo]:
     """Get all todos for a specific user, with optional filtering."""
+    cache_key = f"list:{completed}:{offset}:{limit}"
+    generation, cached = todo_cache.get(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached)
+
     query = select(Todo).where(Todo.user_id == user_id)
 
     if completed is not None:
@@ -31,15 +42,85 @@ def get_todos_by_user(
 
     query = query.offset(offset).limit(limit)
 
-    return session.exec(query).all()
+    todos = session.exec(query).all()
+    todo_cache.set(user_id, generation, cache_key, dump_todos(todos))
+    return todos
 
 
-def get_todo_by_id_and_user(session: Session, todo_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Todo]:
-    """Get a specific todo by ID for a specific user."""
+def get_todos_page_by_user(
+    session: Session,
+    user_id: uuid.UUID,
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Tuple[List[Todo], Optional[str]]:
+    """Get one keyset page of a user's todos, ordered by (created_at, id), plus the next cursor."""
+    cache_key = f"page:{completed}:{cursor}:{limit}"
+    generation, cached = todo_cache.get(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached["items"]), cached["next_cursor"]
+
+    query = select(Todo).where(Todo.user_id == user_id)
+
+    if completed is not None:
+        query = query.where(Todo.is_completed == completed)
+
+    query = apply_keyset(query, cursor, limit)
+
+    todos, next_cursor = split_page(session.exec(query).all(), limit)
+    todo_cache.set(user_id, generation, cache_key, {"items": dump_todos(todos), "next_cursor": next_cursor})
+    return todos, next_cursor
+
+
+def _select_todo(session: Session, todo_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Todo]:
+    """Load one of the user's todos into the session, bypassing the cache."""
     query = select(Todo).where(Todo.id == todo_id, Todo.user_id == user_id)
     return session.exec(query).first()
 
 
+def get_todo_by_id_and_user(session: Session, todo_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Todo]:
+    """Get a specific todo by ID for a specific user."""
+    cache_key = f"todo:{todo_id}"
+    generation, cached = todo_cache.get(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached)[0]
+
+    db_todo = _select_todo(session, todo_id, user_id)
+    if db_todo is not None:
+        todo_cache.set(user_id, generation, cache_key, dump_todos([db_todo]))
+    return db_todo
+
+
+def _update_todo_returning(session: Session, todo_id: uuid.UUID, user_id: uuid.UUID, values: dict) -> Optional[Todo]:
+    """
+    Apply `values` to one of the user's todos in a single UPDATE ... RETURNING and commit.
+    Backends without UPDATE RETURNING fall back to UPDATE followed by a SELECT.
+    """
+    statement = (
+        update(Todo)
+        .where(Todo.id == todo_id, Todo.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if session.get_bind().dialect.update_returning:
+        result = session.exec(statement.returning(Todo).execution_options(populate_existing=True))
+        db_todo = result.scalars().first()
+        if db_todo is not None:
+            # Keep the returned row loaded; committing would otherwise expire it and force a SELECT
+            session.expunge(db_todo)
+        session.commit()
+        todo_cache.invalidate(user_id)
+        return db_todo
+
+    result = session.exec(statement)
+    session.commit()
+    if result.rowcount == 0:
+        return None
+    todo_cache.invalidate(user_id)
+    return _select_todo(session, todo_id, user_id)
+
+
 def update_todo_by_id_and_user(
     session: Session,
     todo_id: uuid.UUID,
@@ -47,51 +128,142 @@ def update_todo_by_id_and_user(
     todo_update: TodoUpdate
 ) -> Optional[Todo]:
     """Update a specific todo by ID for a specific user."""
-    db_todo = get_todo_by_id_and_user(session, todo_id, user_id)
-    if not db_todo:
-        return None
-
     # Prepare update data
     update_data = todo_update.model_dump(exclude_unset=True)
+    update_data["updated_at"] = datetime.utcnow()
 
-    # Update the todo
-    for field, value in update_data.items():
-        setattr(db_todo, field, value)
-
-    db_todo.updated_at = datetime.utcnow()
-
-    session.add(db_todo)
-    session.commit()
-    session.refresh(db_todo)
-
+    db_todo = _update_todo_returning(session, todo_id, user_id, update_data)
+    if db_todo is not None:
+        todo_feed.publish(session, user_id, "updated", [db_todo])
     return db_todo
 
 
 def delete_todo_by_id_and_user(session: Session, todo_id: uuid.UUID, user_id: uuid.UUID) -> bool:
     """Delete a specific todo by ID for a specific user."""
-    db_todo = get_todo_by_id_and_user(session, todo_id, user_id)
+    db_todo = _select_todo(session, todo_id, user_id)
     if not db_todo:
         return False
 
     session.delete(db_todo)
+    _log_deletions(session, user_id, [todo_id])
     session.commit()
+    todo_cache.invalidate(user_id)
+    todo_feed.publish(session, user_id, "deleted", ids=[todo_id])
     return True
 
 
 def toggle_todo_completion(session: Session, todo_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Todo]:
     """Toggle the completion status of a specific todo."""
-    db_todo = get_todo_by_id_and_user(session, todo_id, user_id)
-    if not db_todo:
-        return None
+    # Flipped in SQL, so concurrent toggles (e.g. a double click) each apply exactly once
+    db_todo = _update_todo_returning(session, todo_id, user_id, {
+        "is_completed": not_(Todo.is_completed),
+        "updated_at": datetime.utcnow(),
+    })
+    if db_todo is not None:
+        todo_feed.publish(session, user_id, "toggled", [db_todo])
+    return db_todo
 
-    db_todo.is_completed = not db_todo.is_completed
-    db_todo.updated_at = datetime.utcnow()
 
-    session.add(db_todo)
+def create_todos(session: Session, todos: List[TodoCreate], user_id: uuid.UUID) -> List[Todo]:
+    """Create several todos for a user in one transaction (batched into multi-row INSERTs)."""
+    db_todos = []
+    for todo in todos:
+        db_todo = Todo.model_validate(todo, update={"user_id": user_id})
+        db_todos.append(db_todo)
+
+    session.add_all(db_todos)
+    session.flush()
+    # All values are generated client-side, so nothing needs reloading after commit
+    for db_todo in db_todos:
+        session.expunge(db_todo)
     session.commit()
-    session.refresh(db_todo)
+    todo_cache.invalidate(user_id)
+    todo_feed.publish(session, user_id, "created", db_todos)
+    return db_todos
 
-    return db_todo
+
+def update_todos(
+    session: Session,
+    user_id: uuid.UUID,
+    items: List[TodoBatchUpdateItem]
+) -> Dict[uuid.UUID, Todo]:
+    """
+    Update several of a user's todos in one transaction.
+    Returns the updated todos by ID; IDs the user does not own are left out.
+    """
+    requested_ids = {item.id for item in items}
+    owned_ids = set(session.exec(
+        select(Todo.id).where(Todo.user_id == user_id, Todo.id.in_(requested_ids))
+    ).all())
+    if not owned_ids:
+        return {}
+
+    now = datetime.utcnow()
+    rows = []
+    for item in items:
+        if item.id in owned_ids:
+            values = item.model_dump(exclude_unset=True, exclude={"id"})
+            rows.append({"id": item.id, **values, "updated_at": now})
+
+    # ORM bulk UPDATE by primary key: one executemany per distinct set of changed columns
+    session.exec(update(Todo), params=rows)
+    updated = session.exec(
+        select(Todo).where(Todo.id.in_(owned_ids)).execution_options(populate_existing=True)
+    ).all()
+    for db_todo in updated:
+        session.expunge(db_todo)
+    session.commit()
+    todo_cache.invalidate(user_id)
+    todo_feed.publish(session, user_id, "updated", updated)
+    return {db_todo.id: db_todo for db_todo in updated}
+
+
+def delete_todos(session: Session, user_id: uuid.UUID, todo_ids: List[uuid.UUID]) -> Set[uuid.UUID]:
+    """Delete several of a user's todos in one statement. Returns the IDs actually deleted."""
+    statement = (
+        delete(Todo)
+        .where(Todo.user_id == user_id, Todo.id.in_(set(todo_ids)))
+        .execution_options(synchronize_session=False)
+    )
+
+    if session.get_bind().dialect.delete_returning:
+        deleted = set(session.exec(statement.returning(Todo.id)).scalars().all())
+    else:
+        deleted = set(session.exec(
+            select(Todo.id).where(Todo.user_id == user_id, Todo.id.in_(set(todo_ids)))
+        ).all())
+        session.exec(statement)
+
+    _log_deletions(session, user_id, deleted)
+    session.commit()
+    todo_cache.invalidate(user_id)
+    todo_feed.publish(session, user_id, "deleted", ids=deleted)
+    return deleted
+
+
+def delete_completed_todos(session: Session, user_id: uuid.UUID) -> int:
+    """Delete all of a user's completed todos in a single statement. Returns how many were deleted."""
+    completed = (Todo.user_id == user_id, Todo.is_completed == True)  # noqa: E712
+    statement = delete(Todo).where(*completed).execution_options(synchronize_session=False)
+
+    # The deleted IDs are needed for the change feed
+    if session.get_bind().dialect.delete_returning:
+        deleted = set(session.exec(statement.returning(Todo.id)).scalars().all())
+    else:
+        deleted = set(session.exec(select(Todo.id).where(*completed)).all())
+        session.exec(statement)
+
+    _log_deletions(session, user_id, deleted)
+    session.commit()
+    todo_cache.invalidate(user_id)
+    todo_feed.publish(session, user_id, "deleted", ids=deleted)
+    return len(deleted)
+
+
+def _log_deletions(session: Session, user_id: uuid.UUID, todo_ids) -> None:
+    """Tombstone deleted todos for delta sync, in the deleting transaction, and drop expired tombstones."""
+    record_deletions(session, user_id, todo_ids)
+    session.exec(purge_statement(user_id))
 
 
 def validate_user_owns_resource(session: Session, user_id: uuid.UUID, resource_user_id: uuid.UUID) -> bool:
@@ -1,8 +1,18 @@
-from sqlmodel import select, func
+import hashlib
+from sqlmodel import select, func, update
+from sqlalchemy import and_, case, delete, not_
+from collections import Counter
+from datetime import datetime, timedelta
+from pydantic_core import to_jsonable_python
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from typing import List, Optional
-from ..models.todo import Todo, TodoCreate, TodoUpdate
+from typing import Dict, List, Optional, Set, Tuple
+from ..models.todo import Todo, TodoCreate, TodoRead, TodoUpdate, TodoBatchUpdateItem, TodoChanges, TodoDayStats, TodoStats, TodoTombstone
+from .pagination import apply_keyset, split_page
+from .todo_cache import todo_cache, dump_todos, load_todos
+from .todo_events import todo_feed
+from .todo_search import search_query, search_terms, split_search_page
+from .todo_sync import changes_queries, next_watermark, purge_statement, record_deletions, resolve_since
 
 
 async def create_todo_async(session: AsyncSession, todo: TodoCreate, user_id: UUID) -> Todo:
@@ -10,19 +20,25 @@ async def create_todo_async(session: AsyncSession, todo: TodoCreate, user_id: UU
     Create a new todo asynchronously.
     """
     # Create a new Todo instance with the provided data
-    db_todo = Todo.model_validate(todo)
-    db_todo.user_id = user_id
+    db_todo = Todo.model_validate(todo, update={"user_id": user_id})
     session.add(db_todo)
     await session.commit()
+    await todo_cache.ainvalidate(user_id)
     await session.refresh(db_todo)
+    todo_feed.publish(session, user_id, "created", [db_todo])
     return db_todo
 
 
-async def get_todos_by_user_async(session: AsyncSession, user_id: UUID, completed: Optional[bool] = None, skip: int = 0, limit: int = 100) -> List[Todo]:
+async def get_todos_by_user_async(session: AsyncSession, user_id: UUID, completed: Optional[bool] = None, skip: int = 0, limit: int = 100, version: Optional[str] = None) -> List[Todo]:
     """
     Retrieve all todos for a specific user asynchronously.
     Optionally filter by completion status.
     """
+    cache_key = _versioned(f"list:{completed}:{skip}:{limit}", version)
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached)
+
     query = select(Todo).where(Todo.user_id == user_id)
 
     if completed is not None:
@@ -31,36 +47,296 @@ async def get_todos_by_user_async(session: AsyncSession, user_id: UUID, complete
     query = query.offset(skip).limit(limit)
 
     result = await session.exec(query)
-    return result.all()
+    todos = result.all()
+    await todo_cache.aset(user_id, generation, cache_key, dump_todos(todos))
+    return todos
 
 
-async def get_todo_by_id_and_user_async(session: AsyncSession, todo_id: UUID, user_id: UUID) -> Optional[Todo]:
+async def get_todos_version_async(session: AsyncSession, user_id: UUID) -> str:
     """
-    Retrieve a specific todo by ID and user ID asynchronously.
+    Version of everything a user can read under /todos, taken from the database
+    so every worker and process sees a write as soon as it commits: a digest of
+    the todo count, the latest updated_at (set by every create and update) and
+    the latest deletion. Writers' clocks are assumed to agree, as in delta sync.
+    """
+    last_deleted = (
+        select(func.max(TodoTombstone.deleted_at))
+        .where(TodoTombstone.user_id == user_id)
+        .scalar_subquery()
+    )
+    result = await session.exec(
+        select(func.count(Todo.id), func.max(Todo.updated_at), last_deleted).where(Todo.user_id == user_id)
+    )
+    count, last_updated, last_deleted_at = result.one()
+    return hashlib.sha1(f"{count}:{last_updated}:{last_deleted_at}".encode()).hexdigest()[:20]
+
+
+def _versioned(cache_key: str, version: Optional[str]) -> str:
+    # Entries read for a known database version are never served for another,
+    # even if this process missed the invalidation of a write made elsewhere
+    return f"{cache_key}@{version}" if version else cache_key
+
+
+# TodoRead's columns, in field order, selected as plain rows by the lean list reads
+_TODO_READ_COLUMNS = [getattr(Todo, name) for name in TodoRead.model_fields]
+
+
+def _rows_to_json(rows) -> List[dict]:
+    """JSON-ready TodoRead dicts straight from selected rows, without ORM objects or validation."""
+    return to_jsonable_python([row._asdict() for row in rows])
+
+
+async def get_todo_rows_by_user_async(
+    session: AsyncSession,
+    user_id: UUID,
+    completed: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    version: Optional[str] = None
+) -> List[dict]:
+    """
+    Lean get_todos_by_user_async for responses: the same todos as JSON-ready TodoRead
+    dicts, from the same cache entries, selecting only TodoRead's columns on a miss.
+    Pass the `version` from get_todos_version_async to only reuse entries read at it.
+    """
+    cache_key = _versioned(f"list:{completed}:{skip}:{limit}", version)
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return cached
+
+    query = select(*_TODO_READ_COLUMNS).where(Todo.user_id == user_id)
+
+    if completed is not None:
+        query = query.where(Todo.is_completed == completed)
+
+    query = query.offset(skip).limit(limit)
+
+    result = await session.exec(query)
+    rows = _rows_to_json(result.all())
+    await todo_cache.aset(user_id, generation, cache_key, rows)
+    return rows
+
+
+async def get_todo_rows_page_by_user_async(
+    session: AsyncSession,
+    user_id: UUID,
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+    version: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Lean get_todos_page_by_user_async for responses: one keyset page as JSON-ready
+    TodoRead dicts, sharing its cache entries, plus the cursor for the next page.
+    """
+    cache_key = _versioned(f"page:{completed}:{cursor}:{limit}:{descending}", version)
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return cached["items"], cached["next_cursor"]
+
+    query = select(*_TODO_READ_COLUMNS).where(Todo.user_id == user_id)
+
+    if completed is not None:
+        query = query.where(Todo.is_completed == completed)
+
+    query = apply_keyset(query, cursor, limit, descending)
+
+    result = await session.exec(query)
+    rows, next_cursor = split_page(result.all(), limit)
+    items = _rows_to_json(rows)
+    await todo_cache.aset(user_id, generation, cache_key, {"items": items, "next_cursor": next_cursor})
+    return items, next_cursor
+
+
+async def get_todos_page_by_user_async(
+    session: AsyncSession,
+    user_id: UUID,
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False
+) -> Tuple[List[Todo], Optional[str]]:
+    """
+    Retrieve one keyset page of a user's todos asynchronously, ordered by (created_at, id),
+    newest first with `descending`.
+    Returns the page and the cursor for the next one (None on the last page).
+    """
+    cache_key = f"page:{completed}:{cursor}:{limit}:{descending}"
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached["items"]), cached["next_cursor"]
+
+    query = select(Todo).where(Todo.user_id == user_id)
+
+    if completed is not None:
+        query = query.where(Todo.is_completed == completed)
+
+    query = apply_keyset(query, cursor, limit, descending)
+
+    result = await session.exec(query)
+    todos, next_cursor = split_page(result.all(), limit)
+    await todo_cache.aset(user_id, generation, cache_key, {"items": dump_todos(todos), "next_cursor": next_cursor})
+    return todos, next_cursor
+
+
+async def search_todos_async(
+    session: AsyncSession,
+    user_id: UUID,
+    q: str,
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    match_all: bool = True,
+    version: Optional[str] = None
+) -> Tuple[List[Todo], Optional[str]]:
+    """
+    Full-text search over a user's todo titles and descriptions, best match first.
+    Every word must match as a prefix (any word with `match_all=False`).
+    Returns the page and the cursor for the next one (None on the last page).
+    """
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+
+    cache_key = _versioned(f"search:{completed}:{cursor}:{limit}:{match_all}:{' '.join(terms)}", version)
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached["items"]), cached["next_cursor"]
+
+    query = search_query(session.get_bind().dialect.name, user_id, terms, cursor, limit, match_all, completed)
+    result = await session.exec(query)
+    todos, next_cursor = split_search_page(result.all(), limit)
+    await todo_cache.aset(user_id, generation, cache_key, {"items": dump_todos(todos), "next_cursor": next_cursor})
+    return todos, next_cursor
+
+
+async def get_todo_stats_async(session: AsyncSession, user_id: UUID, days: int = 30, version: Optional[str] = None) -> TodoStats:
+    """
+    Count a user's todos in one GROUP BY query: totals, plus todos created and
+    completed per day over the last `days` days. There is no completion
+    timestamp, so a completed todo counts on the day it was last updated.
+    """
+    today = datetime.utcnow().date()
+    # The window moves at midnight, so entries are per day as well
+    cache_key = _versioned(f"stats:{days}:{today}", version)
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return TodoStats.model_validate(cached)
+
+    start = today - timedelta(days=days - 1)
+    since = datetime.combine(start, datetime.min.time())
+
+    # Days outside the window collapse into NULL, so the group count stays bounded
+    created_day = case((Todo.created_at >= since, func.date(Todo.created_at)), else_=None)
+    completed_day = case(
+        (and_(Todo.is_completed == True, Todo.updated_at >= since), func.date(Todo.updated_at)),  # noqa: E712
+        else_=None
+    )
+    result = await session.exec(
+        select(
+            Todo.is_completed.label("is_completed"),
+            created_day.label("created_day"),
+            completed_day.label("completed_day"),
+            func.count().label("todos")
+        )
+        .where(Todo.user_id == user_id)
+        # By label, so each CASE is not repeated with its own bound parameters
+        .group_by("is_completed", "created_day", "completed_day")
+    )
+
+    total = completed = 0
+    created_per_day: Counter = Counter()
+    completed_per_day: Counter = Counter()
+    for is_completed, created_on, completed_on, count in result.all():
+        total += count
+        if is_completed:
+            completed += count
+        # SQLite returns the day as text, PostgreSQL as a date
+        if created_on is not None:
+            created_per_day[str(created_on)] += count
+        if completed_on is not None:
+            completed_per_day[str(completed_on)] += count
+
+    window = [start + timedelta(days=offset) for offset in range(days)]
+    stats = TodoStats(
+        total=total,
+        pending=total - completed,
+        completed=completed,
+        days=[
+            TodoDayStats(day=day, created=created_per_day[day.isoformat()], completed=completed_per_day[day.isoformat()])
+            for day in window
+        ]
+    )
+    await todo_cache.aset(user_id, generation, cache_key, stats.model_dump(mode="json"))
+    return stats
+
+
+async def _select_todo_async(session: AsyncSession, todo_id: UUID, user_id: UUID) -> Optional[Todo]:
+    """
+    Load one of the user's todos into the session asynchronously, bypassing the cache.
     """
     query = select(Todo).where(Todo.id == todo_id, Todo.user_id == user_id)
     result = await session.exec(query)
     return result.first()
 
 
-async def update_todo_by_id_and_user_async(session: AsyncSession, todo_id: UUID, user_id: UUID, todo_update: TodoUpdate) -> Optional[Todo]:
+async def get_todo_by_id_and_user_async(session: AsyncSession, todo_id: UUID, user_id: UUID, version: Optional[str] = None) -> Optional[Todo]:
     """
-    Update a specific todo by ID and user ID asynchronously.
+    Retrieve a specific todo by ID and user ID asynchronously.
     """
-    db_todo = await get_todo_by_id_and_user_async(session, todo_id, user_id)
-    if not db_todo:
+    cache_key = _versioned(f"todo:{todo_id}", version)
+    generation, cached = await todo_cache.aget(user_id, cache_key)
+    if cached is not None:
+        return load_todos(cached)[0]
+
+    db_todo = await _select_todo_async(session, todo_id, user_id)
+    if db_todo is not None:
+        await todo_cache.aset(user_id, generation, cache_key, dump_todos([db_todo]))
+    return db_todo
+
+
+async def _update_todo_returning_async(session: AsyncSession, todo_id: UUID, user_id: UUID, values: dict) -> Optional[Todo]:
+    """
+    Apply `values` to one of the user's todos in a single UPDATE ... RETURNING and commit.
+    Backends without UPDATE RETURNING fall back to UPDATE followed by a SELECT.
+    """
+    statement = (
+        update(Todo)
+        .where(Todo.id == todo_id, Todo.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if session.get_bind().dialect.update_returning:
+        result = await session.exec(statement.returning(Todo).execution_options(populate_existing=True))
+        db_todo = result.scalars().first()
+        if db_todo is not None:
+            # Expired attributes cannot be lazily reloaded in async code, so detach before committing
+            session.expunge(db_todo)
+        await session.commit()
+        await todo_cache.ainvalidate(user_id)
+        return db_todo
+
+    result = await session.exec(statement)
+    await session.commit()
+    if result.rowcount == 0:
         return None
+    await todo_cache.ainvalidate(user_id)
+    return await _select_todo_async(session, todo_id, user_id)
 
+
+async def update_todo_by_id_and_user_async(session: AsyncSession, todo_id: UUID, user_id: UUID, todo_update: TodoUpdate) -> Optional[Todo]:
+    """
+    Update a specific todo by ID and user ID asynchronously.
+    """
     # Update the todo with the provided values
     update_data = todo_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_todo, field, value)
-
-    db_todo.updated_at = func.now()
+    update_data["updated_at"] = datetime.utcnow()
 
-    session.add(db_todo)
-    await session.commit()
-    await session.refresh(db_todo)
+    db_todo = await _update_todo_returning_async(session, todo_id, user_id, update_data)
+    if db_todo is not None:
+        todo_feed.publish(session, user_id, "updated", [db_todo])
     return db_todo
 
 
@@ -69,27 +345,168 @@ async def delete_todo_by_id_and_user_async(session: AsyncSession, todo_id: UUID,
     Delete a specific todo by ID and user ID asynchronously.
     Returns True if deletion was successful, False otherwise.
     """
-    db_todo = await get_todo_by_id_and_user_async(session, todo_id, user_id)
+    db_todo = await _select_todo_async(session, todo_id, user_id)
     if not db_todo:
         return False
 
     await session.delete(db_todo)
+    await _log_deletions_async(session, user_id, [todo_id])
     await session.commit()
+    await todo_cache.ainvalidate(user_id)
+    todo_feed.publish(session, user_id, "deleted", ids=[todo_id])
     return True
 
 
 async def toggle_todo_completion_async(session: AsyncSession, todo_id: UUID, user_id: UUID) -> Optional[Todo]:
     """
     Toggle the completion status of a specific todo asynchronously.
+    The flip happens in SQL, so concurrent toggles each apply exactly once.
     """
-    db_todo = await get_todo_by_id_and_user_async(session, todo_id, user_id)
-    if not db_todo:
-        return None
+    db_todo = await _update_todo_returning_async(session, todo_id, user_id, {
+        "is_completed": not_(Todo.is_completed),
+        "updated_at": datetime.utcnow(),
+    })
+    if db_todo is not None:
+        todo_feed.publish(session, user_id, "toggled", [db_todo])
+    return db_todo
 
-    db_todo.is_completed = not db_todo.is_completed
-    db_todo.updated_at = func.now()
 
-    session.add(db_todo)
+async def create_todos_async(session: AsyncSession, todos: List[TodoCreate], user_id: UUID) -> List[Todo]:
+    """
+    Create several todos for a user asynchronously, in one transaction
+    (batched into multi-row INSERTs).
+    """
+    db_todos = []
+    for todo in todos:
+        db_todo = Todo.model_validate(todo, update={"user_id": user_id})
+        db_todos.append(db_todo)
+
+    session.add_all(db_todos)
+    await session.flush()
+    # All values are generated client-side, so nothing needs reloading after commit
+    for db_todo in db_todos:
+        session.expunge(db_todo)
     await session.commit()
-    await session.refresh(db_todo)
-    return db_todo
\ No newline at end of file
+    await todo_cache.ainvalidate(user_id)
+    todo_feed.publish(session, user_id, "created", db_todos)
+    return db_todos
+
+
+async def update_todos_async(session: AsyncSession, user_id: UUID, items: List[TodoBatchUpdateItem]) -> Dict[UUID, Todo]:
+    """
+    Update several of a user's todos asynchronously, in one transaction.
+    Returns the updated todos by ID; IDs the user does not own are left out.
+    """
+    requested_ids = {item.id for item in items}
+    result = await session.exec(
+        select(Todo.id).where(Todo.user_id == user_id, Todo.id.in_(requested_ids))
+    )
+    owned_ids = set(result.all())
+    if not owned_ids:
+        return {}
+
+    now = datetime.utcnow()
+    rows = []
+    for item in items:
+        if item.id in owned_ids:
+            values = item.model_dump(exclude_unset=True, exclude={"id"})
+            rows.append({"id": item.id, **values, "updated_at": now})
+
+    # ORM bulk UPDATE by primary key: one executemany per distinct set of changed columns
+    await session.exec(update(Todo), params=rows)
+    result = await session.exec(
+        select(Todo).where(Todo.id.in_(owned_ids)).execution_options(populate_existing=True)
+    )
+    updated = result.all()
+    for db_todo in updated:
+        session.expunge(db_todo)
+    await session.commit()
+    await todo_cache.ainvalidate(user_id)
+    todo_feed.publish(session, user_id, "updated", updated)
+    return {db_todo.id: db_todo for db_todo in updated}
+
+
+async def delete_todos_async(session: AsyncSession, user_id: UUID, todo_ids: List[UUID]) -> Set[UUID]:
+    """
+    Delete several of a user's todos asynchronously, in one statement.
+    Returns the IDs actually deleted.
+    """
+    statement = (
+        delete(Todo)
+        .where(Todo.user_id == user_id, Todo.id.in_(set(todo_ids)))
+        .execution_options(synchronize_session=False)
+    )
+
+    if session.get_bind().dialect.delete_returning:
+        result = await session.exec(statement.returning(Todo.id))
+        deleted = set(result.scalars().all())
+    else:
+        result = await session.exec(
+            select(Todo.id).where(Todo.user_id == user_id, Todo.id.in_(set(todo_ids)))
+        )
+        deleted = set(result.all())
+        await session.exec(statement)
+
+    await _log_deletions_async(session, user_id, deleted)
+    await session.commit()
+    await todo_cache.ainvalidate(user_id)
+    todo_feed.publish(session, user_id, "deleted", ids=deleted)
+    return deleted
+
+
+async def delete_completed_todos_async(session: AsyncSession, user_id: UUID) -> int:
+    """
+    Delete all of a user's completed todos asynchronously, in a single statement.
+    Returns how many were deleted.
+    """
+    completed = (Todo.user_id == user_id, Todo.is_completed == True)  # noqa: E712
+    statement = delete(Todo).where(*completed).execution_options(synchronize_session=False)
+
+    # The deleted IDs are needed for the change feed
+    if session.get_bind().dialect.delete_returning:
+        result = await session.exec(statement.returning(Todo.id))
+        deleted = set(result.scalars().all())
+    else:
+        result = await session.exec(select(Todo.id).where(*completed))
+        deleted = set(result.all())
+        await session.exec(statement)
+
+    await _log_deletions_async(session, user_id, deleted)
+    await session.commit()
+    await todo_cache.ainvalidate(user_id)
+    todo_feed.publish(session, user_id, "deleted", ids=deleted)
+    return len(deleted)
+
+
+async def _log_deletions_async(session: AsyncSession, user_id: UUID, todo_ids) -> None:
+    """Tombstone deleted todos for delta sync, in the deleting transaction, and drop expired tombstones."""
+    record_deletions(session, user_id, todo_ids)
+    await session.exec(purge_statement(user_id))
+
+
+async def get_todo_changes_async(session: AsyncSession, user_id: UUID, since: Optional[str] = None, limit: int = 1000) -> TodoChanges:
+    """
+    Todos created or updated after the `since` watermark, plus tombstones of the
+    ones deleted since, and the watermark for the next call. Without a usable
+    watermark, the full list is returned (in pages) with `reset` set.
+    Raises ValueError if the watermark is malformed.
+    """
+    now = datetime.utcnow()
+    position = resolve_since(since, now)
+    todos_query, tombstones_query = changes_queries(user_id, position, limit)
+
+    result = await session.exec(todos_query)
+    todos, watermark, has_more = next_watermark(result.all(), limit, position, now)
+
+    tombstones = []
+    if tombstones_query is not None:
+        result = await session.exec(tombstones_query)
+        tombstones = result.all()
+
+    return TodoChanges(
+        todos=todos,
+        deleted=tombstones,
+        watermark=watermark,
+        has_more=has_more,
+        reset=position is None
+    )
@@ -0,0 +1,105 @@
+import base64
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import delete, tuple_
+from sqlmodel import select
+from ..models.todo import Todo, TodoTombstone
+
+
+# How long deletions are remembered; clients whose sync started before that get a full reset
+TODO_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TODO_TOMBSTONE_RETENTION_DAYS", "30"))
+# How far behind "now" a final watermark is held, so writes still committing are not skipped
+TODO_SYNC_SKEW_SECONDS = float(os.getenv("TODO_SYNC_SKEW_SECONDS", "5"))
+
+# (updated_at, id) of the last change sent, and when the sync it belongs to started:
+# the final watermark it resumed from, or the time of the first page of a full sync
+Watermark = Tuple[datetime, uuid.UUID, datetime]
+
+
+def encode_watermark(position: Watermark) -> str:
+    """Encode an (updated_at, id, started_at) sync position as an opaque watermark string."""
+    updated_at, todo_id, started_at = position
+    raw = json.dumps([updated_at.isoformat(), str(todo_id), started_at.isoformat()], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_watermark(watermark: str) -> Watermark:
+    """Decode a watermark back into its (updated_at, id, started_at) position. Raises ValueError if malformed."""
+    try:
+        padded = watermark + "=" * (-len(watermark) % 4)
+        updated_at, todo_id, started_at = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(updated_at), uuid.UUID(todo_id), datetime.fromisoformat(started_at)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid sync watermark") from e
+
+
+def record_deletions(session, user_id: uuid.UUID, todo_ids: Iterable[uuid.UUID], now: Optional[datetime] = None) -> None:
+    """Add tombstones for deleted todos to the session's transaction (sync or async)."""
+    now = now or datetime.utcnow()
+    session.add_all([TodoTombstone(id=todo_id, user_id=user_id, deleted_at=now) for todo_id in todo_ids])
+
+
+def purge_statement(user_id: uuid.UUID, now: Optional[datetime] = None):
+    """DELETE of the user's tombstones older than the retention period."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=TODO_TOMBSTONE_RETENTION_DAYS)
+    return (
+        delete(TodoTombstone)
+        .where(TodoTombstone.user_id == user_id, TodoTombstone.deleted_at < cutoff)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def changes_queries(user_id: uuid.UUID, since: Optional[Watermark], limit: int):
+    """
+    SELECTs of todos changed after `since`, ordered by (updated_at, id) with one
+    look-ahead row, and of tombstones after it (None on a full sync).
+    """
+    todos = select(Todo).where(Todo.user_id == user_id)
+    if since is not None:
+        todos = todos.where(tuple_(Todo.updated_at, Todo.id) > tuple_(since[0], since[1]))
+    todos = todos.order_by(Todo.updated_at, Todo.id).limit(limit + 1)
+
+    tombstones = None
+    if since is not None:
+        tombstones = (
+            select(TodoTombstone)
+            .where(TodoTombstone.user_id == user_id, TodoTombstone.deleted_at > since[0])
+            .order_by(TodoTombstone.deleted_at)
+        )
+    return todos, tombstones
+
+
+def resolve_since(watermark: Optional[str], now: datetime) -> Optional[Watermark]:
+    """
+    Decode the client's watermark; None means a full sync, either because none
+    was sent or because its sync started before the oldest tombstones still kept.
+    Mid-sync watermarks are judged by that start, not by their position, so paging
+    through changes older than the retention period still reaches the end.
+    """
+    if not watermark:
+        return None
+    since = decode_watermark(watermark)
+    if since[2] < now - timedelta(days=TODO_TOMBSTONE_RETENTION_DAYS):
+        return None
+    return since
+
+
+def next_watermark(rows: List[Todo], limit: int, since: Optional[Watermark], now: datetime) -> Tuple[List[Todo], str, bool]:
+    """
+    Trim the look-ahead row and pick the watermark for the next sync: the last
+    row when more are waiting (keeping the sync's start), otherwise "now" minus
+    the skew (never behind `since`), which starts the next sync.
+    Changes inside the skew window may be sent twice; applying them is idempotent.
+    """
+    if len(rows) > limit:
+        page = rows[:limit]
+        started_at = since[2] if since is not None else now
+        return page, encode_watermark((page[-1].updated_at, page[-1].id, started_at)), True
+
+    position = (now - timedelta(seconds=TODO_SYNC_SKEW_SECONDS), uuid.UUID(int=0))
+    if since is not None and since[:2] > position:
+        position = since[:2]
+    return rows, encode_watermark((*position, position[0])), False
@@ -0,0 +1,421 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database.session import get_session_context, get_unit_of_work
+from ..models.todo import TodoCreate, TodoUpdate
+from .llm_client import ToolCall
+from .todo_cache import todo_cache, dump_todos
+from .todo_events import DEFERRED_EVENTS, todo_feed
+from .todo_service_async import (
+    create_todo_async,
+    get_todos_page_by_user_async,
+    search_todos_async,
+    update_todo_by_id_and_user_async,
+    delete_todo_by_id_and_user_async
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Tasks per list_tasks page when the caller does not ask for a size, and the most it may ask for
+TOOL_LIST_PAGE_SIZE = int(os.getenv("TOOL_LIST_PAGE_SIZE", "50"))
+TOOL_LIST_MAX_PAGE_SIZE = int(os.getenv("TOOL_LIST_MAX_PAGE_SIZE", "200"))
+
+LIST_SORT_ORDERS = ("oldest", "newest")
+
+
+class ToolResult(BaseModel):
+    content: str
+    is_error: bool = False
+    metadata: Dict[str, Any] = {}
+
+
+# JSON-schema declarations of the todo tools. The user is never a model-supplied
+# argument: callers pass the authenticated user's ID alongside the arguments.
+TOOL_SPECS: List[Dict[str, Any]] = [
+    {
+        "name": "add_task",
+        "description": "Add a new task to the user's todo list",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string", "description": "The title of the task"},
+                "description": {"type": "string", "description": "Optional description of the task"},
+            },
+            "required": ["title"],
+        },
+    },
+    {
+        "name": "list_tasks",
+        "description": "List the user's tasks one page at a time; pass next_cursor back as cursor for the next page",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "completed": {"type": "boolean", "description": "Filter by completion status (true for completed, false for pending, omit for all)"},
+                "query": {"type": "string", "description": "Full-text search over titles and descriptions; results come best match first"},
+                "sort": {"type": "string", "enum": list(LIST_SORT_ORDERS), "description": "Creation order without a query: oldest (default) or newest first"},
+                "page_size": {"type": "integer", "description": f"Tasks per page (default {TOOL_LIST_PAGE_SIZE}, at most {TOOL_LIST_MAX_PAGE_SIZE})"},
+                "cursor": {"type": "string", "description": "next_cursor from the previous page"},
+            },
+        },
+    },
+    {
+        "name": "complete_task",
+        "description": "Mark a task as complete",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "task_id": {"type": "string", "description": "The UUID of the task to complete"},
+            },
+            "required": ["task_id"],
+        },
+    },
+    {
+        "name": "delete_task",
+        "description": "Delete a task from the user's todo list",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "task_id": {"type": "string", "description": "The UUID of the task to delete"},
+            },
+            "required": ["task_id"],
+        },
+    },
+    {
+        "name": "update_task",
+        "description": "Update an existing task",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "task_id": {"type": "string", "description": "The UUID of the task to update"},
+                "title": {"type": "string", "description": "New title for the task (optional)"},
+                "description": {"type": "string", "description": "New description for the task (optional)"},
+                "is_completed": {"type": "boolean", "description": "New completion status (optional)"},
+            },
+            "required": ["task_id"],
+        },
+    },
+]
+
+
+async def add_task(session: AsyncSession, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+    """Add a new task to the user's todo list."""
+    todo_create = TodoCreate(
+        title=arguments["title"],
+        description=arguments.get("description", "")
+    )
+    new_todo = await create_todo_async(session, todo_create, user_id)
+    return ToolResult(
+        content=f"Successfully added task: {new_todo.title}",
+        metadata={"task_id": str(new_todo.id)}
+    )
+
+
+async def list_tasks(session: AsyncSession, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+    """
+    List one keyset page of the user's tasks, or of full-text search results
+    when a query is given. The rows and the cursor of the next page are returned
+    in metadata; the content is a compact listing of the page.
+    """
+    sort = arguments.get("sort") or "oldest"
+    if sort not in LIST_SORT_ORDERS:
+        raise ValueError(f"sort must be one of: {', '.join(LIST_SORT_ORDERS)}")
+    page_size = min(max(int(arguments.get("page_size") or TOOL_LIST_PAGE_SIZE), 1), TOOL_LIST_MAX_PAGE_SIZE)
+
+    if arguments.get("query"):
+        todos, next_cursor = await search_todos_async(
+            session,
+            user_id,
+            arguments["query"],
+            arguments.get("completed"),
+            cursor=arguments.get("cursor"),
+            limit=page_size
+        )
+    else:
+        todos, next_cursor = await get_todos_page_by_user_async(
+            session,
+            user_id,
+            arguments.get("completed"),
+            cursor=arguments.get("cursor"),
+            limit=page_size,
+            descending=sort == "newest"
+        )
+
+    lines = [
+        f"- {'✓' if todo.is_completed else '○'} [{todo.id}] {todo.title}"
+        for todo in todos
+    ]
+    content = "\n".join(lines) if lines else "No tasks found."
+    if next_cursor:
+        content += f"\nMore tasks: call list_tasks again with cursor={next_cursor}"
+
+    return ToolResult(
+        content=content,
+        metadata={
+            "tasks": dump_todos(todos),
+            "task_count": len(todos),
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+async def complete_task(session: AsyncSession, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+    """Mark a task as complete."""
+    task_id = UUID(arguments["task_id"])
+    # Set rather than toggle, so repeating the call (or a model retry) never reopens the task
+    updated_todo = await update_todo_by_id_and_user_async(session, task_id, user_id, TodoUpdate(is_completed=True))
+
+    if not updated_todo:
+        return ToolResult(
+            content="Task not found or you don't have permission to update it.",
+            is_error=True
+        )
+
+    return ToolResult(
+        content=f"Successfully marked task as complete: {updated_todo.title}",
+        metadata={"task_id": str(updated_todo.id), "is_completed": updated_todo.is_completed}
+    )
+
+
+async def delete_task(session: AsyncSession, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+    """Delete a task from the user's todo list."""
+    task_id = UUID(arguments["task_id"])
+    success = await delete_todo_by_id_and_user_async(session, task_id, user_id)
+
+    if not success:
+        return ToolResult(
+            content="Task not found or you don't have permission to delete it.",
+            is_error=True
+        )
+
+    return ToolResult(content="Successfully deleted the task.")
+
+
+async def update_task(session: AsyncSession, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+    """Update an existing task."""
+    task_id = UUID(arguments["task_id"])
+
+    # Prepare the update object with provided values
+    update_data = {
+        field: arguments[field]
+        for field in ("title", "description", "is_completed")
+        if field in arguments
+    }
+    if not update_data:
+        return ToolResult(
+            content="No fields to update were provided.",
+            is_error=True
+        )
+
+    updated_todo = await update_todo_by_id_and_user_async(session, task_id, user_id, TodoUpdate(**update_data))
+
+    if not updated_todo:
+        return ToolResult(
+            content="Task not found or you don't have permission to update it.",
+            is_error=True
+        )
+
+    return ToolResult(
+        content=f"Successfully updated task: {updated_todo.title}",
+        metadata={"task_id": str(updated_todo.id)}
+    )
+
+
+TOOLS: Dict[str, Callable[[AsyncSession, UUID, Dict[str, Any]], Awaitable[ToolResult]]] = {
+    "add_task": add_task,
+    "list_tasks": list_tasks,
+    "complete_task": complete_task,
+    "delete_task": delete_task,
+    "update_task": update_task,
+}
+
+
+# Tools that write, whose users' cached todos are invalidated once their unit commits
+WRITE_TOOLS = {"add_task", "complete_task", "delete_task", "update_task"}
+
+
+class ToolStats:
+    """Per-tool call counts, errors and latencies, plus the size of each unit of work."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, float]] = {}
+        self.units = 0
+        self.unit_calls = 0
+        self.unit_failures = 0
+
+    def record_call(self, name: str, elapsed: float, is_error: bool) -> None:
+        with self._lock:
+            tool = self._tools.setdefault(name, {"calls": 0, "errors": 0, "total": 0.0, "max": 0.0})
+            tool["calls"] += 1
+            tool["errors"] += int(is_error)
+            tool["total"] += elapsed
+            tool["max"] = max(tool["max"], elapsed)
+
+    def record_unit(self, calls: int, failed: bool) -> None:
+        with self._lock:
+            self.units += 1
+            self.unit_calls += calls
+            self.unit_failures += int(failed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "units": self.units,
+                "calls_per_unit_avg": round(self.unit_calls / self.units, 3) if self.units else 0.0,
+                "unit_failures": self.unit_failures,
+                "tools": {
+                    name: {
+                        "calls": int(tool["calls"]),
+                        "errors": int(tool["errors"]),
+                        "latency_avg_ms": round(tool["total"] * 1000 / tool["calls"], 3),
+                        "latency_max_ms": round(tool["max"] * 1000, 3),
+                    }
+                    for name, tool in self._tools.items()
+                },
+            }
+
+
+class ToolBatcher:
+    """
+    Groups one user's tool calls submitted in the same event loop tick into one
+    unit of work: one session and one transaction, committed once. Each call
+    runs in a SAVEPOINT, so a failing call is rolled back alone and reported as
+    an error result. A session runs one statement at a time, so a unit's calls
+    run in the order they were submitted; different users' units run
+    concurrently, and one failing to commit never affects another.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any] = get_unit_of_work,
+        stats: Optional[ToolStats] = None
+    ):
+        self._session_factory = session_factory
+        self.stats = stats or ToolStats()
+        self._pending: Dict[UUID, List[Tuple[str, UUID, Dict[str, Any], "asyncio.Future[ToolResult]"]]] = {}
+        self._units: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, name: str, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+        """Queue a tool call for the user's unit of work in this tick and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if user_id not in self._pending:
+            # Runs after every task that is already ready, so they can join this unit
+            self._pending[user_id] = []
+            loop.call_soon(self._flush, user_id)
+        self._pending[user_id].append((name, user_id, arguments, future))
+
+        started = time.perf_counter()
+        result = await future
+        self.stats.record_call(name, time.perf_counter() - started, result.is_error)
+        return result
+
+    def _flush(self, user_id: UUID) -> None:
+        calls = self._pending.pop(user_id)
+        task = asyncio.ensure_future(self._run_unit(calls))
+        self._units.add(task)
+        task.add_done_callback(self._units.discard)
+
+    async def _run_unit(self, calls: List[Tuple[str, UUID, Dict[str, Any], "asyncio.Future[ToolResult]"]]) -> None:
+        results: List[ToolResult] = []
+        events: List[str] = []
+        try:
+            async with self._session_factory() as session:
+                # Change events wait here until the unit commits
+                session.info[DEFERRED_EVENTS] = events
+                for name, user_id, arguments, _ in calls:
+                    results.append(await self._run_call(session, name, user_id, arguments))
+        except Exception as e:
+            logger.error(f"Error committing tool calls: {str(e)}")
+            results = [
+                ToolResult(content=f"Error running {name}: {str(e)}", is_error=True)
+                for name, _, _, _ in calls
+            ]
+            self.stats.record_unit(len(calls), failed=True)
+        else:
+            self.stats.record_unit(len(calls), failed=False)
+            # The services invalidated before the unit committed, so readers may have re-cached old rows
+            if any(name in WRITE_TOOLS for name, _, _, _ in calls):
+                await todo_cache.ainvalidate(calls[0][1])
+            todo_feed.emit(events)
+
+        for (_, _, _, future), result in zip(calls, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    async def _run_call(session: AsyncSession, name: str, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+        tool = TOOLS.get(name)
+        if tool is None:
+            return ToolResult(content=f"Unknown tool: {name}", is_error=True)
+
+        events = session.info[DEFERRED_EVENTS]
+        published = len(events)
+        try:
+            async with session.begin_nested():
+                return await tool(session, user_id, arguments)
+        except Exception as e:
+            # The call's changes were rolled back, so its events never happened
+            del events[published:]
+            logger.error(f"Error running {name}: {str(e)}")
+            return ToolResult(content=f"Error running {name}: {str(e)}", is_error=True)
+
+
+# Global instance shared by the MCP server and the internal stats endpoint
+tool_batcher = ToolBatcher()
+
+
+async def run_tool(name: str, user_id: UUID, arguments: Dict[str, Any]) -> ToolResult:
+    """
+    Run one todo tool for a user, in a unit of work shared with the user's other
+    calls submitted in the same tick. Failures are returned as error results, never raised.
+    """
+    return await tool_batcher.submit(name, user_id, arguments)
+
+
+async def run_tool_in_own_session(
+    name: str,
+    user_id: UUID,
+    arguments: Dict[str, Any],
+    session_factory: Callable[[], Any] = get_session_context
+) -> ToolResult:
+    """
+    Run one todo tool for a user in its own session from the async engine's pool,
+    committed on its own. Failures are returned as error results, never raised.
+    """
+    started = time.perf_counter()
+    tool = TOOLS.get(name)
+    if tool is None:
+        result = ToolResult(content=f"Unknown tool: {name}", is_error=True)
+    else:
+        try:
+            async with session_factory() as session:
+                result = await tool(session, user_id, arguments)
+        except Exception as e:
+            logger.error(f"Error running {name}: {str(e)}")
+            result = ToolResult(content=f"Error running {name}: {str(e)}", is_error=True)
+
+    tool_batcher.stats.record_call(name, time.perf_counter() - started, result.is_error)
+    return result
+
+
+async def run_tools(
+    calls: List[ToolCall],
+    user_id: UUID,
+    session_factory: Optional[Callable[[], Any]] = None
+) -> List[ToolResult]:
+    """
+    Run one model turn's tool calls concurrently, each on its own pooled session,
+    so independent calls do not wait on each other. Results come back in the order of `calls`.
+    """
+    factory = session_factory or get_session_context
+    return list(await asyncio.gather(*(
+        run_tool_in_own_session(call.name, user_id, call.arguments, factory) for call in calls
+    )))
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU store of string values with a per-entry TTL.
+
+    Lookups never block on I/O, so async callers use it directly.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 4096, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = self._clock() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Store backed by a Redis-compatible client (redis-py, or tests.fake_redis.FakeRedis).
+
+    Only GET, SET with EX and DEL are used. Calls go over the network, so async
+    callers run them in a worker thread.
+    """
+
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = "todo-app:"):
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis package is required for the redis cache backend") from e
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self._prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._client.set(self._prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class NullCacheBackend:
+    """Stores nothing; every lookup misses. Used when caching is disabled."""
+
+    blocking = False
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def size(self) -> int:
+        return 0
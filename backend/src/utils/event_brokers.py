@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Any, Callable, Optional, Set
+
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str], None]
+
+
+class MemoryEventBroker:
+    """
+    Hands published messages straight back to this process's subscribers.
+
+    Workers do not see each other's events; use it with a single worker.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, message: str) -> None:
+        if self._deliver is not None:
+            self._deliver(message)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+class RedisEventBroker:
+    """
+    Fans messages out to every worker through a Redis pub/sub channel
+    (redis.asyncio, or a compatible fake in tests).
+
+    A worker's own messages also come back through the channel, so each event
+    is delivered exactly once per worker. publish() must be called on the event loop.
+    """
+
+    def __init__(self, client: Any, channel: str = "todo-app:todo-events"):
+        self._client = client
+        self._channel = channel
+        self._listener: Optional["asyncio.Task[None]"] = None
+        self._sends: Set["asyncio.Task[Any]"] = set()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisEventBroker":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("The redis package is required for the redis event broker") from e
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    async def start(self, deliver: Deliver) -> None:
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._channel)
+        self._listener = asyncio.ensure_future(self._listen(pubsub, deliver))
+
+    async def _listen(self, pubsub: Any, deliver: Deliver) -> None:
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") != "message":
+                    continue
+                data = item["data"]
+                deliver(data.decode() if isinstance(data, bytes) else data)
+        finally:
+            await pubsub.unsubscribe(self._channel)
+
+    def publish(self, message: str) -> None:
+        task = asyncio.ensure_future(self._client.publish(self._channel, message))
+        self._sends.add(task)
+        task.add_done_callback(self._sent)
+
+    def _sent(self, task: "asyncio.Task[Any]") -> None:
+        self._sends.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error publishing todo event: {task.exception()}")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
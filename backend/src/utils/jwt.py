@@ -2,17 +2,25 @@ from datetime import datetime, timedelta
 from typing import Optional
 import os
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from .token_cache import TokenCache
+from .password_hasher import password_hasher
 
 
-# Initialize password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context, shared with the async hasher so both use the configured bcrypt cost
+pwd_context = password_hasher.context
 
 # JWT settings
 SECRET_KEY = os.getenv("BETTER_AUTH_SECRET", "your-super-secret-jwt-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Cache of already verified tokens, so repeated requests with the same bearer
+# token skip the decode and HMAC check until the token expires
+token_cache = TokenCache(
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("JWT_CACHE_TTL_SECONDS", "300")),
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -46,9 +54,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 def verify_token(token: str):
     """
     Verify a JWT token and return the payload if valid.
+    Verified tokens are served from `token_cache` until their `exp`.
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+    token_cache.set(token, payload)
+    return payload
\ No newline at end of file
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+
+
+# bcrypt cost factor for new hashes; hashes below it are upgraded on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads dedicated to bcrypt (the C extension releases the GIL while hashing)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hash/verify jobs allowed to be running or queued before new ones are shed
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full and the job was shed."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own bounded thread pool so bursts of logins and signups
+    cannot occupy the request threadpool or the event loop.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            # Hashes made at a lower cost are reported by needs_update/verify_and_update
+            bcrypt__min_rounds=rounds,
+        )
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy("Too many password operations in progress")
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost."""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against a stored hash."""
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, if the stored hash uses an outdated cost,
+        also return a replacement hash (otherwise None).
+        """
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+
+# Global instance shared by the auth endpoints
+password_hasher = PasswordHasher()
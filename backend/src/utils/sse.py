@@ -0,0 +1,8 @@
+import json
+from typing import Any, Dict, Optional
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT claims, keyed by a SHA-256 digest of the token.
+
+    An entry never outlives the token's own `exp` claim (nor `ttl` seconds), and
+    expiry is checked on every lookup, so an expired token is never served from
+    the cache even if it is still resident. Only successfully verified tokens are
+    stored; failures always go back through full verification.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return the cached claims for a token, or None on a miss or expiry."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, claims = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(claims)
+
+    def set(self, token: str, claims: dict) -> None:
+        """Cache the claims of a verified token until its expiry."""
+        exp = claims.get("exp")
+        if exp is None or self.maxsize <= 0:
+            # Without an exp claim we cannot bound the entry's lifetime safely
+            return
+
+        now = self._clock()
+        expires_at = min(float(exp), now + self.ttl)
+        if expires_at <= now:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,93 @@
+import os
+import tempfile
+
+# Point the app at a scratch SQLite file before anything imports src.database
+_db_dir = tempfile.mkdtemp(prefix="todo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("TODO_CACHE_BACKEND", "memory")
+os.environ.pop("GEMINI_API_KEY", None)
+
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+from sqlmodel import Session
+
+from src.api.chat import get_conversation_summarizer
+from src.api.chatbot import require_chatbot_service
+from src.database.session import async_engine, create_db_and_tables, engine
+from src.main import app
+from src.models import User
+from src.services.chatbot_service import ChatbotService
+from src.services.llm_client import LLMProvider
+from src.services.response_cache import response_cache
+from src.utils.jwt import create_access_token
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    create_db_and_tables()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+async def dispose_async_engine():
+    # Each test runs on its own event loop; pooled aiosqlite connections must not outlive it
+    yield
+    await async_engine.dispose()
+
+
+def _create_user() -> User:
+    with Session(engine) as session:
+        db_user = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="not-a-real-hash")
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
+        return db_user
+
+
+@pytest.fixture
+def user() -> User:
+    """A fresh user, so cached reads and ETags never leak between tests."""
+    return _create_user()
+
+
+@pytest.fixture
+def make_user():
+    """Factory for further users, e.g. to check that one user's work never affects another's."""
+    return _create_user
+
+
+@pytest.fixture
+def auth_headers(user: User) -> dict:
+    token = create_access_token({"sub": str(user.id), "email": user.email}, timedelta(minutes=30))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+
+class NoSummaries:
+    def schedule(self, conversation_id) -> None:
+        pass
+
+
+@pytest.fixture
+def use_provider():
+    """Serve chat endpoints from a ChatbotService on the given provider; returns the service."""
+    response_cache.clear()
+
+    def install(provider: LLMProvider, timeout: float = 5) -> ChatbotService:
+        service = ChatbotService(provider=provider)
+        service.llm.timeout = timeout
+        app.dependency_overrides[require_chatbot_service] = lambda: service
+        app.dependency_overrides[get_conversation_summarizer] = lambda: NoSummaries()
+        return service
+
+    yield install
+    app.dependency_overrides.clear()
@@ -0,0 +1,44 @@
+import fnmatch
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the part of the redis-py client RedisCacheBackend
+    uses: GET, SET with EX, DEL and SCAN. Values come back as bytes, like a
+    client created without decode_responses.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Union[str, bytes], ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode()
+        self._data[key] = (value, self._clock() + ex if ex else None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*") -> Iterator[str]:
+        return iter([key for key in list(self._data) if fnmatch.fnmatchcase(key, match)])
+
+    def ttl(self, key: str) -> int:
+        """Seconds until the key expires, -1 if it never does, -2 if it is missing."""
+        if self.get(key) is None:
+            return -2
+        expires_at = self._data[key][1]
+        return -1 if expires_at is None else int(expires_at - self._clock())
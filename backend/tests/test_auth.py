@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import uuid
+
+import pytest
+from passlib.context import CryptContext
+from sqlmodel import Session
+
+from src.api import auth as auth_api
+from src.database.session import engine
+from src.models import User
+from src.utils import password_hasher as hasher_module
+from src.utils.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def _use_hasher(monkeypatch, hasher: PasswordHasher) -> None:
+    # The endpoints and authenticate_user_async each look up the global instance
+    monkeypatch.setattr(hasher_module, "password_hasher", hasher)
+    monkeypatch.setattr(auth_api, "password_hasher", hasher)
+
+
+def _bcrypt(password: str, rounds: int) -> str:
+    return CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds).hash(password)
+
+
+def _user_with_hash(hashed_password: str) -> User:
+    with Session(engine) as session:
+        db_user = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password=hashed_password)
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
+        return db_user
+
+
+def _stored_hash(user_id) -> str:
+    with Session(engine) as session:
+        return session.get(User, user_id).hashed_password
+
+
+@pytest.fixture
+def hasher(monkeypatch) -> PasswordHasher:
+    # A low cost keeps the tests fast; rehashing is relative to whatever the configured cost is
+    hasher = PasswordHasher(rounds=5, workers=1)
+    _use_hasher(monkeypatch, hasher)
+    return hasher
+
+
+async def test_login_rehashes_an_outdated_hash(client, hasher):
+    old_hash = _bcrypt("secret", rounds=4)
+    user = _user_with_hash(old_hash)
+
+    response = await client.post("/api/auth/login", params={"email": user.email, "password": "secret"})
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    new_hash = _stored_hash(user.id)
+    assert new_hash != old_hash
+    assert new_hash.startswith("$2b$05$")
+    assert await hasher.verify("secret", new_hash)
+
+
+async def test_login_keeps_a_current_hash(client, hasher):
+    current_hash = await hasher.hash("secret")
+    user = _user_with_hash(current_hash)
+
+    response = await client.post("/api/auth/login", params={"email": user.email, "password": "secret"})
+
+    assert response.status_code == 200
+    assert _stored_hash(user.id) == current_hash
+
+
+async def test_wrong_password_does_not_rehash(client, hasher):
+    old_hash = _bcrypt("secret", rounds=4)
+    user = _user_with_hash(old_hash)
+
+    response = await client.post("/api/auth/login", params={"email": user.email, "password": "wrong"})
+
+    assert response.status_code == 401
+    assert _stored_hash(user.id) == old_hash
+
+
+async def test_full_hashing_queue_sheds_with_503(client, monkeypatch):
+    _use_hasher(monkeypatch, PasswordHasher(rounds=5, workers=1, max_pending=0))
+    user = _user_with_hash(_bcrypt("secret", rounds=5))
+
+    login = await client.post("/api/auth/login", params={"email": user.email, "password": "secret"})
+    signup = await client.post("/api/auth/signup", json={"email": f"{uuid.uuid4().hex}@example.com", "password": "secret"})
+
+    for response in (login, signup):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+
+async def test_hasher_sheds_only_while_full():
+    hasher = PasswordHasher(rounds=5, workers=1, max_pending=1)
+    hashed = await hasher.hash("secret")
+    gate = threading.Event()
+    in_flight = asyncio.create_task(hasher._run(gate.wait))
+    while hasher.pending == 0:
+        await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.verify("secret", hashed)
+    assert hasher.pending == 1
+
+    gate.set()
+    await in_flight
+    assert hasher.pending == 0
+    assert await hasher.verify("secret", hashed)
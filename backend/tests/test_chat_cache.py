@@ -0,0 +1,48 @@
+from typing import Any, Dict, List
+
+from sqlmodel import Session
+
+from src.database.session import engine
+from src.models import Todo
+from src.services.llm_client import LLMProvider
+
+
+class CountingProvider(LLMProvider):
+    """Fake model that numbers its replies, so a cached one is recognisable."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        self.calls += 1
+        return f"reply {self.calls}"
+
+
+async def ask(client, auth_headers, question: str) -> str:
+    response = await client.post("/api/chat", json={"messages": [{"role": "user", "content": question}]}, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()["response"]
+
+
+async def test_repeated_question_is_answered_from_cache(client, auth_headers, use_provider):
+    provider = CountingProvider()
+    use_provider(provider)
+
+    assert await ask(client, auth_headers, "What should I do today?") == "reply 1"
+    assert await ask(client, auth_headers, "what should I do today") == "reply 1"
+    assert provider.calls == 1
+
+
+async def test_write_from_another_process_invalidates_cached_replies(client, auth_headers, use_provider, user):
+    provider = CountingProvider()
+    use_provider(provider)
+    assert await ask(client, auth_headers, "What should I do today?") == "reply 1"
+
+    # Written straight to the database, as the MCP server or another worker would:
+    # this process's todo cache hears nothing about it
+    with Session(engine) as session:
+        session.add(Todo(title="Renew passport", user_id=user.id))
+        session.commit()
+
+    assert await ask(client, auth_headers, "What should I do today?") == "reply 2"
+    assert provider.calls == 2
@@ -0,0 +1,151 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.database.session import async_engine
+from src.main import app
+from src.models import Conversation
+from src.services.conversation_service_async import get_messages_after_async
+from src.services.llm_client import LLMOverloadedError, LLMProvider, LLMTurn, StubProvider, ToolCall
+
+
+class ScriptedProvider(LLMProvider):
+    """Fake model that plays back a list of turns; exceptions in the list are raised."""
+
+    def __init__(self, turns: List[Any]):
+        self.turns = list(turns)
+
+    async def _next(self) -> Any:
+        turn = self.turns.pop(0)
+        if isinstance(turn, Exception):
+            raise turn
+        return turn
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        return (await self._next()).text
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> LLMTurn:
+        return await self._next()
+
+
+async def test_timeout_is_a_504_without_internal_details(client, auth_headers, use_provider):
+    use_provider(StubProvider(delay=1), timeout=0.05)
+
+    response = await client.post("/api/chat", json={"messages": [{"role": "user", "content": "hi"}]}, headers=auth_headers)
+    assert response.status_code == 504
+    assert response.json()["detail"] == "The assistant took too long to answer, please retry"
+
+
+async def test_unexpected_error_is_a_generic_500(client, auth_headers, use_provider):
+    use_provider(ScriptedProvider([RuntimeError("password=hunter2 at db-internal:5432")]))
+
+    response = await client.post("/api/chat", json={"messages": [{"role": "user", "content": "hi"}]}, headers=auth_headers)
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Error processing chat request"
+
+
+async def test_failed_turn_is_not_stored_in_the_conversation(client, auth_headers, use_provider, user):
+    use_provider(ScriptedProvider([LLMTurn(text="Hello!")]))
+    first = await client.post(f"/api/users/{user.id}/chat", json={"message": "hi"}, headers=auth_headers)
+    assert first.status_code == 200
+    conversation_id = first.json()["conversation_id"]
+
+    use_provider(ScriptedProvider([LLMOverloadedError("upstream 429 from internal-proxy")]))
+    failed = await client.post(
+        f"/api/users/{user.id}/chat",
+        json={"conversation_id": conversation_id, "message": "and again"},
+        headers=auth_headers,
+    )
+    assert failed.status_code == 503
+    assert failed.headers["Retry-After"] == "5"
+    assert "internal-proxy" not in failed.text
+
+    messages = await client.get(f"/api/users/{user.id}/conversations/{conversation_id}/messages", headers=auth_headers)
+    assert [(m["role"], m["content"]) for m in messages.json()["items"]] == [("user", "hi"), ("assistant", "Hello!")]
+
+
+async def test_tools_that_already_ran_are_reported_on_failure(client, auth_headers, use_provider, user):
+    use_provider(ScriptedProvider([
+        LLMTurn(tool_calls=[ToolCall(name="add_task", arguments={"title": "Water the plants"})]),
+        LLMOverloadedError("quota exceeded"),
+    ]))
+
+    response = await client.post(f"/api/users/{user.id}/chat", json={"message": "remind me"}, headers=auth_headers)
+    assert response.status_code == 503
+    detail = response.json()["detail"]
+    assert detail["message"] == "The assistant is busy, please retry shortly"
+    assert [call["name"] for call in detail["tool_calls"]] == ["add_task"]
+
+    todos = await client.get("/api/todos", headers=auth_headers)
+    assert [todo["title"] for todo in todos.json()] == ["Water the plants"]
+
+
+async def test_stream_error_event_hides_internal_details(client, auth_headers, use_provider):
+    use_provider(StubProvider(delay=1), timeout=0.05)
+
+    response = await client.post("/api/chat/stream", json={"messages": [{"role": "user", "content": "hi"}]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert "event: error" in response.text
+    assert '"status": 504' in response.text or '"status":504' in response.text
+
+
+class HangingProvider(LLMProvider):
+    """Fake model that never answers, recording whether its call was cancelled."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        raise NotImplementedError
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> LLMTurn:
+        self.started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+async def test_client_disconnect_cancels_the_tool_chat(auth_headers, use_provider, user):
+    provider = HangingProvider()
+    use_provider(provider)
+    body = json.dumps({"message": "hi"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "server": ("test", 80), "client": ("test", 1234), "root_path": "",
+        "path": f"/api/users/{user.id}/chat", "raw_path": f"/api/users/{user.id}/chat".encode(),
+        "query_string": b"",
+        "headers": [
+            (b"host", b"test"), (b"content-type", b"application/json"),
+            (b"authorization", auth_headers["Authorization"].encode()),
+        ],
+    }
+    received = []
+
+    async def receive():
+        # The body, then, once the model call is under way, a disconnect
+        if not received:
+            received.append(True)
+            return {"type": "http.request", "body": body, "more_body": False}
+        if provider.started.is_set():
+            return {"type": "http.disconnect"}
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    assert provider.cancelled
+    assert sent[0]["status"] == 499
+    async with AsyncSession(async_engine) as session:
+        conversations = (await session.exec(select(Conversation).where(Conversation.user_id == user.id))).all()
+        assert len(conversations) == 1
+        assert await get_messages_after_async(session, conversations[0].id, None) == []
@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.chat import CHAT_HISTORY_MAX_MESSAGES
+from src.database.session import async_engine
+from src.services.conversation_service_async import add_message_async, create_conversation_async, save_summary_async
+from src.services.conversation_summarizer import CHAT_SUMMARY_TRIGGER_MESSAGES
+from src.services.llm_client import LLMProvider, LLMTurn
+
+
+class RecordingProvider(LLMProvider):
+    """Fake model that answers "ok" and keeps every exchange it was sent."""
+
+    def __init__(self):
+        self.contents: List[List[Dict[str, Any]]] = []
+
+    async def complete(self, contents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> LLMTurn:
+        self.contents.append(contents)
+        return LLMTurn(text="ok")
+
+
+async def test_every_message_after_the_summary_reaches_the_model(client, auth_headers, use_provider, user):
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        conversation = await create_conversation_async(session, user.id)
+        await add_message_async(session, conversation.id, "user", "summarized message")
+        await save_summary_async(session, conversation.id, "The user said hello.", datetime.utcnow())
+        # Just below the point where the summarizer would start compacting
+        for i in range(CHAT_SUMMARY_TRIGGER_MESSAGES - 1):
+            await add_message_async(session, conversation.id, "user" if i % 2 == 0 else "assistant", f"message {i}")
+
+    provider = RecordingProvider()
+    use_provider(provider)
+    response = await client.post(
+        f"/api/users/{user.id}/chat",
+        json={"conversation_id": str(conversation.id), "message": "what did I say first?"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    sent = [part for turn in provider.contents[0] for part in turn["parts"] if isinstance(part, str)]
+    for i in range(CHAT_SUMMARY_TRIGGER_MESSAGES - 1):
+        assert f"message {i}" in sent
+    assert "summarized message" not in sent
+    assert sent[-1] == "what did I say first?"
+    assert any("The user said hello." in part for part in sent)
+
+
+async def test_message_page_limit_is_bounded(client, auth_headers, user):
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        conversation = await create_conversation_async(session, user.id)
+        await add_message_async(session, conversation.id, "user", "hello")
+
+    path = f"/api/users/{user.id}/conversations/{conversation.id}/messages"
+    for limit in (0, -1, 1000):
+        response = await client.get(path, params={"limit": limit}, headers=auth_headers)
+        assert response.status_code == 422, limit
+
+    response = await client.get(path, params={"limit": 1}, headers=auth_headers)
+    assert [m["content"] for m in response.json()["items"]] == ["hello"]
+
+
+async def test_history_load_is_capped_when_summarizing_falls_behind(client, auth_headers, use_provider, user):
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        conversation = await create_conversation_async(session, user.id)
+        for i in range(CHAT_HISTORY_MAX_MESSAGES + 5):
+            await add_message_async(session, conversation.id, "user" if i % 2 == 0 else "assistant", f"message {i}")
+
+    provider = RecordingProvider()
+    use_provider(provider)
+    response = await client.post(
+        f"/api/users/{user.id}/chat",
+        json={"conversation_id": str(conversation.id), "message": "still there?"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    sent = [part for turn in provider.contents[0] for part in turn["parts"] if isinstance(part, str)]
+    # The oldest five are not even loaded
+    assert not any(f"message {i}" in sent for i in range(5))
+    assert "message 6" in sent
+    assert f"message {CHAT_HISTORY_MAX_MESSAGES + 4}" in sent
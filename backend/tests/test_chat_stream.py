@@ -0,0 +1,39 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.llm_client import StubProvider
+
+
+def parse_sse(body: str) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+    """(event name, JSON payload) for each event in a text/event-stream body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = None, None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                name = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((name, data))
+    return events
+
+
+async def test_stream_sends_deltas_then_done(client, auth_headers, use_provider):
+    use_provider(StubProvider())
+
+    response = await client.post(
+        "/api/chat/stream",
+        json={"messages": [{"role": "user", "content": "water the plants"}]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+
+    events = parse_sse(response.text)
+    *deltas, (last_event, last_data) = events
+    assert all(name is None for name, _ in deltas)
+    assert [data["delta"] for _, data in deltas] == ["You ", "said: ", "water ", "the ", "plants "]
+    assert last_event == "done"
+    assert isinstance(last_data["suggestions"], list) and last_data["suggestions"]
@@ -0,0 +1,149 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from src.services.llm_client import (
+    ClientDisconnected,
+    LLMClient,
+    LLMProvider,
+    LLMTimeoutError,
+    StubProvider,
+    run_until_disconnected,
+)
+
+
+class GatedProvider(LLMProvider):
+    """Local fake model whose calls block until released, recording how many run at once."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.running: List[str] = []
+        self.peak = 0
+        self.peak_per_message: Dict[str, int] = {}
+        self.cancelled = 0
+
+    async def generate(self, history: List[Dict[str, Any]], message: str) -> str:
+        self.running.append(message)
+        self.peak = max(self.peak, len(self.running))
+        self.peak_per_message[message] = max(self.peak_per_message.get(message, 0), self.running.count(message))
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running.remove(message)
+        return f"reply to {message}"
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_global_limit_caps_calls_in_flight():
+    provider = GatedProvider()
+    client = LLMClient(provider, max_concurrency=2, per_user_concurrency=5, timeout=5)
+
+    calls = [asyncio.ensure_future(client.generate([], f"user {i}", user_id=i)) for i in range(5)]
+    await _settle()
+    assert len(provider.running) == 2
+
+    provider.release.set()
+    assert await asyncio.gather(*calls) == [f"reply to user {i}" for i in range(5)]
+    assert provider.peak == 2
+    assert client._per_user == {}
+
+
+async def test_per_user_limit_does_not_hold_up_other_users():
+    provider = GatedProvider()
+    client = LLMClient(provider, max_concurrency=10, per_user_concurrency=1, timeout=5)
+
+    # The message doubles as the user here, so the provider can count per user
+    calls = [asyncio.ensure_future(client.generate([], "alice", user_id="alice")) for _ in range(3)]
+    calls.append(asyncio.ensure_future(client.generate([], "bob", user_id="bob")))
+    await _settle()
+    assert sorted(provider.running) == ["alice", "bob"]
+
+    provider.release.set()
+    await asyncio.gather(*calls)
+    assert provider.peak_per_message == {"alice": 1, "bob": 1}
+    assert client._per_user == {}
+
+
+async def test_slow_call_raises_llm_timeout_error():
+    client = LLMClient(StubProvider(delay=1), timeout=0.05)
+
+    with pytest.raises(LLMTimeoutError):
+        await client.generate([], "hello", user_id="alice")
+    assert client._per_user == {}
+
+
+async def test_deadline_includes_waiting_for_a_slot():
+    provider = GatedProvider()
+    client = LLMClient(provider, max_concurrency=1, timeout=0.05)
+    holder = asyncio.ensure_future(client.generate([], "first"))
+    await _settle()
+
+    with pytest.raises(LLMTimeoutError):
+        await client.generate([], "second")
+    assert provider.running == []  # "first" was cut off by its own deadline too
+
+    with pytest.raises(LLMTimeoutError):
+        await holder
+    # Both slots were released, so a fast call still gets through
+    client.provider = StubProvider()
+    assert await client.generate([], "third") == "You said: third"
+
+
+async def test_stream_deadline_covers_the_whole_stream():
+    client = LLMClient(StubProvider(delay=1), timeout=0.05)
+
+    with pytest.raises(LLMTimeoutError):
+        async for _ in client.stream([], "a long reply", user_id="alice"):
+            pass
+    assert client._per_user == {}
+
+
+async def test_stub_provider_streams_and_completes():
+    client = LLMClient(StubProvider())
+
+    chunks = [chunk async for chunk in client.stream([], "hi there")]
+    assert "".join(chunks).strip() == "You said: hi there"
+    turn = await client.complete([{"role": "user", "parts": ["ping"]}], tools=[])
+    assert turn.text == "You said: ping"
+    assert turn.tool_calls == []
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+async def test_disconnect_cancels_the_model_call_and_frees_its_slot():
+    provider = GatedProvider()
+    client = LLMClient(provider, max_concurrency=1, per_user_concurrency=1, timeout=5)
+    request = FakeRequest(disconnect_after=2)
+
+    with pytest.raises(ClientDisconnected):
+        await run_until_disconnected(request, client.generate([], "hello", user_id="alice"), poll_interval=0.01)
+    await _settle()
+
+    assert provider.cancelled == 1
+    assert client._per_user == {}
+    # The only global slot is free again
+    provider.release.set()
+    assert await client.generate([], "again", user_id="alice") == "reply to again"
+
+
+async def test_connected_client_gets_the_result():
+    client = LLMClient(StubProvider(delay=0.02))
+    request = FakeRequest(disconnect_after=1000)
+
+    assert await run_until_disconnected(request, client.generate([], "hello"), poll_interval=0.005) == "You said: hello"
@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlmodel import Session
+
+from src.database.session import engine
+from src.models import Todo
+from src.services.pagination import decode_cursor, split_page
+
+
+def _rows(count: int):
+    start = datetime(2026, 1, 1)
+    return [SimpleNamespace(created_at=start + timedelta(seconds=i), id=uuid.uuid4()) for i in range(count)]
+
+
+def test_split_page_without_look_ahead_row_has_no_cursor():
+    rows = _rows(3)
+    page, next_cursor = split_page(rows, 3)
+    assert page == rows
+    assert next_cursor is None
+
+
+def test_split_page_trims_look_ahead_row_and_points_at_last_item():
+    rows = _rows(4)
+    page, next_cursor = split_page(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(next_cursor) == (rows[2].created_at, rows[2].id)
+
+
+def test_split_page_with_non_positive_limit_is_empty():
+    assert split_page(_rows(2), 0) == ([], None)
+    assert split_page(_rows(2), -1) == ([], None)
+
+
+async def test_cursor_pages_cover_every_todo_once(client, auth_headers, user):
+    start = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        todos = [Todo(title=f"Todo {i}", user_id=user.id, created_at=start + timedelta(seconds=i)) for i in range(5)]
+        session.add_all(todos)
+        session.commit()
+        created = [str(todo.id) for todo in todos]
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        response = await client.get("/api/todos", params={"cursor": cursor, "limit": 2}, headers=auth_headers)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+
+    assert seen == created
+
+
+async def test_out_of_range_limits_are_rejected(client, auth_headers):
+    for params in ({"cursor": "", "limit": 0}, {"cursor": "", "limit": -1}, {"limit": 100000}, {"skip": -1}):
+        response = await client.get("/api/todos", params=params, headers=auth_headers)
+        assert response.status_code == 422, params
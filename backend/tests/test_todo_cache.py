@@ -0,0 +1,120 @@
+import uuid
+
+import pytest
+
+from src.services import todo_cache as todo_cache_module
+from src.services.todo_cache import GENERATION_TTL_SECONDS, TodoCache
+from src.utils.cache_backends import RedisCacheBackend
+from tests.fake_redis import FakeRedis
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def redis_client(clock) -> FakeRedis:
+    return FakeRedis(clock=clock)
+
+
+def test_redis_backend_prefixes_keys_and_decodes_values(redis_client):
+    backend = RedisCacheBackend(redis_client, prefix="app:")
+    backend.set("key", "value", ttl=30)
+
+    assert redis_client.get("app:key") == b"value"
+    assert redis_client.ttl("app:key") == 30
+    assert backend.get("key") == "value"
+
+    backend.delete("key")
+    assert backend.get("key") is None
+
+
+def test_redis_backend_entries_expire(redis_client, clock):
+    backend = RedisCacheBackend(redis_client)
+    backend.set("key", "value", ttl=30)
+
+    clock.now += 30
+    assert backend.get("key") is None
+
+
+def test_redis_backend_clear_only_touches_its_prefix(redis_client):
+    redis_client.set("other:key", "keep")
+    backend = RedisCacheBackend(redis_client, prefix="app:")
+    backend.set("a", "1")
+    backend.set("b", "2")
+
+    backend.clear()
+    assert list(redis_client.scan_iter()) == ["other:key"]
+
+
+def test_todo_cache_round_trip_and_invalidation(redis_client):
+    cache = TodoCache(RedisCacheBackend(redis_client), ttl=30)
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+
+    generation, value = cache.get(user_id, "list")
+    assert value is None
+    cache.set(user_id, generation, "list", [{"title": "a"}])
+    cache.set(other_id, cache.generation(other_id), "list", [{"title": "b"}])
+    assert cache.get(user_id, "list") == (generation, [{"title": "a"}])
+    assert redis_client.ttl(f"todo-app:todos:{user_id}:gen") == GENERATION_TTL_SECONDS
+
+    cache.invalidate(user_id)
+    new_generation, value = cache.get(user_id, "list")
+    assert new_generation != generation
+    assert value is None
+    # Other users' entries are untouched
+    assert cache.get(other_id, "list")[1] == [{"title": "b"}]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (2, 2, 1)
+
+
+def test_value_read_before_a_write_is_stored_under_the_old_generation(redis_client):
+    cache = TodoCache(RedisCacheBackend(redis_client))
+    user_id = uuid.uuid4()
+
+    generation, _ = cache.get(user_id, "list")
+    # A write lands between the read's lookup and its store
+    cache.invalidate(user_id)
+    cache.set(user_id, generation, "list", ["stale"])
+
+    assert cache.get(user_id, "list")[1] is None
+
+
+async def test_async_methods_run_blocking_backends_off_the_loop(redis_client):
+    cache = TodoCache(RedisCacheBackend(redis_client))
+    user_id = uuid.uuid4()
+
+    generation, value = await cache.aget(user_id, "list")
+    assert value is None
+    await cache.aset(user_id, generation, "list", [1, 2])
+    assert (await cache.aget(user_id, "list"))[1] == [1, 2]
+
+    await cache.ainvalidate(user_id)
+    assert (await cache.aget(user_id, "list"))[1] is None
+
+
+async def test_writes_through_the_api_invalidate_cached_lists(client, auth_headers, redis_client, monkeypatch):
+    monkeypatch.setattr(todo_cache_module.todo_cache, "backend", RedisCacheBackend(redis_client))
+
+    first = await client.post("/api/todos", json={"title": "First"}, headers=auth_headers)
+    assert [todo["title"] for todo in (await client.get("/api/todos", headers=auth_headers)).json()] == ["First"]
+    hits = todo_cache_module.todo_cache.hits
+    await client.get("/api/todos", headers=auth_headers)
+    assert todo_cache_module.todo_cache.hits == hits + 1
+
+    await client.post("/api/todos", json={"title": "Second"}, headers=auth_headers)
+    assert len((await client.get("/api/todos", headers=auth_headers)).json()) == 2
+
+    await client.patch(f"/api/todos/{first.json()['id']}/complete", headers=auth_headers)
+    listed = (await client.get("/api/todos", headers=auth_headers)).json()
+    assert [todo["is_completed"] for todo in listed if todo["title"] == "First"] == [True]
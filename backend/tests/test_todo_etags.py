@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from sqlmodel import Session
+
+from src.database.session import engine
+from src.models import Todo
+
+
+def _write_elsewhere(user_id, title: str) -> None:
+    """A write made by another worker or process: nothing here sees an invalidation."""
+    with Session(engine) as session:
+        session.add(Todo(title=title, user_id=user_id, created_at=datetime.utcnow(), updated_at=datetime.utcnow()))
+        session.commit()
+
+
+async def test_unchanged_list_answers_304(client, auth_headers):
+    await client.post("/api/todos", json={"title": "First"}, headers=auth_headers)
+    first = await client.get("/api/todos", headers=auth_headers)
+    etag = first.headers["ETag"]
+
+    again = await client.get("/api/todos", headers={**auth_headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+
+async def test_write_from_another_process_changes_the_etag_and_the_rows(client, auth_headers, user):
+    await client.post("/api/todos", json={"title": "First"}, headers=auth_headers)
+    first = await client.get("/api/todos", headers=auth_headers)
+
+    _write_elsewhere(user.id, "Written elsewhere")
+
+    response = await client.get("/api/todos", headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert sorted(todo["title"] for todo in response.json()) == ["First", "Written elsewhere"]
+
+
+async def test_updates_and_deletes_change_the_etag(client, auth_headers):
+    created = (await client.post("/api/todos", json={"title": "First"}, headers=auth_headers)).json()
+    etags = [(await client.get("/api/todos", headers=auth_headers)).headers["ETag"]]
+
+    await client.put(f"/api/todos/{created['id']}", json={"title": "Renamed"}, headers=auth_headers)
+    etags.append((await client.get("/api/todos", headers=auth_headers)).headers["ETag"])
+
+    await client.delete(f"/api/todos/{created['id']}", headers=auth_headers)
+    etags.append((await client.get("/api/todos", headers=auth_headers)).headers["ETag"])
+
+    assert len(set(etags)) == 3
+
+
+async def test_single_todo_and_stats_follow_the_same_version(client, auth_headers, user):
+    created = (await client.post("/api/todos", json={"title": "First"}, headers=auth_headers)).json()
+    single = await client.get(f"/api/todos/{created['id']}", headers=auth_headers)
+    stats = await client.get("/api/todos/stats", headers=auth_headers)
+    assert stats.json()["total"] == 1
+
+    for path, response in ((f"/api/todos/{created['id']}", single), ("/api/todos/stats", stats)):
+        unchanged = await client.get(path, headers={**auth_headers, "If-None-Match": response.headers["ETag"]})
+        assert unchanged.status_code == 304
+
+    _write_elsewhere(user.id, "Written elsewhere")
+
+    stats_after = await client.get("/api/todos/stats", headers={**auth_headers, "If-None-Match": stats.headers["ETag"]})
+    assert stats_after.status_code == 200
+    assert stats_after.json()["total"] == 2
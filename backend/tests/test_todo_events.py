@@ -0,0 +1,99 @@
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.database.session import get_unit_of_work
+from src.services.todo_events import TodoChangeFeed, todo_feed
+from src.services.todo_tools import ToolBatcher
+from src.utils.event_brokers import MemoryEventBroker
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+
+
+@pytest.fixture
+async def feed():
+    """The global feed, unbound again afterwards since each test runs on its own event loop."""
+    yield todo_feed
+    await todo_feed.stop()
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+async def test_committed_writes_reach_the_owners_subscribers(client, auth_headers, user, make_user, feed):
+    other = make_user()
+    async with feed.subscribe(user.id) as mine, feed.subscribe(other.id) as theirs:
+        created = await client.post("/api/todos", json={"title": "Buy milk"}, headers=auth_headers)
+        todo_id = created.json()["id"]
+        await client.patch(f"/api/todos/{todo_id}/complete", headers=auth_headers)
+        await client.delete(f"/api/todos/{todo_id}", headers=auth_headers)
+
+        events = drain(mine)
+        assert [event["type"] for event in events] == ["created", "toggled", "deleted"]
+        assert events[0]["todo"]["title"] == "Buy milk"
+        assert events[1]["todo"]["is_completed"] is True
+        assert events[2]["id"] == todo_id
+        assert all("at" in event for event in events)
+        assert theirs.empty()
+
+    assert feed.stats()["subscribers"] == 0
+
+
+async def test_a_subscriber_that_falls_behind_gets_one_resync():
+    feed = TodoChangeFeed(MemoryEventBroker(), queue_size=2)
+    user_id = uuid.uuid4()
+
+    async with feed.subscribe(user_id) as slow, feed.subscribe(user_id) as fast:
+        for _ in range(3):
+            feed.publish(FakeSession(), user_id, "deleted", ids=[uuid.uuid4()])
+            drain(fast)
+
+        assert [event["type"] for event in drain(slow)] == ["resync"]
+        # Events after the resync are delivered as usual
+        feed.publish(FakeSession(), user_id, "deleted", ids=[uuid.uuid4()])
+        assert [event["type"] for event in drain(slow)] == ["deleted"]
+
+    assert feed.stats()["resyncs"] == 1
+    await feed.stop()
+
+
+async def test_unit_of_work_events_wait_for_the_commit(user, feed):
+    async with feed.subscribe(user.id) as queue:
+        seen_before_commit = []
+
+        @asynccontextmanager
+        async def observed_unit():
+            async with get_unit_of_work() as session:
+                yield session
+                seen_before_commit.append(queue.qsize())
+
+        batcher = ToolBatcher(session_factory=observed_unit)
+        result = await batcher.submit("add_task", user.id, {"title": "Water the plants"})
+
+        assert not result.is_error
+        assert seen_before_commit == [0]
+        assert [event["type"] for event in drain(queue)] == ["created"]
+
+
+async def test_events_of_a_unit_that_fails_to_commit_are_dropped(user, feed):
+    async with feed.subscribe(user.id) as queue:
+
+        @asynccontextmanager
+        async def failing_unit():
+            async with get_unit_of_work() as session:
+                yield session
+                raise RuntimeError("commit failed")
+
+        batcher = ToolBatcher(session_factory=failing_unit)
+        result = await batcher.submit("add_task", user.id, {"title": "Never written"})
+
+        assert result.is_error
+        assert queue.empty()
@@ -0,0 +1,69 @@
+from sqlmodel import Session
+
+from src.database.search import FTS_KEY_TABLE, FTS_TABLE
+from src.database.session import engine
+from src.models import Todo
+
+
+async def _search(client, headers, q):
+    response = await client.get("/api/todos/search", params={"q": q}, headers=headers)
+    assert response.status_code == 200
+    return [todo["title"] for todo in response.json()["items"]]
+
+
+async def test_search_follows_creates_updates_and_deletes(client, auth_headers):
+    created = (await client.post("/api/todos", json={"title": "Buy groceries", "description": "milk and eggs"}, headers=auth_headers)).json()
+    await client.post("/api/todos", json={"title": "Call the bank"}, headers=auth_headers)
+
+    assert await _search(client, auth_headers, "groc") == ["Buy groceries"]
+    assert await _search(client, auth_headers, "eggs") == ["Buy groceries"]
+
+    await client.put(f"/api/todos/{created['id']}", json={"title": "Buy flowers", "description": None}, headers=auth_headers)
+    assert await _search(client, auth_headers, "groceries") == []
+    assert await _search(client, auth_headers, "flowers") == ["Buy flowers"]
+
+    await client.delete(f"/api/todos/{created['id']}", headers=auth_headers)
+    assert await _search(client, auth_headers, "flowers") == []
+    assert await _search(client, auth_headers, "bank") == ["Call the bank"]
+
+
+async def test_search_survives_renumbered_rowids(client, auth_headers, user):
+    with Session(engine) as session:
+        todos = [Todo(title=f"Errand {word}", user_id=user.id) for word in ("alpha", "bravo", "charlie")]
+        session.add_all(todos)
+        session.commit()
+        session.delete(todos[0])
+        session.commit()
+
+    # todo has a UUID primary key, so VACUUM (or a dump and restore) is free to renumber
+    # its rowids; do it explicitly, since whether VACUUM does depends on the SQLite version
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("UPDATE todo SET rowid = rowid + 1000000")
+        connection.exec_driver_sql("VACUUM")
+
+    assert await _search(client, auth_headers, "charlie") == ["Errand charlie"]
+    assert await _search(client, auth_headers, "bravo") == ["Errand bravo"]
+    assert await _search(client, auth_headers, "alpha") == []
+
+
+def _index_rows(todo_id):
+    with engine.connect() as connection:
+        keys = connection.exec_driver_sql(f"SELECT id FROM {FTS_KEY_TABLE} WHERE todo_id = ?", (todo_id.hex,)).all()
+        matches = connection.exec_driver_sql(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH 'library'").all()
+    return keys, matches
+
+
+def test_deleted_todos_leave_no_index_rows(user):
+    with Session(engine) as session:
+        todo = Todo(title="Return library books", user_id=user.id)
+        session.add(todo)
+        session.commit()
+        todo_id = todo.id
+
+        keys, matches = _index_rows(todo_id)
+        assert len(keys) == 1 and matches == keys
+
+        session.delete(todo)
+        session.commit()
+
+    assert _index_rows(todo_id) == ([], [])
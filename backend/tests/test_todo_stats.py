@@ -0,0 +1,61 @@
+from datetime import datetime, time, timedelta
+
+from sqlmodel import Session
+
+from src.database.session import engine
+from src.models import Todo
+
+
+def _day(days_ago: int) -> datetime:
+    return datetime.combine(datetime.utcnow().date() - timedelta(days=days_ago), time(12))
+
+
+def _add(user_id, created_days_ago: int, completed_days_ago=None) -> None:
+    completed = completed_days_ago is not None
+    updated_days_ago = completed_days_ago if completed else created_days_ago
+    with Session(engine) as session:
+        session.add(Todo(
+            title="todo",
+            user_id=user_id,
+            is_completed=completed,
+            created_at=_day(created_days_ago),
+            updated_at=_day(updated_days_ago),
+        ))
+        session.commit()
+
+
+async def test_stats_count_totals_and_each_day_of_the_window(client, auth_headers, user, make_user):
+    _add(user.id, 0)
+    _add(user.id, 0)
+    _add(user.id, 0, completed_days_ago=0)
+    _add(user.id, 2, completed_days_ago=1)
+    _add(user.id, 10)  # created before a 7-day window
+    _add(user.id, 40, completed_days_ago=3)  # created long ago, completed inside the window
+    _add(make_user().id, 0, completed_days_ago=0)  # someone else's
+
+    response = await client.get("/api/todos/stats", params={"days": 7}, headers=auth_headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert (stats["total"], stats["pending"], stats["completed"]) == (6, 3, 3)
+    assert [day["day"] for day in stats["days"]] == [_day(ago).date().isoformat() for ago in range(6, -1, -1)]
+    by_age = {6 - index: (day["created"], day["completed"]) for index, day in enumerate(stats["days"])}
+    assert by_age == {6: (0, 0), 5: (0, 0), 4: (0, 0), 3: (0, 1), 2: (1, 0), 1: (0, 1), 0: (3, 1)}
+
+
+async def test_wider_window_takes_in_older_days(client, auth_headers, user):
+    _add(user.id, 10)
+    _add(user.id, 40, completed_days_ago=3)
+
+    stats = (await client.get("/api/todos/stats", headers=auth_headers)).json()
+
+    assert len(stats["days"]) == 30
+    assert sum(day["created"] for day in stats["days"]) == 1
+    assert sum(day["completed"] for day in stats["days"]) == 1
+    assert stats["days"][-1 - 10]["created"] == 1
+
+
+async def test_stats_window_is_bounded(client, auth_headers):
+    for days in (0, 366):
+        response = await client.get("/api/todos/stats", params={"days": days}, headers=auth_headers)
+        assert response.status_code == 422
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlmodel import Session
+
+from src.database.session import engine
+from src.models import Todo
+from src.services.todo_sync import TODO_TOMBSTONE_RETENTION_DAYS, encode_watermark
+
+
+def _insert_todos(user_id, count: int, age: timedelta = timedelta(0)) -> List[str]:
+    at = datetime.utcnow() - age
+    with Session(engine) as session:
+        todos = [
+            Todo(title=f"todo {i}", user_id=user_id, created_at=at, updated_at=at + timedelta(seconds=i))
+            for i in range(count)
+        ]
+        session.add_all(todos)
+        session.commit()
+        return [str(todo.id) for todo in todos]
+
+
+async def _sync_all(client, auth_headers, since=None, limit=2, max_pages=20):
+    """Follow has_more to the end; returns every page."""
+    pages = []
+    for _ in range(max_pages):
+        params = {"limit": limit, **({"since": since} if since else {})}
+        response = await client.get("/api/todos/changes", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page)
+        since = page["watermark"]
+        if not page["has_more"]:
+            return pages
+    raise AssertionError("sync never reached the end")
+
+
+async def test_full_sync_pages_through_every_todo_once(client, auth_headers, user):
+    ids = _insert_todos(user.id, 5)
+
+    pages = await _sync_all(client, auth_headers)
+
+    assert [len(page["todos"]) for page in pages] == [2, 2, 1]
+    assert [page["has_more"] for page in pages] == [True, True, False]
+    assert [page["reset"] for page in pages] == [True, False, False]
+    assert [todo["id"] for page in pages for todo in page["todos"]] == ids
+
+
+async def test_full_sync_of_todos_older_than_the_retention_period_ends(client, auth_headers, user):
+    ids = _insert_todos(user.id, 5, age=timedelta(days=2 * TODO_TOMBSTONE_RETENTION_DAYS))
+
+    pages = await _sync_all(client, auth_headers)
+
+    assert [todo["id"] for page in pages for todo in page["todos"]] == ids
+    assert [page["reset"] for page in pages] == [True, False, False]
+
+
+async def test_delta_sync_sends_changes_and_tombstones(client, auth_headers, user):
+    kept, changed, deleted = _insert_todos(user.id, 3, age=timedelta(minutes=1))
+    watermark = (await _sync_all(client, auth_headers, limit=10))[-1]["watermark"]
+
+    await client.patch(f"/api/todos/{changed}/complete", headers=auth_headers)
+    await client.delete(f"/api/todos/{deleted}", headers=auth_headers)
+    pages = await _sync_all(client, auth_headers, since=watermark, limit=10)
+
+    assert len(pages) == 1
+    page = pages[0]
+    assert page["reset"] is False
+    assert [todo["id"] for todo in page["todos"]] == [changed]
+    assert page["todos"][0]["is_completed"] is True
+    assert [tombstone["id"] for tombstone in page["deleted"]] == [deleted]
+
+    # Nothing new since: changes inside the skew window may come again, but nothing else does
+    again = (await _sync_all(client, auth_headers, since=page["watermark"], limit=10))[0]
+    assert again["reset"] is False
+    assert {todo["id"] for todo in again["todos"]} <= {changed}
+    assert {tombstone["id"] for tombstone in again["deleted"]} <= {deleted}
+
+
+async def test_watermark_older_than_the_deletion_log_resets(client, auth_headers, user):
+    ids = _insert_todos(user.id, 3)
+    stale_at = datetime.utcnow() - timedelta(days=TODO_TOMBSTONE_RETENTION_DAYS + 1)
+    stale = encode_watermark((stale_at, uuid.UUID(int=0), stale_at))
+
+    pages = await _sync_all(client, auth_headers, since=stale, limit=10)
+
+    assert pages[0]["reset"] is True
+    assert [todo["id"] for todo in pages[0]["todos"]] == ids
+
+
+async def test_malformed_watermark_is_rejected(client, auth_headers):
+    response = await client.get("/api/todos/changes", params={"since": "not-a-watermark"}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,121 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.database.session import async_engine, get_session_context, get_unit_of_work
+from src.models import Todo
+from src.services.llm_client import ToolCall
+from src.services.todo_tools import ToolBatcher, run_tools
+
+
+async def _titles(user_id):
+    async with AsyncSession(async_engine) as session:
+        result = await session.exec(select(Todo.title).where(Todo.user_id == user_id).order_by(Todo.title))
+        return list(result.all())
+
+
+async def test_one_users_calls_in_a_tick_share_one_unit(user):
+    batcher = ToolBatcher()
+    results = await asyncio.gather(
+        batcher.submit("add_task", user.id, {"title": "a"}),
+        batcher.submit("add_task", user.id, {"title": "b"}),
+        batcher.submit("delete_task", user.id, {"task_id": "00000000-0000-0000-0000-000000000000"}),
+    )
+
+    assert [result.is_error for result in results] == [False, False, True]
+    assert await _titles(user.id) == ["a", "b"]
+    stats = batcher.stats.snapshot()
+    assert (stats["units"], stats["calls_per_unit_avg"]) == (1, 3.0)
+
+
+async def test_each_user_gets_a_unit_that_runs_concurrently(user, make_user):
+    other = make_user()
+    running, peak = 0, 0
+
+    @asynccontextmanager
+    async def tracked_unit():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            async with get_unit_of_work() as session:
+                # Give the other unit the chance to start while this one is open
+                await asyncio.sleep(0.01)
+                yield session
+        finally:
+            running -= 1
+
+    # Reads only: SQLite, unlike PostgreSQL, would make two open write transactions wait on each other
+    batcher = ToolBatcher(session_factory=tracked_unit)
+    mine, theirs = await asyncio.gather(
+        batcher.submit("list_tasks", user.id, {}),
+        batcher.submit("list_tasks", other.id, {}),
+    )
+
+    assert not mine.is_error and not theirs.is_error
+    assert batcher.stats.snapshot()["units"] == 2
+    assert peak == 2
+
+
+async def test_a_failed_commit_only_fails_that_users_calls(user, make_user):
+    other = make_user()
+    units = []
+
+    @asynccontextmanager
+    async def first_unit_fails():
+        units.append(None)
+        if len(units) == 1:
+            raise RuntimeError("database unavailable")
+        async with get_unit_of_work() as session:
+            yield session
+
+    batcher = ToolBatcher(session_factory=first_unit_fails)
+    mine, theirs = await asyncio.gather(
+        batcher.submit("add_task", user.id, {"title": "never written"}),
+        batcher.submit("add_task", other.id, {"title": "kept"}),
+    )
+
+    assert mine.is_error and not theirs.is_error
+    assert await _titles(user.id) == []
+    assert await _titles(other.id) == ["kept"]
+    assert batcher.stats.snapshot()["unit_failures"] == 1
+
+
+async def test_chat_tool_calls_run_concurrently_on_their_own_sessions(user):
+    running, peak, sessions = 0, 0, []
+
+    @asynccontextmanager
+    async def tracked_session():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            async with get_session_context() as session:
+                sessions.append(session)
+                await asyncio.sleep(0.01)
+                yield session
+        finally:
+            running -= 1
+
+    calls = [
+        ToolCall(name="list_tasks", arguments={}),
+        ToolCall(name="list_tasks", arguments={"completed": True}),
+        ToolCall(name="no_such_tool", arguments={}),
+    ]
+    results = await run_tools(calls, user.id, session_factory=tracked_session)
+
+    assert [result.is_error for result in results] == [False, False, True]
+    assert peak == 2
+    assert len(set(map(id, sessions))) == 2
+
+
+async def test_chat_tool_calls_commit_independently(user):
+    results = await run_tools([
+        ToolCall(name="add_task", arguments={"title": "kept"}),
+        ToolCall(name="complete_task", arguments={"task_id": "not-a-uuid"}),
+    ], user.id)
+
+    assert [result.is_error for result in results] == [False, True]
+    assert await _titles(user.id) == ["kept"]
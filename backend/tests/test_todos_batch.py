@@ -0,0 +1,63 @@
+import uuid
+
+from sqlmodel import Session
+
+from src.database.session import engine
+from src.models import TodoCreate
+from src.services.todo_service import create_todo, create_todos
+
+
+async def test_create_single_todo(client, auth_headers, user):
+    response = await client.post("/api/todos", json={"title": "Buy milk"}, headers=auth_headers)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["title"] == "Buy milk"
+    assert body["user_id"] == str(user.id)
+    assert body["is_completed"] is False
+
+
+async def test_batch_create_update_and_delete(client, auth_headers, user):
+    response = await client.post(
+        "/api/todos/batch",
+        json=[{"title": "First"}, {"title": "Second", "description": "with notes"}],
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["created", "created"]
+    assert [r["todo"]["title"] for r in results] == ["First", "Second"]
+    assert all(r["todo"]["user_id"] == str(user.id) for r in results)
+    ids = [r["id"] for r in results]
+
+    listed = await client.get("/api/todos", headers=auth_headers)
+    assert sorted(todo["id"] for todo in listed.json()) == sorted(ids)
+
+    missing = str(uuid.uuid4())
+    response = await client.patch(
+        "/api/todos/batch",
+        json=[{"id": ids[0], "is_completed": True}, {"id": missing, "title": "Nope"}],
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "not_found"]
+    assert results[0]["todo"]["is_completed"] is True
+
+    response = await client.request("DELETE", "/api/todos/batch", json={"ids": [ids[1], missing]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "not_found"]
+
+
+async def test_empty_batch_is_rejected(client, auth_headers):
+    response = await client.post("/api/todos/batch", json=[], headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_sync_create_paths_set_the_owner(user):
+    with Session(engine) as session:
+        single = create_todo(session, TodoCreate(title="Sync single"), user.id)
+        assert single.user_id == user.id
+
+        batch = create_todos(session, [TodoCreate(title="Sync a"), TodoCreate(title="Sync b")], user.id)
+        assert [todo.user_id for todo in batch] == [user.id, user.id]
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+import pytest
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError
+
+from src.api import internal
+from src.utils import jwt as jwt_utils
+from src.utils.jwt import ALGORITHM, create_access_token, token_cache, verify_token
+from src.utils.token_cache import TokenCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_entry_expires_at_token_exp_before_ttl(clock):
+    cache = TokenCache(ttl=300, clock=clock)
+    cache.set("token", {"sub": "user", "exp": clock.now + 10})
+
+    clock.now += 9.9
+    assert cache.get("token") == {"sub": "user", "exp": clock.now + 0.1}
+    clock.now += 0.1
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entry_expires_at_ttl_before_token_exp(clock):
+    cache = TokenCache(ttl=5, clock=clock)
+    cache.set("token", {"sub": "user", "exp": clock.now + 3600})
+
+    clock.now += 5
+    assert cache.get("token") is None
+
+
+def test_already_expired_or_unbounded_claims_are_not_cached(clock):
+    cache = TokenCache(clock=clock)
+    cache.set("expired", {"sub": "user", "exp": clock.now})
+    cache.set("no-exp", {"sub": "user"})
+
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TokenCache(maxsize=2, clock=clock)
+    claims = {"sub": "user", "exp": clock.now + 60}
+    cache.set("a", claims)
+    cache.set("b", claims)
+    assert cache.get("a") is not None
+
+    cache.set("c", claims)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_cached_claims_are_copies(clock):
+    cache = TokenCache(clock=clock)
+    cache.set("token", {"sub": "user", "exp": clock.now + 60})
+    cache.get("token")["sub"] = "someone-else"
+    assert cache.get("token")["sub"] == "user"
+
+
+@pytest.fixture
+def fresh_token_cache():
+    token_cache.clear()
+    yield token_cache
+    token_cache.clear()
+
+
+def test_verify_token_caches_valid_tokens(fresh_token_cache):
+    token = create_access_token({"sub": "user", "email": "user@example.com"}, timedelta(minutes=5))
+
+    assert verify_token(token)["sub"] == "user"
+    assert verify_token(token)["sub"] == "user"
+    assert fresh_token_cache.stats()["hits"] == 1
+
+
+def test_verify_token_rejects_and_never_caches_expired_tokens(fresh_token_cache):
+    token = create_access_token({"sub": "user", "email": "user@example.com"}, timedelta(seconds=-1))
+
+    assert verify_token(token) is None
+    assert verify_token(token) is None
+    assert fresh_token_cache.stats()["size"] == 0
+
+
+def test_verify_token_rejects_and_never_caches_tokens_signed_with_another_key(fresh_token_cache):
+    token = jwt.encode({"sub": "user", "email": "user@example.com", "exp": 4102444800}, "revoked-key", algorithm=ALGORITHM)
+
+    assert verify_token(token) is None
+    assert fresh_token_cache.stats()["size"] == 0
+
+
+def test_cached_token_is_not_served_after_its_expiry(fresh_token_cache, monkeypatch):
+    token = create_access_token({"sub": "user", "email": "user@example.com"}, timedelta(minutes=5))
+    exp = verify_token(token)["exp"]
+
+    # Jump past exp: the entry must be dropped and the token go back through jwt.decode,
+    # which rejects it as expired
+    monkeypatch.setattr(fresh_token_cache, "_clock", lambda: exp)
+    decoded = []
+
+    def expired(*args, **kwargs):
+        decoded.append(args)
+        raise ExpiredSignatureError("Signature has expired.")
+
+    monkeypatch.setattr(jwt_utils.jwt, "decode", expired)
+    assert verify_token(token) is None
+    assert decoded
+
+
+async def test_token_cache_stats_endpoint(client, fresh_token_cache, monkeypatch):
+    monkeypatch.setattr(internal, "INTERNAL_API_TOKEN", "secret")
+    verify_token(create_access_token({"sub": "user", "email": "user@example.com"}, timedelta(minutes=5)))
+
+    response = await client.get("/api/internal/token-cache-stats", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["misses"] == 1
+    assert response.json()["size"] == 1